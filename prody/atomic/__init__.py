@@ -195,6 +195,7 @@ pointer.AtomMap = AtomMap
 pointer.AtomGroup = AtomGroup
 pointer.Selection = Selection
 
+select.SELECT = SELECT
 select.flags = flags
 select.isReserved = isReserved
 select.HierView = HierView
@@ -124,7 +124,7 @@ class AtomGroup(Atomic):
     which is a copy of of active coordinate sets of *A* and *B*."""
 
     __slots__ = ['_title', '_n_atoms', '_coords', '_hv', '_sn2i',
-                 '_timestamps', '_kdtrees',
+                 '_timestamps', '_kdtrees', '_features',
                  '_bmap', '_angmap', '_dmap', '_imap',
                  '_domap', '_acmap', '_nbemap', '_cmap',
                  '_bonds', '_angles', '_dihedrals', '_impropers',
@@ -142,6 +142,7 @@ class AtomGroup(Atomic):
         self._sn2i = None
         self._timestamps = None
         self._kdtrees = None
+        self._features = None
         self._bmap = None
         self._bonds = None
         self._angmap = None
@@ -413,7 +414,7 @@ class AtomGroup(Atomic):
     def _getTimeStamp(self, index):
         """Returns time stamp showing when coordinates were last changed."""
 
-        if self._n_cset:
+        if self._n_csets:
             if index is None:
                 return self._timestamps[self._acsi]
             else:
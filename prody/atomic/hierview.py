@@ -2,7 +2,8 @@
 """This module defines :class:`HierView` class that builds a hierarchical
 views of atom groups."""
 
-from numpy import unique, zeros, arange, concatenate
+from numpy import (append, arange, argsort, bincount, concatenate, cumsum,
+                   diff, flatnonzero, lexsort, ones, repeat, unique, where, zeros)
 from prody.utilities.misctools import count
 
 from .atomgroup import AtomGroup
@@ -181,140 +182,91 @@ class HierView(object):
         indices = atoms._getIndices()
         self._selstr = atoms.getSelstr()
 
-        self._dict = ag.getHierView()._dict
+        hv = ag.getHierView()
+        self._dict = hv._dict
 
-        self._segments = _segments = [None] * ag.numSegments()
-        self._residues = _residues = [None] * ag.numResidues()
-        self._chains = _chains = [None] * ag.numChains()
+        self._segments = _segments = [None] * hv.numSegments()
+        self._residues = _residues = [None] * hv.numResidues()
+        self._chains = _chains = [None] * hv.numChains()
 
         for hvidx, _list in [(atoms._getSegindices(), _segments),
                              (atoms._getChindices(), _chains),
                              (atoms._getResindices(), _residues),]:
-            if not _list: continue
-            pidx = hvidx[0]
-            pi = 0
-            for i, idx in enumerate(hvidx):
-                if pidx == idx: continue
-                subset = _list[pidx]
-                if subset is None:
-                    _list[pidx] = indices[pi:i]
-                else:
-                    _list[pidx] = concatenate((subset, indices[pi:i]))
-                pidx, pi = idx, i
-            subset = _list[pidx]
-            if subset is None:
-                _list[pidx] = indices[pi:]
-            else:
-                _list[pidx] = concatenate((subset, indices[pi:]))
+            if not _list or not len(hvidx):
+                continue
+            order = argsort(hvidx, kind='stable')
+            hvidx = hvidx[order]
+            subset = indices[order]
+            starts = flatnonzero(concatenate(([True],
+                                              hvidx[1:] != hvidx[:-1])))
+            ends = append(starts[1:], len(hvidx))
+            for idx, i, j in zip(hvidx[starts].tolist(), starts.tolist(),
+                                 ends.tolist()):
+                _list[idx] = subset[i:j]
 
     def _update(self, **kwargs):
-        """Build hierarchical view for :class:`.AtomGroup` instances."""
+        """Build hierarchical view for :class:`.AtomGroup` instances.
+
+        Segments, chains, and residues are identified by detecting boundaries
+        between runs of atoms with identical (segment name, chain identifier,
+        residue number, insertion code) keys, so construction is linear in
+        the number of atoms.  Runs that share a key are merged into the same
+        residue unless they are separated by a ``TER`` record.  Only index
+        arrays are stored; :class:`.Residue`, :class:`.Chain`, and
+        :class:`.Segment` instances are created when they are accessed."""
 
         ag = self._ag = self._atoms
         n_atoms = len(ag)
         _indices = arange(n_atoms)
 
         self._dict = _dict = {}
-        self._residues = _residues = []
-        self._segments = _segments = []
-        self._chains = _chains = []
-
-        nones = None
-        getnones = lambda: [None] * n_atoms if nones is None else nones
-        termini = ag.getFlags('pdbter')
-        if termini is None:
-            termini = getnones()
+        self._residues = []
+        self._segments = []
+        self._chains = []
 
         # identify segments
-        segindex = -1
         segindices = zeros(n_atoms, int)
 
         sgnms = ag._getSegnames()
-        if sgnms is None:
-            _segments = None
-        else:
+        if sgnms is not None and n_atoms:
             s = sgnms[0]
-            if len(unique(sgnms)) == 1:
+            if (sgnms == s).all():
                 # 1 segment
                 if s:
-                    _segments.append(_indices)
+                    self._segments.append(_indices)
                     _dict[s] = 0
                 else:
-                    _segments = None
+                    sgnms = None
             else:
-                ps = None       # previous segment name
-                for i, s in enumerate(sgnms):
-                    if s == ps or s in _dict:
-                        continue
-                    ps = s
-                    idx = _indices[i:][sgnms[i:] == s]
-                    segindex += 1
-                    segindices[idx] = segindex
+                segindices, firsts = _groups(sgnms)
+                for segindex, s in enumerate(sgnms[firsts].tolist()):
                     _dict[s or None] = segindex
-                    _segments.append(idx)
+                self._segments = _split(segindices, len(firsts))
+        else:
+            sgnms = None
 
         ag._data['segindex'] = segindices
 
         # identify chains
-        chindex = -1
         chindices = zeros(n_atoms, int)
 
         chids = ag._getChids()
-        if chids is None:
-            _chains = None
-        else:
-            if _segments is None:
-                if len(unique(chids)) == 1:
-                    _dict[(None, chids[0] or None)] = 0
-                    _chains.append(_indices)
-                else:
-                    pc = None
-                    for i, c in enumerate(chids):
-                        if c == pc or (None, c) in _dict:
-                            continue
-                        pc = c
-                        idx = _indices[i:][chids[i:] == c]
-                        chindex += 1
-                        chindices[idx] = chindex
-                        _dict[(None, c)] = chindex
-                        _chains.append(idx)
+        if chids is not None and n_atoms:
+            if sgnms is None:
+                chindices, firsts = _groups(chids)
+                snames = [None] * len(firsts)
             else:
-                pc = chids[0]
-                ps = sgnms[0]
-                _i = 0
-                for i, c in enumerate(chids):
-                    s = sgnms[i]
-                    if c == pc and s == ps:
-                        continue
-                    s_c = (ps, pc or None)
-                    cid = _dict.get(s_c)
-                    idx = _indices[_i:i]
-                    if cid is None:
-                        #segment = _dict[ps]
-                        chindex += 1
-                        chindices[idx] = chindex
-                        _dict[s_c] = chindex
-                        _chains.append(idx)
-                    else:
-                        chain = _chains[cid]
-                        chindices[idx] = cid
-                        _chains[cid] = concatenate((chain, idx))
-                    pc = c
-                    ps = s
-                    _i = i
-                s_c = (ps or None, pc or None)
-                cid = _dict.get(s_c)
-                idx = _indices[_i:]
-                if cid is None:
-                    #segment = _dict[ps]
-                    chindex += 1
-                    chindices[idx] = chindex
-                    _dict[s_c] = chindex
-                    _chains.append(idx)
-                else:
-                    chain = _chains[cid]
-                    chindices[idx] = cid
-                    _chains[cid] = concatenate((chain, idx))
+                chindices, firsts = _groups(segindices, chids)
+                snames = [s or None for s in sgnms[firsts].tolist()]
+            for chindex, (s, c) in enumerate(zip(snames,
+                                                 chids[firsts].tolist())):
+                _dict[(s, c or None)] = chindex
+            if len(firsts) == 1:
+                self._chains.append(_indices)
+            else:
+                self._chains = _split(chindices, len(firsts))
+        else:
+            chids = None
 
         ag._data['chindex'] = chindices
 
@@ -322,75 +274,86 @@ class HierView(object):
             return
 
         # identify residues
-        resindex = -1
-        resindices = zeros(n_atoms, int)
-
         rnums = ag._getResnums()
         if rnums is None:
             raise ValueError('resnums are not set')
-        if _segments is None:
-            sgnms = nones = getnones()
-        if _chains is None:
-            chids = nones = getnones()
         icods = ag._getIcodes()
+        termini = ag._getFlags('pdbter')
+
+        if not n_atoms:
+            ag._data['resindex'] = zeros(0, int)
+            return
+
+        # a new run of atoms starts wherever any of the keys changes and
+        # after each atom that is followed by a TER record
+        bounds = rnums[1:] != rnums[:-1]
+        for keys in (icods, chids, sgnms):
+            if keys is not None:
+                bounds |= keys[1:] != keys[:-1]
+        if termini is not None:
+            bounds |= termini[:-1]
+        starts = flatnonzero(concatenate(([True], bounds)))
+        ends = append(starts[1:], n_atoms)
+        n_runs = len(starts)
+
+        # runs sharing a key are candidates for being the same residue
+        sckeys = (chindices if chids is not None else segindices)[starts]
         if icods is None:
-            icods = nones = getnones()
-        pr = rnums[0]
-        pi = icods[0] or None
-        pc = chids[0]
-        ps = sgnms[0]
-        _j = 0
-        _append = _residues.append
-        _get = _dict.get
-        _set = _dict.__setitem__
-        for j, r in enumerate(rnums):
-            i = icods[j] or None
-            c = chids[j]
-            s = sgnms[j]
-            if r != pr or i != pi or c != pc or s != ps or (j and termini[j-1]):
-                s_c_r_i = (ps, pc, pr, pi)
-                rid = _get(s_c_r_i)
-                idx = _indices[_j:j]
-                if (rid is None or isinstance(rid, list) or
-                    termini[_residues[rid][-1]]):
-                    resindex += 1
-                    resindices[idx] = resindex
-                    _append(idx)
-                    if rid is None:
-                        _set(s_c_r_i, resindex)
-                    elif isinstance(rid, list):
-                        rid.append(resindex)
-                    else:
-                        _set(s_c_r_i, [rid, resindex])
-                else:
-                    residue = _residues[rid]
-                    resindices[idx] = rid
-                    _residues[rid] = concatenate((residue, idx))
-                ps = s
-                pc = c
-                pr = r
-                pi = i
-                _j = j
-        s_c_r_i = (ps, pc, pr, pi)
-        rid = _get(s_c_r_i)
-        idx = _indices[_j:]
-        if rid is None or isinstance(rid, list) or termini[_residues[rid][-1]]:
-            resindex += 1
-            resindices[idx] = resindex
-            _append(idx)
-            if rid is None:
-                _set(s_c_r_i, resindex)
-            elif isinstance(rid, list):
-                rid.append(resindex)
-            else:
-                _set(s_c_r_i, [rid, resindex])
+            runkeys, keyruns = _groups(sckeys, rnums[starts])
         else:
-            residue = _residues[rid]
-            resindices[idx] = rid
-            _residues[rid] = concatenate((residue, idx))
+            runkeys, keyruns = _groups(sckeys, rnums[starts], icods[starts])
+        n_keys = len(keyruns)
+
+        if n_keys == n_runs:
+            # every run is a distinct residue, the most common case
+            runids = arange(n_runs)
+            resindices = repeat(runids, ends - starts)
+            self._residues = [_indices[i:j] for i, j in
+                              zip(starts.tolist(), ends.tolist())]
+            multi = []
+        else:
+            # a repeated key extends the residue of its first run, unless a
+            # run with that key ended with a TER record, after which each run
+            # with the key becomes a new residue
+            order = argsort(runkeys, kind='stable')
+            heads = ones(n_runs, bool)
+            heads[1:] = runkeys[order][1:] != runkeys[order][:-1]
+            isnew = heads
+            if termini is not None:
+                split = zeros(n_runs, int)
+                split[1:] = termini[ends - 1][order][:-1]
+                split[heads] = 0
+                split = cumsum(split)
+                split -= repeat(split[heads],
+                                diff(append(flatnonzero(heads), n_runs)))
+                isnew = heads | (split > 0)
+            isnew[order] = isnew.copy()
+            newids = cumsum(isnew) - 1
+            runids = where(isnew, newids, newids[keyruns][runkeys])
+            counts = bincount(runkeys[isnew], minlength=n_keys)
+            multi = flatnonzero(isnew & (counts[runkeys] > 1))
+            resindices = repeat(runids, ends - starts)
+            self._residues = _split(resindices, newids[-1] + 1)
 
         ag._data['resindex'] = resindices
 
+        keyatoms = starts[keyruns]
+        skeys = ([None] * n_keys if sgnms is None else
+                 sgnms[keyatoms].tolist())
+        ckeys = ([None] * n_keys if chids is None else
+                 chids[keyatoms].tolist())
+        ikeys = ([None] * n_keys if icods is None else
+                 [i or None for i in icods[keyatoms].tolist()])
+        keys = list(zip(skeys, ckeys, rnums[keyatoms].tolist(), ikeys))
+        _dict.update(zip(keys, runids[keyruns].tolist()))
+        for key, rid in zip(runkeys[multi].tolist(), runids[multi].tolist()):
+            key = keys[key]
+            ids = _dict[key]
+            if isinstance(ids, list):
+                ids.append(rid)
+            elif ids != rid:
+                _dict[key] = [ids, rid]
+
     def getResidue(self, chid, resnum, icode=None, segname=None):
         """Returns residue with number *resnum* and insertion code *icode* from
         the chain with identifier *chid* in segment with name *segname*."""
@@ -516,3 +479,35 @@ class HierView(object):
                 item = alist[i] = Segment(ag, item, self, acsi, selstr=selstr,
                                           unique=True)
             yield item
+
+
+
+def _groups(*keys):
+    """Returns indices of groups of elements that have identical values in
+    all of *keys* arrays, numbering groups in order of first appearance, and
+    positions of the first element of each group."""
+
+    n = len(keys[0])
+    if len(keys) == 1:
+        order = argsort(keys[0], kind='stable')
+    else:
+        order = lexsort(keys[::-1])
+    heads = zeros(n, bool)
+    heads[0] = True
+    for key in keys:
+        key = key[order]
+        heads[1:] |= key[1:] != key[:-1]
+    firsts = order[heads]
+    rank = argsort(firsts, kind='stable')
+    groups = zeros(n, int)
+    groups[order] = rank.argsort()[cumsum(heads) - 1]
+    return groups, firsts[rank]
+
+
+def _split(groups, n_groups):
+    """Returns a list of index arrays of elements in each of *n_groups*
+    groups."""
+
+    order = argsort(groups, kind='stable')
+    ends = cumsum(bincount(groups, minlength=n_groups)).tolist()
+    return [order[i:j] for i, j in zip([0] + ends[:-1], ends)]
@@ -437,10 +437,38 @@ substitution is performed automatically to ensure reproducibility of the
 selection without the keyword *center*.
 
 Keywords cannot be reserved words (see :func:`.listReservedWords`) and must be
-all alphanumeric characters."""
+all alphanumeric characters.
+
+
+Compiled selections
+-------------------------------------------------------------------------------
+
+Selection strings are parsed once and the parsed expression is stored as a
+:class:`SelectionPlan` in a small cache, so repeated selections skip parsing.
+A plan can also be obtained explicitly using :func:`compileSelection` and
+evaluated for different atoms or coordinate sets:
+
+.. ipython:: python
+
+   plan = compileSelection('protein and within 5 of water')
+   plan.select(p)
+   p.select(plan) == plan.select(p)
+
+Plans do not store atom data, so they are evaluated against the current
+coordinates and data of the atoms they are applied to.
+
+For selections that are made repeatedly for new coordinates, e.g. frames of a
+trajectory, :class:`DynamicSelection` evaluates parts of the selection that do
+not depend on coordinates only once:
+
+.. ipython:: python
+
+   water = DynamicSelection(p, 'water and within 5 of protein')
+   water.update()"""
 
 import sys
 from re import compile as re_compile
+from collections import OrderedDict
 try:
    # for python>=3.3
    from collections.abc import Iterable
@@ -493,10 +521,15 @@ def debug(sel, loc, *args):
         print(' ' * (loc + 1) + '^')
 
 __all__ = ['Select', 'SelectionError', 'SelectionWarning',
+           'SelectionPlan', 'compileSelection', 'DynamicSelection',
            'defSelectionMacro', 'delSelectionMacro', 'getSelectionMacro',
            'isSelectionMacro']
 
 ATOMGROUP = None
+SELECT = None
+
+PLANS = OrderedDict()
+PLANS_SIZE = 256
 
 MACROS = SETTINGS.get('selection_macros', {})
 MACROS_REGEX = None
@@ -539,6 +572,7 @@ def defSelectionMacro(name, selstr):
         LOGGER.info("Macro {0} is defined as {1}."
                     .format(repr(name), repr(selstr)))
         MACROS[name] = selstr
+        PLANS.clear()
         SETTINGS['selection_macros'] = MACROS
         SETTINGS.save()
 
@@ -556,6 +590,7 @@ def delSelectionMacro(name):
         LOGGER.warn("Macro {0} is not found.".format(repr(name)))
     else:
         if MACROS_REGEX is not None: MACROS_REGEX.pop(name, None)
+        PLANS.clear()
         LOGGER.info("Macro {0} is deleted.".format(repr(name)))
         SETTINGS['selection_macros'] = MACROS
         SETTINGS.save()
@@ -807,6 +842,202 @@ PP_NRANGE.setParseAction(rangeParseAction)
 UNARY = set(['not', 'bonded', 'exbonded', 'within', 'exwithin', 'same'])
 
 
+class _PlanNode(object):
+
+    """A parse action of a selection string and the tokens it applies to.
+    Tokens are strings, lists of tokens, or other nodes."""
+
+    __slots__ = ('action', 'loc', 'tokens')
+
+    def __init__(self, action, loc, tokens):
+
+        self.action = action
+        self.loc = loc
+        self.tokens = tokens
+
+
+def _listTokens(tokens):
+    """Returns *tokens* with nested parse results converted to lists."""
+
+    return [_listTokens(token) if isinstance(token, pp.ParseResults)
+            else token for token in tokens]
+
+
+class SelectionPlan(object):
+
+    """A parsed selection string that can be evaluated repeatedly without
+    parsing it again.  Instances are returned by :func:`compileSelection`
+    and can be used in place of a selection string, e.g. in
+    :meth:`.AtomGroup.select`.  A plan does not store any atomic data, so
+    it reflects changes in coordinates, flags, and data of the atoms it is
+    evaluated for."""
+
+    __slots__ = ('_selstr', '_parsed', '_root')
+
+    def __init__(self, selstr, parsed, root):
+
+        self._selstr = selstr
+        self._parsed = parsed
+        self._root = root
+
+    def __repr__(self):
+
+        return '<SelectionPlan: {0}>'.format(repr(self._selstr))
+
+    def __str__(self):
+
+        return self._selstr
+
+    def getSelstr(self):
+        """Returns selection string."""
+
+        return self._selstr
+
+    def select(self, atoms, **kwargs):
+        """Returns a :class:`.Selection` of *atoms* matching the plan, or
+        **None**, if no atoms match.  See :meth:`.Select.select`."""
+
+        return SELECT.select(atoms, self, **kwargs)
+
+    def getIndices(self, atoms, **kwargs):
+        """Returns indices of *atoms* matching the plan.  See
+        :meth:`.Select.getIndices`."""
+
+        return SELECT.getIndices(atoms, self, **kwargs)
+
+    def getBoolArray(self, atoms, **kwargs):
+        """Returns a boolean array with **True** values for *atoms* matching
+        the plan.  See :meth:`.Select.getBoolArray`."""
+
+        return SELECT.getBoolArray(atoms, self, **kwargs)
+
+
+def compileSelection(selstr):
+    """Returns a :class:`SelectionPlan` for *selstr*.  Plans are kept in a
+    cache of recently used selection strings, which is also used by
+    :meth:`.Select.select`, so compiling a string that was selected before
+    does not parse it again.  Cache is cleared when a selection macro is
+    defined or deleted.
+
+    .. ipython:: python
+
+       plan = compileSelection('protein and within 5 of water')
+       plan"""
+
+    if isinstance(selstr, SelectionPlan):
+        return selstr
+    if not isinstance(selstr, str):
+        raise TypeError('selstr must be a string, not {0}'
+                        .format(type(selstr)))
+    return SELECT._getPlan(selstr)
+
+
+class DynamicSelection(object):
+
+    """A selection that is updated for new coordinates of *atoms*, e.g. for
+    frames of a trajectory.  Parts of the selection string that do not
+    depend on coordinates, such as names, residue names, and flags, are
+    evaluated once and reused, so an update evaluates only distance and
+    coordinate based parts of the selection.  Keyword arguments are passed
+    to :meth:`.Select.select` in each update.
+
+    .. ipython:: python
+
+       water = DynamicSelection(p, 'water and within 5 of protein')
+       water.update()
+
+    Call :meth:`reset` after changing atomic data other than coordinates,
+    such as names or flags."""
+
+    def __init__(self, atoms, selstr, **kwargs):
+
+        if not isinstance(atoms, Atomic):
+            raise TypeError('atoms must be an Atomic instance, not {0}'
+                            .format(type(atoms)))
+        self._atoms = atoms
+        self._plan = compileSelection(selstr)
+        self._kwargs = kwargs
+        self._select = Select()
+        self._memo = {}
+        self._stamp = None
+        self._selection = None
+
+    def __repr__(self):
+
+        return '<DynamicSelection: {0} from {1}>'.format(
+            repr(self._plan.getSelstr()), str(self._atoms))
+
+    def getSelstr(self):
+        """Returns selection string."""
+
+        return self._plan.getSelstr()
+
+    def getAtoms(self):
+        """Returns atoms that are selected from."""
+
+        return self._atoms
+
+    def getSelection(self):
+        """Returns selection from the most recent :meth:`update`."""
+
+        return self._selection
+
+    def reset(self):
+        """Forget evaluated parts of the selection."""
+
+        self._memo.clear()
+        self._stamp = None
+        self._selection = None
+
+    def update(self, frame=None):
+        """Evaluate the selection and return a :class:`.Selection`, or
+        **None** if no atoms are selected.
+
+        :arg frame: coordinates to evaluate the selection for, given as a
+            coordinate set index, a coordinate array, or an instance with
+            ``getCoords`` method such as a :class:`.Frame`, by default
+            active coordinates of atoms are used and selection is evaluated
+            only if they changed since the last update
+        :type frame: int, :class:`numpy.ndarray`, :class:`.Frame`"""
+
+        atoms = self._atoms
+        coords = stamp = None
+        if frame is None:
+            try:
+                ag = atoms.getAtomGroup()
+            except AttributeError:
+                ag = atoms
+            acsi = atoms.getACSIndex()
+            stamp = (acsi, ag._getTimeStamp(acsi))
+            if stamp == self._stamp:
+                return self._selection
+        else:
+            if isinstance(frame, (int, np.integer)):
+                coords = atoms.getCoordsets(frame)
+            elif isinstance(frame, ndarray):
+                coords = frame
+            else:
+                try:
+                    coords = frame.getCoords()
+                except AttributeError:
+                    raise TypeError('frame must be an integer, a coordinate '
+                                    'array, or have getCoords method')
+            if coords is None or coords.shape != (atoms.numAtoms(), 3):
+                raise ValueError('frame must provide coordinates for {0} '
+                                 'atoms'.format(atoms.numAtoms()))
+
+        select = self._select
+        select._memo = self._memo
+        select._frame = coords
+        try:
+            self._selection = select.select(atoms, self._plan, **self._kwargs)
+        finally:
+            select._memo = None
+            select._frame = None
+        self._stamp = stamp
+        return self._selection
+
+
 class Select(object):
 
     """Select subsets of atoms based on a selection string.
@@ -829,7 +1060,10 @@ class Select(object):
         self._replace = False
 
         self._parsers = {}
-
+        # results of coordinate independent tokens, see DynamicSelection
+        self._memo = None
+        # coordinates to use instead of those of atoms
+        self._frame = None
 
         self._evalmap = {'resnum': self._resnum, 'resid': self._resnum,
             'serial': self._serial, 'index': self._index,
@@ -891,8 +1125,11 @@ class Select(object):
         self._ss2idx = False
         self._replace = False
 
+        plan = selstr
+        if isinstance(selstr, SelectionPlan):
+            selstr = selstr.getSelstr()
         self._selstr = selstr
-        indices = self.getIndices(atoms, selstr, **kwargs)
+        indices = self.getIndices(atoms, plan, **kwargs)
 
         self._kwargs = None
 
@@ -934,7 +1171,7 @@ class Select(object):
         should not be used for indexing the corresponding :class:`.AtomGroup`
         instance."""
 
-        ss = selstr.strip()
+        ss = str(selstr).strip()
         if (len(ss.split()) == 1 and ss.isalnum() and ss not in MACROS):
             self._evalAtoms(atoms)
             if ss == 'none':
@@ -962,6 +1199,12 @@ class Select(object):
             raise TypeError('atoms must be an Atomic instance, not {0}'
                             .format(type(atoms)))
 
+        if isinstance(selstr, SelectionPlan):
+            plan = selstr
+            selstr = plan.getSelstr()
+        else:
+            plan = None
+
         self._reset()
 
         for key in kwargs:
@@ -999,30 +1242,11 @@ class Select(object):
                 raise SelectionError(selstr, 0, 'is not a valid selection or '
                                      'user data label')
 
-        selstr = replaceMacros(selstr)
-        try:
-            parser = self._getParser(selstr)
-            tokens = parser(selstr, parseAll=True)
-        except pp.ParseException as err:
-            self._parsers.pop(self._parser, None)
-            pass
-            which = selstr.rfind(' ', 0, err.column)
-            if which > -1:
-                if selstr[which + 1] == '(':
-                    msg = ('an arithmetic, comparison, or logical operator '
-                           'must precede the opening parenthesis')
-                elif selstr[which - 1] == ')':
-                    msg = ('an arithmetic, comparison, or logical operator '
-                           'must follow the closing parenthesis')
-                else:
-                    msg = 'parsing failed here'
-            else:
-                msg = 'parsing failed here'
-
-            raise SelectionError(selstr, err.column, msg + '\n' + str(err))
-        else:
-            if DEBUG: print('_evalSelstr', tokens)
-            torf = tokens[0]
+        if plan is None:
+            plan = self._getPlan(selstr)
+        selstr = plan._parsed
+        torf = self._evalPlan(plan._root, selstr)
+        if DEBUG: print('_evalSelstr', torf)
 
         if not isinstance(torf, ndarray):
             if DEBUG: print(torf)
@@ -1036,6 +1260,124 @@ class Select(object):
             print('_select', torf)
         return torf
 
+    def _getPlan(self, selstr):
+        """Returns a :class:`SelectionPlan` for *selstr*, which is parsed only
+        if it is not found among recently used selection strings."""
+
+        try:
+            plan = PLANS.pop(selstr)
+        except KeyError:
+            parsed = replaceMacros(selstr.strip())
+            try:
+                parser = self._getParser(parsed)
+                tokens = parser(parsed, parseAll=True)
+            except pp.ParseException as err:
+                self._parsers.pop(self._parser, None)
+                which = parsed.rfind(' ', 0, err.column)
+                if which > -1:
+                    if parsed[which + 1] == '(':
+                        msg = ('an arithmetic, comparison, or logical '
+                               'operator must precede the opening '
+                               'parenthesis')
+                    elif parsed[which - 1] == ')':
+                        msg = ('an arithmetic, comparison, or logical '
+                               'operator must follow the closing parenthesis')
+                    else:
+                        msg = 'parsing failed here'
+                else:
+                    msg = 'parsing failed here'
+
+                raise SelectionError(parsed, err.column,
+                                     msg + '\n' + str(err))
+            if DEBUG: print('_getPlan', tokens)
+            plan = SelectionPlan(selstr, parsed, tokens[0])
+            if len(PLANS) >= PLANS_SIZE:
+                PLANS.popitem(last=False)
+        PLANS[selstr] = plan
+        return plan
+
+    def _evalPlan(self, node, sel):
+        """Evaluate *node* of a selection plan after evaluating the nodes
+        among its tokens."""
+
+        memo = self._memo
+        if memo is not None and self._isStatic(node.tokens):
+            result = memo.get(node)
+            if result is None:
+                tokens = self._evalTokens(node.tokens, sel)
+                result = getattr(self, node.action)(sel, node.loc, tokens)
+                if not isinstance(result, ndarray):
+                    return result
+                memo[node] = result
+            return result.copy()
+
+        tokens = self._evalTokens(node.tokens, sel)
+        return getattr(self, node.action)(sel, node.loc, tokens)
+
+    def _evalTokens(self, tokens, sel):
+
+        evaluated = []
+        for token in tokens:
+            if isinstance(token, _PlanNode):
+                token = self._evalPlan(token, sel)
+            elif isinstance(token, list):
+                token = self._evalTokens(token, sel)
+            evaluated.append(token)
+        return evaluated
+
+    def _isStatic(self, tokens):
+        """Returns **True** if evaluation of *tokens* does not depend on
+        coordinates or keyword arguments."""
+
+        for token in tokens:
+            if isinstance(token, _PlanNode):
+                if not self._isStatic(token.tokens):
+                    return False
+            elif isinstance(token, (list, tuple)):
+                if not self._isStatic(token):
+                    return False
+            elif isinstance(token, ndarray):
+                return False
+            elif isinstance(token, str):
+                if token in XYZDIST or token in self._kwargs:
+                    return False
+        return True
+
+    def _recall(self, method, sel, loc, tokens, subset=None):
+        """Evaluate static *tokens* using *method* for all atoms once, and
+        return a copy of the result or its *subset*."""
+
+        memo = self._memo
+        key = (method.__name__,) + tuple(tokens)
+        self._memo = None
+        try:
+            try:
+                torf = memo.get(key)
+            except TypeError:
+                # tokens with unhashable items are not cached
+                if subset is None:
+                    return method(sel, loc, tokens)
+                return method(sel, loc, tokens, subset)
+            if torf is None:
+                torf, err = method(sel, loc, list(tokens))
+                if err or not isinstance(torf, ndarray):
+                    return torf, err
+                memo[key] = torf
+        finally:
+            self._memo = memo
+        if subset is None:
+            return torf.copy(), False
+        else:
+            return torf[subset], False
+
+    def _record(self, action):
+        """Returns a parse action that records *action* in the plan instead
+        of evaluating it."""
+
+        def record(sel, loc, tokens):
+            return _PlanNode(action, loc, _listTokens(tokens))
+        return record
+
     def _getParser(self, selstr):
         """Returns an efficient parser that can handle *selstr*."""
 
@@ -1073,22 +1415,25 @@ class Select(object):
 
         oplist = []
         if funcs:
-            oplist.append((FUNCNAMES_OPLIST, 1, pp.opAssoc.RIGHT, self._func))
+            oplist.append((FUNCNAMES_OPLIST, 1, pp.opAssoc.RIGHT,
+                           self._record('_func')))
             # following causes 20% slow down
             #word += FUNCNAMES_EXPR
 
         if funcs or opers:
             oplist.extend([
-                (pp.oneOf('+ -'), 1, pp.opAssoc.RIGHT, self._sign),
-                (pp.oneOf('** ^'), 2, pp.opAssoc.LEFT, self._pow),
-                (pp.oneOf('* / %'), 2, pp.opAssoc.LEFT, self._binop),
-                (pp.oneOf('+ -'), 2, pp.opAssoc.LEFT, self._binop),
+                (pp.oneOf('+ -'), 1, pp.opAssoc.RIGHT, self._record('_sign')),
+                (pp.oneOf('** ^'), 2, pp.opAssoc.LEFT, self._record('_pow')),
+                (pp.oneOf('* / %'), 2, pp.opAssoc.LEFT,
+                 self._record('_binop')),
+                (pp.oneOf('+ -'), 2, pp.opAssoc.LEFT,
+                 self._record('_binop')),
                 (pp.oneOf('< > <= >= == = !='), 2, pp.opAssoc.LEFT,
-                 self._comp)])
+                 self._record('_comp'))])
 
         oplist.extend([
-          (pp.Optional(AND), 2, pp.opAssoc.LEFT, self._and),
-          (OR, 2, pp.opAssoc.LEFT, self._or)])
+          (pp.Optional(AND), 2, pp.opAssoc.LEFT, self._record('_and')),
+          (OR, 2, pp.opAssoc.LEFT, self._record('_or'))])
 
         word += WORD
 
@@ -1098,7 +1443,7 @@ class Select(object):
         if nrange: expr = PP_NRANGE | expr
 
         parser = operatorPrecedence(expr, oplist)
-        parser.setParseAction(self._default)
+        parser.setParseAction(self._record('_default'))
         parser.leaveWhitespace()
         parser.enablePackrat()
         self._parsers[key] = parser, expr, oplist
@@ -1107,7 +1452,7 @@ class Select(object):
     def _noParser(self, selstr, parseAll=True):
 
         debug(selstr, 0, ['_noParser'])
-        return [self._default(selstr, 0, selstr.split())]
+        return [_PlanNode('_default', 0, selstr.split())]
 
     def _getZeros(self, subset=None):
         """Returns a bool array with zero elements."""
@@ -1134,6 +1479,8 @@ class Select(object):
 
         debug(sel, loc, '_eval', tokens)
         if NUMB: return
+        if self._memo is not None and self._isStatic(tokens):
+            return self._recall(self._eval, sel, loc, tokens, subset)
         #if isinstance(tokens, ndarray):
         #    return tokens
 
@@ -1484,6 +1831,13 @@ class Select(object):
                 if len(ss) == 0: return torf, False
                 torf[ss] = atoms._getFlags(flags.pop(0))[ss]
 
+        if self._memo is not None and (unary or evals):
+            torf, err = self._andStatic(sel, loc, torf, unary, evals)
+            if err: return None, err
+            if torf is not None and not torf.any():
+                return (torf, False) if subset is None else (torf[subset],
+                                                             False)
+
         if unary:
             if torf is None:
                 torf, err = self._unary(sel, loc, unary.pop(0))
@@ -1492,7 +1846,8 @@ class Select(object):
             while unary:
                 ss = torf.nonzero()[0]
                 if len(ss) == 0: return torf, False
-                arr, err = self._unary(sel, loc, unary.pop(0))
+                arr, err = self._unary(sel, loc, unary.pop(0),
+                                       None if self._memo is None else ss)
                 if err: return None, err
                 torf[ss] = arr[ss]
 
@@ -1543,10 +1898,41 @@ class Select(object):
         else:
             return torf[subset], False
 
-    def _unary(self, sel, loc, tokens):
+    def _andStatic(self, sel, loc, torf, unary, evals):
+        """Evaluate coordinate independent items of *unary* and *evals*,
+        which are removed from the lists, and combine them with *torf*.
+        This lets :class:`DynamicSelection` evaluate coordinate dependent
+        items only for atoms selected by the rest."""
+
+        isStatic = self._isStatic
+        for items, method in ((evals, self._eval), (unary, self._unary)):
+            for tokens in [tokens for tokens in items if isStatic(tokens)]:
+                items.remove(tokens)
+                arr, err = method(sel, loc, tokens)
+                if err: return None, err
+                try:
+                    dtype = arr.dtype
+                except AttributeError:
+                    dtype = None
+                if dtype != bool:
+                    first = str(tokens[0])
+                    return None, SelectionError(sel, loc, 'a problem '
+                        'occurred when evaluating token {0}'
+                        .format(repr(first)), [first])
+                if torf is None:
+                    torf = arr
+                else:
+                    torf &= arr
+        return torf, False
+
+    def _unary(self, sel, loc, tokens, subset=None):
+        """Evaluate unary operations.  If *subset* is given, coordinate
+        dependent results may be evaluated only for atoms in it."""
 
         debug(sel, loc, '_unary', tokens)
         if NUMB: return
+        if self._memo is not None and self._isStatic(tokens):
+            return self._recall(self._unary, sel, loc, tokens)
 
         what = tokens[0]
         which = tokens[1:]
@@ -1568,7 +1954,7 @@ class Select(object):
         elif what[-1] == 'to':
             return self._bondedto(sel, loc, tokens)
         else:
-            return self._within(sel, loc, tokens)
+            return self._within(sel, loc, tokens, subset)
 
     def _not(self, sel, loc, tokens):
         """Negate selection."""
@@ -1577,8 +1963,9 @@ class Select(object):
         label, torf = tokens
         return invert(torf, torf), False
 
-    def _within(self, sel, loc, tokens):
-        """Perform distance based selection."""
+    def _within(self, sel, loc, tokens, subset=None):
+        """Perform distance based selection.  If *subset* is given, only
+        atoms in it are tested."""
 
         if DEBUG: print('_within', tokens)
         label, which = tokens
@@ -1639,41 +2026,54 @@ class Select(object):
             else:
                 return None, SelectionError(sel, loc, 'not understood')
 
-        if other or len(which) < 20:
-            kdtree = self._atoms._getKDTree()
-            get_indices = kdtree.getIndices
-            search = kdtree.search
-            get_count = kdtree.getCount
-            torf = zeros(self._ag.numAtoms(), bool)
-            for index in which:
-                search(within, coords[index])
-                if get_count():
-                    torf[get_indices()] = True
-            if self._indices is not None:
-                torf = torf[self._indices]
+        if subset is not None:
+            # test atoms in subset for any reference atom around them
+            ref = coords if other else coords[which]
+            coords = self._getCoords()
+            torf = zeros(len(coords), bool)
+            if len(subset) and len(ref):
+                torf[subset] = KDTree(ref).getCenterMask(within,
+                                                         coords[subset])
+            if exclude:
+                torf[which] = False
+            return torf, False
+
+        kdtree = indices = None
+        if self._frame is None:
+            try:
+                self._atoms.numDummies()
+            except AttributeError:
+                kdtree = self._atoms._getKDTree()
+                indices = self._indices
+        if kdtree is None:
+            # atom maps and frames use a tree built for their coordinates
+            kdtree = KDTree(self._getCoords())
+
+        if other or len(which) * 2 < self._atoms.numAtoms():
+            # mark atoms around reference atoms in a single call
+            if not other:
+                coords = coords[which]
+            torf = kdtree.getMask(within, coords)
+            if indices is not None:
+                torf = torf[indices]
             if exclude:
                 torf[which] = False
 
         else:
-            n_atoms = self._atoms.numAtoms()
-            torf = ones(n_atoms, bool)
+            # reference atoms outnumber the rest, so test the rest for any
+            # reference atom around them
+            torf = ones(len(coords), bool)
             torf[which] = False
             check = torf.nonzero()[0]
-            torf = zeros(n_atoms, bool)
-
-            cxyz = coords[check]
-            kdtree = KDTree(coords[which])
-            search = kdtree.search
-            get_count = kdtree.getCount
-            select = []
-            append = select.append
-            for i, xyz in enumerate(cxyz):
-                search(within, xyz)
-                if get_count():
-                    append(i)
-
-            torf[check[select]] = True
-            if not exclude:
+            if indices is None:
+                targets = invert(torf)
+            else:
+                targets = zeros(self._ag.numAtoms(), bool)
+                targets[indices[which]] = True
+            torf[check] = kdtree.getCenterMask(within, coords[check], targets)
+            if exclude:
+                torf[which] = False
+            else:
                 torf[which] = True
 
         return torf, False
@@ -2422,7 +2822,10 @@ class Select(object):
         """Returns coordinates of atoms."""
 
         if self._coords is None:
-            self._coords = self._atoms._getCoords()
+            if self._frame is None:
+                self._coords = self._atoms._getCoords()
+            else:
+                self._coords = self._frame
         return self._coords
 
     def _getAnisous(self):
@@ -15,6 +15,7 @@ from prody.atomic.functions import extendAtomicData
 from prody.proteins.pdbfile import parsePDB
 from prody.trajectory.psffile import parsePSF, writePSF
 from prody.trajectory.dcdfile import parseDCD
+from prody.trajectory.xdrfile import XTCFile
 
 __all__ = ['fetchBioexcelPDB', 'parseBioexcelPDB', 'convertXtcToDcd',
            'fetchBioexcelTrajectory', 'parseBioexcelTrajectory',
@@ -227,21 +228,35 @@ def parseBioexcelTrajectory(query, **kwargs):
 
     :arg top: topology filename
     :type top: str
+
+    :arg convert: convert a fetched trajectory to dcd using mdtraj, 
+        default is **False** as xtc files are parsed directly
+    :type convert: bool
     """
-    kwargs['convert'] = True
+    kwargs['convert'] = checkConvert(convert=kwargs.get('convert', False))
     if isfile(query) and query.endswith('.dcd'):
         filename = query
     elif isfile(query + '.dcd'):
         filename = query + '.dcd'
     elif isfile(query) and query.endswith('.xtc'):
-        filename = convertXtcToDcd(query, **kwargs)
+        filename = query
     elif isfile(query + '.xtc'):
-        filename = convertXtcToDcd(query + '.xtc', **kwargs)
+        filename = query + '.xtc'
     else:
         filename = fetchBioexcelTrajectory(query, **kwargs)
 
+    if filename.endswith('.xtc'):
+        return _parseXTC(filename)
     return parseDCD(filename)
 
+def _parseXTC(filename):
+    """Returns an :class:`.Ensemble` with all frames of an XTC file."""
+
+    xtc = XTCFile(filename)
+    ensemble = xtc[:]
+    xtc.close()
+    return ensemble
+
 def parseBioexcelPDB(query, **kwargs):
     """Parse a BioExcel-CV19 topology json into an :class:`.Ensemble`,
     fetching it if needed using **kwargs
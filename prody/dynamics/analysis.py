@@ -298,7 +298,7 @@ def _getModeProperties(modes):
                                 'not {0}'.format(type(mode)))
             V.append(mode._getArray())
             if isinstance(mode, Mode):
-                W.append(modes.getVariance())
+                W.append(mode.getVariance())
             else:
                 W.append(1.)
             if is3d is None:
@@ -373,7 +373,9 @@ def calcCrossCorr(modes, n_cpu=1, norm=True):
     Cross-correlations matrix may be calculated using all modes or a subset of modes
     of an NMA instance.  For large systems, calculation of cross-correlations
     matrix may be time consuming.  Optionally, multiple processors may be
-    employed to perform calculations by passing ``n_cpu=2`` or more."""
+    employed to perform calculations by passing ``n_cpu=2`` or more, in which 
+    case modes and the matrix are placed in shared memory and each process 
+    fills a block of rows of the matrix."""
 
     if not isinstance(n_cpu, int):
         raise TypeError('n_cpu must be an integer')
@@ -394,59 +396,13 @@ def calcCrossCorr(modes, n_cpu=1, norm=True):
         is3d = modes.is3d()
 
     if is3d:
-        model = modes
-        if isinstance(modes, (Mode, ModeSet)):
-            model = modes._model
-            if isinstance(modes, (Mode)):
-                indices = [modes.getIndex()]
-                n_modes = 1
-            else:
-                indices = modes.getIndices()
-                n_modes = len(modes)
-        elif isinstance(modes, Vector):
-                indices = [0]
-                n_modes = 1
-        else:
-            n_modes = len(modes)
-            indices = np.arange(n_modes)
-            
-        array = model._getArray()
-        n_atoms = model._n_atoms
-
-        if not isinstance(modes, Vector):
-            variances = model._vars
-        else:
-            array = array.reshape(-1, 1)
-            variances = np.ones(1)
-
-        if n_cpu == 1:
-            s = (n_modes, n_atoms, 3)
-            arvar = (array[:, indices]*variances[indices]).T.reshape(s)
-            array = array[:, indices].T.reshape(s)
-            covariance = np.tensordot(array.transpose(2, 0, 1),
-                                      arvar.transpose(0, 2, 1),
-                                      axes=([0, 1], [1, 0]))
-        else:
-            import multiprocessing
-            n_cpu = min(multiprocessing.cpu_count(), n_cpu)
-            queue = multiprocessing.Queue()
-            size = n_modes // n_cpu
-            for i in range(n_cpu):
-                if n_cpu - i == 1:
-                    indices = modes.getIndices()[i*size:]
-                else:
-                    indices = modes.getIndices()[i*size:(i+1)*size]
-                process = multiprocessing.Process(
-                    target=_crossCorrelations,
-                    args=(queue, n_atoms, array, variances, indices))
-                process.start()
-            while queue.qsize() < n_cpu:
-                time.sleep(0.05)
-            covariance = queue.get()
-            while queue.qsize() > 0:
-                covariance += queue.get()
+        V, W, _, n_atoms = _getModeProperties(modes)
+        # trace of a 3x3 block is the sum of covariances of x, y, and z 
+        # components, which is obtained at once by placing them side by side
+        array = np.reshape(V, (n_atoms, -1))
+        covariance = _calcCovariance(array, np.tile(np.diag(W), 3), n_cpu)
     else:
-        covariance = calcCovariance(modes)
+        covariance = calcCovariance(modes, n_cpu=n_cpu)
     if norm:
         diag = np.power(covariance.diagonal(), 0.5)
         D = np.outer(diag, diag)
@@ -454,17 +410,94 @@ def calcCrossCorr(modes, n_cpu=1, norm=True):
     return covariance
 
 
-def _crossCorrelations(queue, n_atoms, array, variances, indices):
-    """Calculate covariance-matrix for a subset of modes."""
+def _calcCovariance(array, variances, n_cpu=1):
+    """Returns ``array * variances * array.T`` calculated in blocks of rows, 
+    only for the upper triangle of the symmetric result.  When *n_cpu* is 
+    greater than 1, *array* and the result are placed in shared memory, and 
+    blocks are calculated by a pool of processes."""
+
+    n_rows = array.shape[0]
+    if n_cpu > 1:
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:
+            LOGGER.warning('multiprocessing.shared_memory is not available, '
+                           'n_cpu is set to 1')
+            n_cpu = 1
+
+    if n_cpu == 1:
+        n_blocks = max(1, min(n_rows // 512, 16))
+    else:
+        import multiprocessing
+        n_cpu = min(multiprocessing.cpu_count(), n_cpu)
+        n_blocks = min(n_rows, 8 * n_cpu)
+    # blocks have equal areas of the upper triangle
+    bounds = n_rows - np.sqrt(np.linspace(1, 0, n_blocks + 1)) * n_rows
+    bounds = np.unique(bounds.round().astype(int))
+    blocks = list(zip(bounds[:-1], bounds[1:]))
+
+    if n_cpu == 1:
+        covariance = np.empty((n_rows, n_rows))
+        for start, stop in blocks:
+            _calcCovarianceBlock(array, variances, start, stop, covariance)
+        return covariance
+
+    shape = array.shape
+    shm_array = shared_memory.SharedMemory(create=True, size=max(1, 8 * array.size))
+    shm_out = shared_memory.SharedMemory(create=True, size=max(1, 8 * n_rows * n_rows))
+    try:
+        np.ndarray(shape, float, buffer=shm_array.buf)[:] = array
+
+        pool = multiprocessing.Pool(n_cpu, initializer=_attachCovariance,
+                                    initargs=(shm_array.name, shape, shm_out.name, 
+                                              variances))
+        try:
+            pool.map(_fillCovarianceBlock, blocks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+        covariance = np.array(np.ndarray((n_rows, n_rows), float, buffer=shm_out.buf))
+    finally:
+        shm_array.close()
+        shm_array.unlink()
+        shm_out.close()
+        shm_out.unlink()
+    return covariance
+
+
+def _calcCovarianceBlock(array, variances, start, stop, out):
+    """Fills rows from *start* to *stop* of the upper triangle of *out* and 
+    the corresponding columns of its lower triangle.  Blocks of different 
+    rows do not overlap."""
+
+    block = np.dot(array[start:stop] * variances, array[start:].T)
+    out[start:stop, start:] = block
+    out[stop:, start:stop] = block[:, stop-start:].T
+
+
+_SHARED_COVARIANCE = None
+
+def _attachCovariance(array_name, shape, out_name, variances):
+    """Attaches a worker process to shared arrays of :func:`_calcCovariance`."""
+
+    from multiprocessing import shared_memory
+
+    global _SHARED_COVARIANCE
+    shm_array = shared_memory.SharedMemory(name=array_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    array = np.ndarray(shape, float, buffer=shm_array.buf)
+    out = np.ndarray((shape[0], shape[0]), float, buffer=shm_out.buf)
+    # references to shared memory blocks are kept for the lifetime of workers
+    _SHARED_COVARIANCE = (shm_array, shm_out, array, out, variances)
+
+
+def _fillCovarianceBlock(bounds):
+    """Fills a block of the shared covariance matrix."""
+
+    _, _, array, out, variances = _SHARED_COVARIANCE
+    _calcCovarianceBlock(array, variances, bounds[0], bounds[1], out)
 
-    n_modes = len(indices)
-    arvar = (array[:, indices] * variances[indices]).T.reshape((n_modes,
-                                                                n_atoms, 3))
-    array = array[:, indices].T.reshape((n_modes, n_atoms, 3))
-    covariance = np.tensordot(array.transpose(2, 0, 1),
-                              arvar.transpose(0, 2, 1),
-                              axes=([0, 1], [1, 0]))
-    queue.put(covariance)
 
 def calcDistFlucts(modes, n_cpu=1, norm=True):
     """Returns the matrix of distance fluctuations (i.e. an NxN matrix
@@ -498,16 +531,17 @@ def calcTempFactors(modes, atoms):
     return sqf * (expBetas.sum() / sqf.sum())
 
 
-def calcCovariance(modes):
+def calcCovariance(modes, n_cpu=1):
     """Returns covariance matrix calculated for given *modes*.
     This is 3Nx3N for 3-d models and NxN (equivalent to cross-correlations) 
-    for 1-d models such as GNM."""
+    for 1-d models such as GNM.  Multiple processors may be employed by 
+    passing ``n_cpu=2`` or more, as in :func:`.calcCrossCorr`."""
 
-    if isinstance(modes, NMA):
+    if isinstance(modes, NMA) and (n_cpu == 1 or modes._cov is not None):
         return modes.getCovariance()
     else:
         V, W, _, _ = _getModeProperties(modes)
-        return np.dot(V, np.dot(W, V.T))
+        return _calcCovariance(V, np.diag(W), n_cpu)
 
 
 def calcPairDeformationDist(model, coords, ind1, ind2, kbt=1.):                                       
@@ -9,10 +9,10 @@ from prody import LOGGER
 from prody.atomic import Atomic, AtomGroup
 from prody.proteins import parsePDB
 from prody.utilities import checkCoords, solveEig
-from prody.kdtree import KDTree
 
 from .nma import NMA, MaskedNMA
-from .gnm import GNMBase, checkENMParameters
+from .gnm import (GNMBase, checkENMParameters, findContacts, calcGammas,
+                  buildSparseKirchhoff, _sumContacts, _indexType)
 
 __all__ = ['ANM', 'MaskedANM', 'calcANM']
 
@@ -32,6 +32,7 @@ class ANMBase(NMA):
         self._cutoff = None
         self._gamma = None
         self._hessian = None
+        self._coords = None
         self._is3d = True
     
     def _clear(self):
@@ -88,12 +89,16 @@ class ANMBase(NMA):
             Scipy is not found, :class:`ImportError` is raised.
         :type sparse: bool
 
-        :arg kdtree: elect to use KDTree for building Hessian matrix,
-            default is **False** since KDTree method is slower
+        :arg kdtree: elect to use KDTree pair search for identifying
+            contacts, otherwise distances are calculated in blocks of rows,
+            default is **False**
         :type kdtree: bool
 
         Instances of :class:`Gamma` classes and custom functions are
-        accepted as *gamma* argument.
+        accepted as *gamma* argument.  Force constants of all contacts are
+        obtained with a single call that passes arrays of squared distances
+        and node indices.  Functions that do not accept arrays are called
+        for each contact separately.
 
         When Scipy is available, user can select to use sparse matrices for
         efficient usage of memory at the cost of computation speed.
@@ -131,69 +136,41 @@ class ANMBase(NMA):
             except ImportError:
                 raise ImportError('failed to import scipy.sparse, which  is '
                                   'required for sparse matrix calculations')
-            kirchhoff = scipy_sparse.lil_matrix((n_atoms, n_atoms))
-            hessian = scipy_sparse.lil_matrix((dof, dof))
+
+        kdtree = kwargs.get('kdtree', False)
+        if kdtree:
+            LOGGER.info('Using KDTree for building the Hessian.')
+        i, j, i2j, dist2 = findContacts(coords, cutoff, kdtree=kdtree)
+        g = calcGammas(gamma, dist2, i, j)
+
+        if sparse:
+            hessian = buildSparseHessian(i, j, i2j, dist2, g, n_atoms)
+            kirchhoff = buildSparseKirchhoff(i, j, g, n_atoms)
         else:
             kirchhoff = np.zeros((n_atoms, n_atoms), 'd')
             hessian = np.zeros((dof, dof), float)
 
-        if kwargs.get('kdtree', False):
-            LOGGER.info('Using KDTree for building the Hessian.')
-            kdtree = KDTree(coords)
-            kdtree.search(cutoff)
-            for i, j in kdtree.getIndices():
-                i2j = coords[j] - coords[i]
-                dist2 = np.dot(i2j, i2j)
-                g = gamma(dist2, i, j)
-                super_element = np.outer(i2j, i2j) * (- g / dist2)
-                res_i3 = i*3
-                res_i33 = res_i3+3
-                res_j3 = j*3
-                res_j33 = res_j3+3
-                hessian[res_i3:res_i33, res_j3:res_j33] = super_element
-                hessian[res_j3:res_j33, res_i3:res_i33] = super_element
-                hessian[res_i3:res_i33, res_i3:res_i33] = \
-                    hessian[res_i3:res_i33, res_i3:res_i33] - super_element
-                hessian[res_j3:res_j33, res_j3:res_j33] = \
-                    hessian[res_j3:res_j33, res_j3:res_j33] - super_element
-                kirchhoff[i, j] = -g
-                kirchhoff[j, i] = -g
-                kirchhoff[i, i] = kirchhoff[i, i] + g
-                kirchhoff[j, j] = kirchhoff[j, j] + g
-        else:
-            cutoff2 = cutoff * cutoff
-            for i in range(n_atoms):
-                res_i3 = i*3
-                res_i33 = res_i3+3
-                i_p1 = i+1
-                i2j_all = coords[i_p1:, :] - coords[i]
-                for j, dist2 in enumerate((i2j_all ** 2).sum(1)):
-                    if dist2 > cutoff2:
-                        continue
-                    i2j = i2j_all[j]
-                    j += i_p1
-                    g = gamma(dist2, i, j)
-                    res_j3 = j*3
-                    res_j33 = res_j3+3
-                    super_element = np.outer(i2j, i2j) * (- g / dist2)
-                    hessian[res_i3:res_i33, res_j3:res_j33] = super_element
-                    hessian[res_j3:res_j33, res_i3:res_i33] = super_element
-                    hessian[res_i3:res_i33, res_i3:res_i33] = \
-                        hessian[res_i3:res_i33, res_i3:res_i33] - super_element
-                    hessian[res_j3:res_j33, res_j3:res_j33] = \
-                        hessian[res_j3:res_j33, res_j3:res_j33] - super_element
-                    kirchhoff[i, j] = -g
-                    kirchhoff[j, i] = -g
-                    kirchhoff[i, i] = kirchhoff[i, i] + g
-                    kirchhoff[j, j] = kirchhoff[j, j] + g
+            # super elements of all contacts, i.e. -g/dist2 * outer(i2j, i2j)
+            super_elements = i2j[:, :, np.newaxis] * i2j[:, np.newaxis, :]
+            super_elements *= (-g / dist2)[:, np.newaxis, np.newaxis]
+            nodes = np.arange(n_atoms)
 
-        if sparse:
-            kirchhoff = kirchhoff.tocsr()
-            hessian = hessian.tocsr()
+            blocks = hessian.reshape((n_atoms, 3, n_atoms, 3))
+            blocks[i, :, j, :] = super_elements
+            blocks[j, :, i, :] = super_elements
+            for k in range(3):
+                for l in range(3):
+                    blocks[nodes, k, nodes, l] = \
+                        -_sumContacts(super_elements[:, k, l], i, j, n_atoms)
+
+            kirchhoff[i, j] = -g
+            kirchhoff[j, i] = -g
+            kirchhoff[nodes, nodes] = _sumContacts(g, i, j, n_atoms)
 
         LOGGER.report('Hessian was built in %.2fs.', label='_anm_hessian')
         self._kirchhoff = kirchhoff
         self._hessian = hessian
+        self._coords = coords.copy()
         self._n_atoms = n_atoms
         self._dof = dof
 
@@ -215,6 +192,19 @@ class ANMBase(NMA):
         :arg nproc: number of processors for thread pool limit,
             default is **0**, meaning don't impose limit
         :type nproc: int
+
+        :arg solver: eigensolver, one of ``'eigh'``, ``'eigsh'``,
+            ``'shift-invert'``, ``'lobpcg'``, or ``'randomized'``, default is
+            ``'eigh'`` for dense and ``'eigsh'`` for sparse Hessian matrices.
+            Iterative solvers are recommended for large sparse matrices when
+            a few modes are needed, see :func:`.solveEig` for other options.
+        :type solver: str
+
+        :arg deflate: project out the six rigid-body translations and
+            rotations, which are built analytically from the coordinates
+            used in :meth:`buildHessian`, so that only the requested non-zero
+            modes are calculated, default is **False**
+        :type deflate: bool
         """
 
         if self._hessian is None:
@@ -227,6 +217,13 @@ class ANMBase(NMA):
         assert isinstance(turbo, bool), 'turbo must be a boolean'
         self._clear()
         LOGGER.timeit('_anm_calc_modes')
+        if kwargs.pop('deflate', False):
+            coords = self._coords
+            if coords is None or coords.size != self._dof:
+                LOGGER.warning('Coordinates matching the Hessian are not '
+                               'available, rigid-body modes are not deflated.')
+            else:
+                kwargs['null_space'] = calcRigidBodyModes(coords)
         values, vectors, vars = solveEig(self._hessian, n_modes=n_modes, zeros=zeros, 
                                          turbo=turbo, expct_n_zeros=6, **kwargs)
         self._eigvals = values
@@ -248,6 +245,91 @@ class ANMBase(NMA):
         super(ANMBase, self).setEigens(vectors, values)
         
 
+def calcRigidBodyModes(coords):
+    """Returns an orthonormal basis for rigid-body translations and rotations
+    of *coords* as an array with shape ``(3*n_atoms, 6)``.  Fewer vectors are
+    returned for linear or single-point structures."""
+
+    coords = coords - coords.mean(0)
+    n_atoms = coords.shape[0]
+    modes = np.zeros((n_atoms, 3, 6))
+    for k in range(3):
+        modes[:, k, k] = 1.
+    x, y, z = coords.T
+    # rotations around x, y, and z axes, i.e. cross products of axes
+    # with position vectors
+    modes[:, 1, 3], modes[:, 2, 3] = -z, y
+    modes[:, 0, 4], modes[:, 2, 4] = z, -x
+    modes[:, 0, 5], modes[:, 1, 5] = -y, x
+    modes = modes.reshape((n_atoms * 3, 6))
+
+    u, s, _ = np.linalg.svd(modes, full_matrices=False)
+    return u[:, s > s.max() * 1e-8]
+
+
+def buildSparseHessian(i, j, i2j, dist2, gamma, n_atoms, chunk=65536):
+    """Returns Hessian matrix in CSR format for contacts between nodes *i*
+    and *j* with distance vectors *i2j*, squared distances *dist2*, and
+    force constants *gamma*.  COO triplets are written for *chunk* contacts
+    at a time into preallocated arrays, so that memory usage grows linearly
+    with the number of contacts and no dense matrix is formed."""
+
+    from scipy import sparse as scipy_sparse
+
+    n_pairs = len(i)
+    dof = n_atoms * 3
+    n_offdiag = n_pairs * 9
+    n_elements = n_offdiag * 2 + n_atoms * 9
+    itype = _indexType(dof, n_elements)
+    data = np.empty(n_elements, float)
+    rows = np.empty(n_elements, itype)
+    cols = np.empty(n_elements, itype)
+    diagonal = np.zeros((n_atoms, 9), float)
+
+    for start in range(0, n_pairs, chunk):
+        stop = min(start + chunk, n_pairs)
+        i_ = i[start:stop]
+        j_ = j[start:stop]
+        i2j_ = i2j[start:stop]
+        super_elements = i2j_[:, :, np.newaxis] * i2j_[:, np.newaxis, :]
+        super_elements *= (-gamma[start:stop] /
+                           dist2[start:stop])[:, np.newaxis, np.newaxis]
+        super_elements = super_elements.reshape((stop - start, 9))
+
+        upper = slice(start * 9, stop * 9)
+        lower = slice(n_offdiag + start * 9, n_offdiag + stop * 9)
+        data[upper] = data[lower] = super_elements.ravel()
+        rows[upper], cols[upper] = _blockIndices(i_, j_)
+        # super elements are symmetric, so swapping row and column indices
+        # gives the transposed block
+        rows[lower] = cols[upper]
+        cols[lower] = rows[upper]
+        for k in range(9):
+            diagonal[:, k] -= _sumContacts(super_elements[:, k], i_, j_,
+                                           n_atoms)
+
+    nodes = np.arange(n_atoms)
+    diag = slice(n_offdiag * 2, n_elements)
+    data[diag] = diagonal.ravel()
+    rows[diag], cols[diag] = _blockIndices(nodes, nodes)
+
+    hessian = scipy_sparse.coo_matrix((data, (rows, cols)),
+                                      shape=(dof, dof)).tocsr()
+    hessian.eliminate_zeros()
+    return hessian
+
+
+def _blockIndices(i, j):
+    """Returns row and column indices of the elements of 3x3 blocks at
+    block positions (*i*, *j*) in a 3N×3N matrix, in row-major order."""
+
+    offsets = np.arange(3)
+    rows = (i * 3)[:, np.newaxis, np.newaxis] + offsets[:, np.newaxis]
+    cols = (j * 3)[:, np.newaxis, np.newaxis] + offsets
+    rows, cols = np.broadcast_arrays(rows, cols)
+    return rows.ravel(), cols.ravel()
+
+
 class ANM(ANMBase, GNMBase):
 
     """Class for Anisotropic Network Model (ANM) analysis of proteins
@@ -273,9 +355,9 @@ class MaskedANM(ANM, MaskedNMA):
         ANM.__init__(self, name)
         MaskedNMA.__init__(self, name, mask, masked)
 
-    def calcModes(self, n_modes=20, zeros=False, turbo=True):
+    def calcModes(self, n_modes=20, zeros=False, turbo=True, **kwargs):
         self._maskedarray = None
-        super(MaskedANM, self).calcModes(n_modes, zeros, turbo)
+        super(MaskedANM, self).calcModes(n_modes, zeros, turbo, **kwargs)
 
     def _reset(self):
         super(MaskedANM, self)._reset()
@@ -28,14 +28,20 @@ from collections import defaultdict
 from os import chdir, listdir, mkdir, system
 from os.path import isdir
 from numpy import argsort, arange, array, c_, count_nonzero, hstack, mean, median, quantile, save, where
+from numpy import newaxis, repeat, vstack, zeros, zeros_like
+from numpy.linalg import norm
+from scipy.linalg import eigh, orth
+from scipy.sparse import csr_matrix
 from scipy.stats import zscore
 
 from prody import LOGGER
 from prody.atomic.functions import extendAtomicData
+from prody.utilities import solveEig, ZERO
+from prody.utilities.eigtools import _factorizeShifted, SIGMA
 from .anm import ANM
 from .gnm import GNM
 from prody.proteins import parsePDB, writePDB
-from .editing import reduceModel
+from .editing import reduceModel, _reduceModel
 from .plotting import showAtomicLines
 from .signature import ModeEnsemble, saveModeEnsemble
 from prody.utilities import which, isListLike
@@ -44,6 +50,16 @@ from . import matchModes
 __all__ = ['ESSA']
 
 
+_SCANNER = None
+
+def _initScanner(essa):
+    global _SCANNER
+    _SCANNER = essa
+
+def _scanResidue(arg):
+    return _SCANNER._perturbed(arg)
+
+
 class ESSA:
 
     '''
@@ -84,6 +100,13 @@ class ESSA:
         self._ref = None
         self._eigvals = None
         self._eigvecs = None
+        self._incremental = False
+        self._tol = None
+        self._maxiter = None
+        self._matrix = None
+        self._basis = None
+        self._solve = None
+        self._n_updated = 0
 
     def setSystem(self, atoms, **kwargs):
 
@@ -142,7 +165,7 @@ class ESSA:
                 tmp1 = {ch: ' '.join(rn) for ch, rn in tmp0.items()}
                 self._ligres_code[k] = ['chain {} and resnum {}'.format(ch, rn) for ch, rn in tmp1.items()]
 
-    def scanResidues(self, n_modes=10, enm='gnm', cutoff=None):
+    def scanResidues(self, n_modes=10, enm='gnm', cutoff=None, **kwargs):
 
         '''
         Scans residues to generate ESSA z-scores.
@@ -155,11 +178,30 @@ class ESSA:
 
         :arg cutoff: Cutoff distance (A) for pairwise interactions, default is 10 A for GNM and 15 A for ANM.
         :type cutoff: float
+
+        :arg incremental: If True, the modes of each perturbed model are obtained by updating the global modes of the reference model instead of diagonalizing the perturbed model.
+            The heavy atoms of a residue only change the rows and columns of the reduced Kirchhoff/Hessian for nearby residues, and this low-rank update is applied by Rayleigh-Ritz
+            steps in the subspace of the reference modes augmented with inverse iteration corrections of their residuals. A perturbed model is diagonalized exactly when the relative residual
+            of any updated mode still exceeds *tol* after *maxiter* corrections, default is False.
+        :type incremental: bool
+
+        :arg tol: Relative residual norm of the updated modes above which the perturbed model is diagonalized exactly, default is 1e-3.
+        :type tol: float
+
+        :arg maxiter: Maximum number of inverse iteration corrections for each perturbed model, default is 5.
+        :type maxiter: int
+
+        :arg n_jobs: Number of processes that scan residues in parallel, default is 1.
+        :type n_jobs: int
         '''
 
         self._n_modes = n_modes
         self._enm = enm
         self._cutoff = cutoff
+        self._incremental = kwargs.pop('incremental', False)
+        self._tol = kwargs.pop('tol', 1e-3)
+        self._maxiter = kwargs.pop('maxiter', 5)
+        n_jobs = kwargs.pop('n_jobs', 1)
 
         self._ensemble = ModeEnsemble('{}'.format(self._title))
         self._ensemble.setAtoms(self._ca)
@@ -171,10 +213,27 @@ class ESSA:
 
         # --- perturbed models --- #
 
+        resindices = self._ca.getResindices()
+        self._n_updated = 0
         LOGGER.progress(msg='', steps=(self._ca.numAtoms()))
-        for i, j in enumerate(self._ca.getResindices()):
-            LOGGER.update(step=i+1, msg='scanning residue {}'.format(i+1))
-            self._perturbed(j)
+        if n_jobs > 1:
+            from multiprocessing import Pool
+
+            chunksize = max(1, len(resindices) // (4 * n_jobs))
+            with Pool(n_jobs, initializer=_initScanner, initargs=(self,)) as pool:
+                results = pool.imap(_scanResidue, resindices, chunksize)
+                for i, result in enumerate(results):
+                    LOGGER.update(step=i+1, msg='scanning residue {}'.format(i+1))
+                    self._store(*result)
+        else:
+            for i, j in enumerate(resindices):
+                LOGGER.update(step=i+1, msg='scanning residue {}'.format(i+1))
+                self._store(*self._perturbed(j))
+
+        if self._incremental:
+            LOGGER.info('Modes of {} out of {} perturbed models were obtained by incremental updates.'
+                        .format(self._n_updated, len(resindices)))
+        self._matrix = self._basis = self._solve = None
 
         if self._lowmem:
             self._eigvals = array(self._eigvals)
@@ -233,31 +292,149 @@ class ESSA:
         else:
             self._ensemble.addModeSet(ca_enm[:])
 
+        # --- subspace of the reference modes for incremental updates --- #
+
+        self._matrix = self._basis = self._solve = None
+        if self._incremental:
+            if self._enm == 'gnm':
+                matrix = ca_enm.getKirchhoff()
+                n_zeros = 1
+            else:
+                matrix = ca_enm.getHessian()
+                n_zeros = 6
+
+            n_basis = min(n_zeros + 2 * self._n_modes, matrix.shape[0])
+            values, vectors, _ = solveEig(matrix, n_modes=n_basis, zeros=True)
+            if count_nonzero(values < ZERO) != n_zeros:
+                LOGGER.warning('Reference model does not have {} zero modes, '
+                               'perturbed models will be diagonalized exactly.'.format(n_zeros))
+                self._incremental = False
+            else:
+                self._matrix = csr_matrix(matrix)
+                self._basis = (values, vectors, n_zeros)
+
     def _perturbed(self, arg):
 
-        sel = 'calpha or resindex {}'.format(arg)
-        tmp = self._heavy.select(sel)
+        title = 'res_{}'.format(arg)
 
-        if self._enm == 'gnm':
-            tmp_enm = GNM('res_{}'.format(arg))
-            tmp_enm.buildKirchhoff(tmp, cutoff=self._cutoff)
+        result = self._updated(arg) if self._incremental else None
+        updated = result is not None
+        if updated:
+            values, vectors = result
+        else:
+            sel = 'calpha or resindex {}'.format(arg)
+            tmp = self._heavy.select(sel)
 
-        if self._enm == 'anm':
-            tmp_enm = ANM('res_{}'.format(arg))
-            tmp_enm.buildHessian(tmp, cutoff=self._cutoff)
+            if self._enm == 'gnm':
+                tmp_enm = GNM(title)
+                tmp_enm.buildKirchhoff(tmp, cutoff=self._cutoff)
 
-        tmp_enm_red, _ = reduceModel(tmp_enm, tmp, self._ca)
-        tmp_enm_red.calcModes(n_modes=self._n_modes)
-        tmp_enm_red.setTitle(tmp_enm_red.getTitle().split()[0])
+            if self._enm == 'anm':
+                tmp_enm = ANM(title)
+                tmp_enm.buildHessian(tmp, cutoff=self._cutoff)
+
+            tmp_enm_red, _ = reduceModel(tmp_enm, tmp, self._ca)
+            tmp_enm_red.calcModes(n_modes=self._n_modes)
+            values, vectors = tmp_enm_red.getEigvals(), tmp_enm_red.getEigvecs()
 
         if self._lowmem:
-            _, matched = matchModes(self._ref, tmp_enm_red)
-            self._eigvals.append(matched.getEigvals())
-            self._eigvecs.append(matched.getEigvecs())
+            tmp_enm = GNM(title) if self._enm == 'gnm' else ANM(title)
+            tmp_enm.setEigens(vectors, values)
+            _, matched = matchModes(self._ref, tmp_enm)
+            values, vectors = matched.getEigvals(), matched.getEigvecs()
+
+        return title, values, vectors, updated
+
+    def _store(self, title, values, vectors, updated):
+
+        if self._lowmem:
+            self._eigvals.append(values)
+            self._eigvecs.append(vectors)
+        else:
+            tmp_enm = GNM(title) if self._enm == 'gnm' else ANM(title)
+            tmp_enm.setEigens(vectors, values)
+            self._ensemble.addModeSet(tmp_enm[:])
+
+        self._labels.append(title)
+        self._n_updated += updated
+
+    def _localUpdate(self, arg):
+
+        '''
+        Returns the degrees of freedom of the residues in contact with the heavy atoms of residue *arg* 
+        and the change of the reduced Kirchhoff/Hessian for these degrees of freedom.
+        '''
+
+        side = self._heavy.select('resindex {} and not calpha'.format(arg))
+        if side is None:
+            return arange(0), zeros((0, 0))
+
+        ca = self._ca.getCoords()
+        sc = side.getCoords()
+        dist2 = ((sc[:, newaxis, :] - ca[newaxis, :, :]) ** 2).sum(2)
+        near = where((dist2 <= self._cutoff ** 2).any(0))[0]
+
+        # the reduced matrix of residues in contact with the heavy atoms, 
+        # less their own contributions, equals the change of the reduced matrix
+        system = zeros(len(near) + len(sc), bool)
+        system[:len(near)] = True
+        if self._enm == 'gnm':
+            local, base = GNM(), GNM()
+            local.buildKirchhoff(vstack((ca[near], sc)), cutoff=self._cutoff)
+            base.buildKirchhoff(ca[near], cutoff=self._cutoff)
+            update = _reduceModel(local.getKirchhoff(), system) - base.getKirchhoff()
+            dofs = near
         else:
-            self._ensemble.addModeSet(tmp_enm_red[:])
+            local, base = ANM(), ANM()
+            local.buildHessian(vstack((ca[near], sc)), cutoff=self._cutoff)
+            base.buildHessian(ca[near], cutoff=self._cutoff)
+            update = _reduceModel(local.getHessian(), repeat(system, 3)) - base.getHessian()
+            dofs = (3 * near[:, newaxis] + arange(3)).flatten()
+
+        return dofs, update
+
+    def _updated(self, arg):
+
+        '''
+        Returns eigenvalues and eigenvectors of the perturbed model for residue *arg* obtained by 
+        updating the reference modes, or None if the residuals of the updated modes exceed the tolerance.
+        '''
 
-        self._labels.append(tmp_enm_red.getTitle())
+        values, vectors, n_zeros = self._basis
+        modes = slice(n_zeros, n_zeros + self._n_modes)
+        dofs, update = self._localUpdate(arg)
+        if not len(dofs):
+            return values[modes], vectors[:, modes]
+
+        if self._solve is None:
+            self._solve = _factorizeShifted(self._matrix, SIGMA)
+
+        # Rayleigh-Ritz steps in the subspace of the reference modes, which 
+        # is augmented with inverse iteration corrections of the residuals
+        Q = vectors
+        MQ = vectors * values
+        MQ[dofs] += update.dot(vectors[dofs])
+        for i in range(self._maxiter + 1):
+            A = Q.T.dot(MQ)
+            theta, C = eigh((A + A.T) / 2)
+            theta, C = theta[modes], C[:, modes]
+
+            Y = Q.dot(C)
+            R = MQ.dot(C) - Y * theta
+            residuals = norm(R, axis=0) / theta
+            if residuals.max() <= self._tol:
+                return theta, Y
+            if i == self._maxiter:
+                return None
+
+            Z = self._solve(R)
+            for _ in range(2):
+                Z -= Q.dot(Q.T.dot(Z))
+            Z = orth(Z)
+            MZ = self._matrix.dot(Z)
+            MZ[dofs] += update.dot(Z[dofs])
+            Q = hstack((Q, Z))
+            MQ = hstack((MQ, MZ))
 
     def getESSAZscores(self):
 
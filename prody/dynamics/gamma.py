@@ -27,7 +27,12 @@ class Gamma(object):
 
         For efficiency purposes square of the distance between interacting
         atom/residue (node) pairs is passed to this function. In addition,
-        node indices are passed."""
+        node indices are passed.
+
+        When Hessian and Kirchhoff matrices are built, all contacts are
+        evaluated in a single call, i.e. *dist2*, *i*, and *j* are arrays
+        of equal length and an array of force constants is expected.
+        Derived classes should support both scalar and array arguments."""
 
         pass
 
@@ -180,22 +185,21 @@ class GammaStructureBased(Gamma):
     def gamma(self, dist2, i, j):
         """Returns force constant."""
 
-        if dist2 <= 16:
-            return self._connected
-        sstr = self._sstr
-        ssid = self._ssid
-        rnum = self._rnum
+        dist2 = np.asarray(dist2)
+        sstr_i = self._sstr[i]
+        sstr_j = self._sstr[j]
         # if residues are in the same secondary structure element
-        if ssid[i] == ssid[j]:
-            i_j = abs(rnum[j] - rnum[i])
-            if ((i_j <= 4 and sstr[i] == 'H') or
-                    (i_j <= 3 and sstr[i] == 'G') or
-                    (i_j <= 5 and sstr[i] == 'I')) and dist2 <= 49:
-                return self._helix
-        elif sstr[i] == sstr[j] == 'E' and dist2 <= 36:
-            return self._sheet
+        same = self._ssid[i] == self._ssid[j]
+        i_j = np.abs(self._rnum[j] - self._rnum[i])
+        helix = same & (dist2 <= 49) & (((i_j <= 4) & (sstr_i == 'H')) |
+                                        ((i_j <= 3) & (sstr_i == 'G')) |
+                                        ((i_j <= 5) & (sstr_i == 'I')))
+        sheet = ~same & (sstr_i == 'E') & (sstr_j == 'E') & (dist2 <= 36)
 
-        return self._gamma
+        gamma = np.where(helix, self._helix,
+                         np.where(sheet, self._sheet, self._gamma))
+        gamma = np.where(dist2 <= 16, self._connected, gamma)
+        return gamma[()]
 
 
 class GammaVariableCutoff(Gamma):
@@ -289,16 +293,15 @@ class GammaVariableCutoff(Gamma):
         cutoff = (self._radii[i] + self._radii[j])
         cutoff2 = cutoff ** 2
 
-        if dist2 < cutoff2:
-            gamma = self._gamma
-        else:
-            gamma = 0
+        gamma = np.where(dist2 < cutoff2, self._gamma, 0.)
         if self._debug:
-            print(' '.join([self._identifiers[i] + '_' + str(i), '--',
-                  self._identifiers[j] + '_' + str(j),
-                  'effective cutoff:', str(cutoff), 'distance:',
-                  str(dist2**0.5), 'gamma:', str(gamma)]))  # PY3K: OK
-        return gamma
+            for d2, i_, j_, c, g in zip(*np.broadcast_arrays(dist2, i, j,
+                                                             cutoff, gamma)):
+                print(' '.join([self._identifiers[i_] + '_' + str(i_), '--',
+                      self._identifiers[j_] + '_' + str(j_),
+                      'effective cutoff:', str(c), 'distance:',
+                      str(d2**0.5), 'gamma:', str(g)]))  # PY3K: OK
+        return gamma[()]
 
 
 class GammaED(Gamma):
@@ -412,11 +415,8 @@ class GammaED(Gamma):
         Cseq = self._Cseq
         Slim = self._Slim
 
-        S = abs(i-j)
-        if S <= Slim:
-            return Cseq/(S**2)
-        else:
-            dist = dist2**0.5
-            return (Ccart/dist)**Ex
+        S = np.abs(np.subtract(i, j, dtype=float))
+        dist = np.sqrt(dist2)
+        return np.where(S <= Slim, Cseq/(S**2), (Ccart/dist)**Ex)[()]
 
 GammaGOdMD = GammaED
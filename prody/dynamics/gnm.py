@@ -111,13 +111,17 @@ class GNMBase(NMA):
             Scipy is not found, :class:`ImportError` is raised.
         :type sparse: bool
 
-        :arg kdtree: elect to use KDTree for building Kirchhoff matrix faster,
+        :arg kdtree: elect to use KDTree pair search for identifying
+            contacts, otherwise distances are calculated in blocks of rows,
             default is **True**
         :type kdtree: bool
 
 
         Instances of :class:`Gamma` classes and custom functions are
-        accepted as *gamma* argument.
+        accepted as *gamma* argument.  Force constants of all contacts are
+        obtained with a single call that passes arrays of squared distances
+        and node indices.  Functions that do not accept arrays are called
+        for each contact separately.
 
         When Scipy is available, user can select to use sparse matrices for
         efficient usage of memory at the cost of computation speed."""
@@ -146,43 +150,22 @@ class GNMBase(NMA):
             except ImportError:
                 raise ImportError('failed to import scipy.sparse, which  is '
                                   'required for sparse matrix calculations')
-            kirchhoff = scipy_sparse.lil_matrix((n_atoms, n_atoms))
-        else:
-            kirchhoff = np.zeros((n_atoms, n_atoms), 'd')
 
-        if kwargs.get('kdtree', True):
-            kdtree = KDTree(coords)
-            kdtree.search(cutoff)
-            dist2 = kdtree.getDistances() ** 2
-            r = 0
-            for i, j in kdtree.getIndices():
-                g = gamma(dist2[r], i, j)
-                kirchhoff[i, j] = -g
-                kirchhoff[j, i] = -g
-                kirchhoff[i, i] = kirchhoff[i, i] + g
-                kirchhoff[j, j] = kirchhoff[j, j] + g
-                r += 1
-        else:
+        kdtree = kwargs.get('kdtree', True)
+        if not kdtree:
             LOGGER.info('Using slower method for building the Kirchhoff.')
-            cutoff2 = cutoff * cutoff
-            mul = np.multiply
-            for i in range(n_atoms):
-                xyz_i = coords[i, :]
-                i_p1 = i+1
-                i2j = coords[i_p1:, :] - xyz_i
-                mul(i2j, i2j, i2j)
-                for j, dist2 in enumerate(i2j.sum(1)):
-                    if dist2 > cutoff2:
-                        continue
-                    j += i_p1
-                    g = gamma(dist2, i, j)
-                    kirchhoff[i, j] = -g
-                    kirchhoff[j, i] = -g
-                    kirchhoff[i, i] = kirchhoff[i, i] + g
-                    kirchhoff[j, j] = kirchhoff[j, j] + g
+        i, j, i2j, dist2 = findContacts(coords, cutoff, kdtree=kdtree)
+        del i2j
+        g = calcGammas(gamma, dist2, i, j)
 
         if sparse:
-            kirchhoff = kirchhoff.tocsr()
+            kirchhoff = buildSparseKirchhoff(i, j, g, n_atoms)
+        else:
+            kirchhoff = np.zeros((n_atoms, n_atoms), 'd')
+            kirchhoff[i, j] = -g
+            kirchhoff[j, i] = -g
+            kirchhoff[np.diag_indices(n_atoms)] = \
+                _sumContacts(g, i, j, n_atoms)
 
         LOGGER.debug('Kirchhoff was built in {0:.2f}s.'
                      .format(time.time()-start))
@@ -205,6 +188,17 @@ class GNMBase(NMA):
         :arg turbo: Use a memory intensive, but faster way to calculate modes.
         :type turbo: bool, default is **True**
 
+        :arg solver: eigensolver, one of ``'eigh'``, ``'eigsh'``,
+            ``'shift-invert'``, ``'lobpcg'``, or ``'randomized'``, default is
+            ``'eigh'`` for dense and ``'eigsh'`` for sparse Kirchhoff matrices.
+            Iterative solvers are recommended for large sparse matrices when
+            a few modes are needed, see :func:`.solveEig` for other options.
+        :type solver: str
+
+        :arg deflate: project out the constant vector, which spans the null
+            space of the Kirchhoff matrix, so that only the requested non-zero
+            modes are calculated, default is **False**
+        :type deflate: bool
         """
 
         if self._kirchhoff is None:
@@ -217,6 +211,8 @@ class GNMBase(NMA):
         assert isinstance(turbo, bool), 'turbo must be a boolean'
         self._clear()
         LOGGER.timeit('_gnm_calc_modes')
+        if kwargs.pop('deflate', False):
+            kwargs['null_space'] = np.ones(self._dof) / np.sqrt(self._dof)
         values, vectors, vars = solveEig(self._kirchhoff, n_modes=n_modes, zeros=zeros, 
                                          turbo=turbo, expct_n_zeros=1, **kwargs)
 
@@ -309,6 +305,120 @@ def checkENMParameters(cutoff, gamma):
     return cutoff, gamma, gamma_func
 
 
+def findContacts(coords, cutoff, kdtree=True):
+    """Returns node pairs that are within *cutoff* distance of each other.
+    Four arrays are returned, i.e. indices *i* and *j* of interacting nodes,
+    their distance vectors ``coords[j] - coords[i]``, and their squared
+    distances.  Pairs are sorted by *i* and then by *j* and ``i < j`` holds
+    for all pairs.
+
+    :arg coords: coordinate array with shape ``(n_atoms, 3)``
+    :type coords: :class:`numpy.ndarray`
+
+    :arg cutoff: cutoff distance (Å) for pairwise interactions
+    :type cutoff: float
+
+    :arg kdtree: elect to use a :class:`.KDTree` pair search for identifying
+        contacts, otherwise distances are calculated in blocks of rows,
+        default is **True**
+    :type kdtree: bool"""
+
+    n_atoms = coords.shape[0]
+    cutoff2 = cutoff * cutoff
+    if kdtree:
+        # search slightly beyond cutoff, since KDTree calculates distances
+        # in single precision, exact distances are compared below
+        tree = KDTree(coords)
+        tree.search(cutoff * (1 + 1e-5) + 1e-3)
+        pairs = tree.getIndices()
+        if pairs is None:
+            pairs = np.zeros((0, 2), int)
+        pairs.sort(1)
+        i = pairs[:, 0]
+        j = pairs[:, 1]
+    else:
+        i = []
+        j = []
+        step = max(1, (1 << 20) // max(n_atoms, 1))
+        for start in range(0, n_atoms, step):
+            stop = min(start + step, n_atoms)
+            i2j = coords[np.newaxis, :, :] - coords[start:stop, np.newaxis, :]
+            dist2 = (i2j ** 2).sum(2)
+            dist2[np.tril_indices(stop - start, k=start, m=n_atoms)] = np.inf
+            which = np.nonzero(dist2 <= cutoff2)
+            i.append(which[0] + start)
+            j.append(which[1])
+        i = np.concatenate(i) if i else np.zeros(0, int)
+        j = np.concatenate(j) if j else np.zeros(0, int)
+
+    i2j = coords[j] - coords[i]
+    dist2 = (i2j ** 2).sum(1)
+    which = dist2 <= cutoff2
+    order = np.lexsort((j[which], i[which]))
+    return (i[which][order], j[which][order], i2j[which][order],
+            dist2[which][order])
+
+
+def calcGammas(gamma, dist2, i, j):
+    """Returns an array of force constants for contacts between nodes *i* and
+    *j* at squared distances *dist2*.  *gamma* is called once with arrays of
+    all contacts, and if it does not support array arguments, it is called
+    for each contact separately."""
+
+    n_pairs = len(dist2)
+    try:
+        g = np.asarray(gamma(dist2, i, j), float)
+        if g.ndim > 1 or g.size not in (1, n_pairs):
+            raise ValueError('gamma returned an array of incorrect shape')
+        g = np.broadcast_to(g, (n_pairs,)).copy()
+    except (ValueError, TypeError, IndexError):
+        g = np.array([gamma(d, i_, j_) for d, i_, j_ in zip(dist2, i, j)],
+                     float)
+    return g
+
+
+def buildSparseKirchhoff(i, j, gamma, n_atoms):
+    """Returns Kirchhoff matrix in CSR format for contacts between nodes *i*
+    and *j* with force constants *gamma*.  The matrix is built directly from
+    COO triplets, without forming a dense or a LIL matrix."""
+
+    from scipy import sparse as scipy_sparse
+
+    n_pairs = len(i)
+    n_elements = n_pairs * 2 + n_atoms
+    itype = _indexType(n_atoms, n_elements)
+    data = np.empty(n_elements, float)
+    rows = np.empty(n_elements, itype)
+    cols = np.empty(n_elements, itype)
+
+    data[:n_pairs] = data[n_pairs:2*n_pairs] = -gamma
+    rows[:n_pairs] = cols[n_pairs:2*n_pairs] = i
+    cols[:n_pairs] = rows[n_pairs:2*n_pairs] = j
+    data[2*n_pairs:] = _sumContacts(gamma, i, j, n_atoms)
+    rows[2*n_pairs:] = cols[2*n_pairs:] = np.arange(n_atoms)
+
+    kirchhoff = scipy_sparse.coo_matrix((data, (rows, cols)),
+                                        shape=(n_atoms, n_atoms)).tocsr()
+    kirchhoff.eliminate_zeros()
+    return kirchhoff
+
+
+def _indexType(size, n_elements):
+    """Returns the smallest integer type suitable for indexing a sparse matrix
+    of given *size* with *n_elements* stored elements."""
+
+    if max(size, n_elements) < np.iinfo(np.int32).max:
+        return np.int32
+    return np.int64
+
+
+def _sumContacts(values, i, j, n_atoms):
+    """Returns sums of *values* over contacts of each node."""
+
+    return (np.bincount(i, values, minlength=n_atoms) +
+            np.bincount(j, values, minlength=n_atoms))
+
+
 class GNM(GNMBase):
 
     """A class for Gaussian Network Model (GNM) analysis of proteins
@@ -332,9 +442,9 @@ class MaskedGNM(GNM, MaskedNMA):
         GNM.__init__(self, name)
         MaskedNMA.__init__(self, name, mask, masked)
 
-    def calcModes(self, n_modes=20, zeros=False, turbo=True):
+    def calcModes(self, n_modes=20, zeros=False, turbo=True, **kwargs):
         self._maskedarray = None
-        super(MaskedGNM, self).calcModes(n_modes, zeros, turbo)
+        super(MaskedGNM, self).calcModes(n_modes, zeros, turbo, **kwargs)
 
     def _reset(self):
         super(MaskedGNM, self)._reset()
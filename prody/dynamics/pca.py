@@ -2,6 +2,7 @@
 """This module defines classes for principal component analysis (PCA) and
 essential dynamics analysis (EDA) calculations."""
 
+import os
 import time
 
 import numpy as np
@@ -20,6 +21,281 @@ if PY2K:
 __all__ = ['PCA', 'EDA']
 
 
+class _CovarianceAccumulator(object):
+
+    """Accumulates the covariance of coordinate sets given in blocks.  Mean
+    and scatter matrix of each block are merged with those of previous blocks
+    (Chan et al. 1979), and scatter matrix is updated in tiles of rows, so
+    that only a tile sized temporary is needed besides the block itself.
+    Tiles are always calculated in double precision and added to the scatter
+    matrix once per block, so when *dtype* is single precision rounding
+    errors grow with the number of blocks rather than coordinate sets and
+    no storage is needed besides the single precision matrix.  Scatter
+    matrix is stored in a memory-mapped ``.npy`` file, when *filename* is
+    given."""
+
+    def __init__(self, dof, dtype=float, filename=None, tile=2**24):
+
+        self._dof = dof
+        self._dtype = np.dtype(dtype)
+        self._filename = filename
+        self._rows = max(1, tile // dof)
+        self._n = 0
+        self._mean = np.zeros(dof)
+        self._scatter = self._allocate(filename)
+
+    def _allocate(self, filename):
+
+        shape = (self._dof, self._dof)
+        if filename is None:
+            return np.zeros(shape, self._dtype)
+        return np.lib.format.open_memmap(filename, 'w+', self._dtype, shape)
+
+    def numCoordsets(self):
+
+        return self._n
+
+    def update(self, block):
+        """Adds coordinate sets in *block*, an array with shape
+        ``(n_csets, dof)``."""
+
+        block = np.asarray(block, float)
+        m = block.shape[0]
+        if not m:
+            return
+
+        n = self._n + m
+        mean = block.mean(0)
+        deviations = block - mean
+        delta = mean - self._mean
+        weight = self._n * m / float(n)
+
+        for start in range(0, self._dof, self._rows):
+            rows = slice(start, start + self._rows)
+            tile = np.dot(deviations[:, rows].T, deviations)
+            tile += np.outer(delta[rows] * weight, delta)
+            self._scatter[rows] += tile
+
+        self._mean += delta * (m / float(n))
+        self._n = n
+
+    def getMean(self):
+
+        return self._mean.copy()
+
+    def getCovariance(self):
+        """Returns the covariance matrix with the precision of the
+        accumulator.  It replaces the scatter matrix in place, so no more
+        coordinate sets can be added."""
+
+        for start in range(0, self._dof, self._rows):
+            rows = slice(start, start + self._rows)
+            self._scatter[rows] /= self._n
+        if self._filename is not None:
+            self._scatter.flush()
+        return self._scatter
+
+    def save(self, filename, **kwargs):
+        """Saves the state to *filename* in :file:`.npz` format, with
+        *kwargs* describing the data source.  Memory-mapped arrays are
+        flushed and referenced by their file names."""
+
+        arrays = dict(kwargs, n=self._n, mean=self._mean,
+                      dtype=self._dtype.str, dof=self._dof)
+        if self._filename is None:
+            arrays['scatter'] = self._scatter
+        else:
+            self._scatter.flush()
+            arrays['filename'] = self._filename
+        # write to a temporary file first, so that an interrupted write
+        # does not corrupt the previous checkpoint
+        temp = filename + '.tmp.npz'
+        np.savez(temp, **arrays)
+        os.replace(temp, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """Returns the accumulator saved in *filename* and a dictionary of
+        other data saved with it."""
+
+        data = dict(np.load(filename))
+        acc = cls.__new__(cls)
+        acc._dof = int(data.pop('dof'))
+        acc._dtype = np.dtype(str(data.pop('dtype')))
+        acc._rows = max(1, 2**24 // acc._dof)
+        acc._n = int(data.pop('n'))
+        acc._mean = data.pop('mean')
+        if 'filename' in data:
+            acc._filename = str(data.pop('filename'))
+            acc._scatter = np.load(acc._filename, mmap_mode='r+')
+        else:
+            acc._filename = None
+            acc._scatter = data.pop('scatter')
+        return acc, data
+
+
+def _describeTrajectory(trajectory, aligned):
+    """Returns a dictionary describing the data read from *trajectory* that
+    a checkpoint must match to be resumed: number of frames, paths and sizes
+    of files, and digests of selected atom indices and of reference
+    coordinates and weights used for superposition."""
+
+    from hashlib import sha1
+
+    try:
+        paths = trajectory.getFilenames(absolute=True)
+    except AttributeError:
+        paths = [trajectory.getFilename(absolute=True)]
+    files = ['{0}:{1}'.format(path, os.path.getsize(path)
+                              if os.path.isfile(path) else -1)
+             for path in paths]
+
+    digest = sha1()
+    indices = trajectory._indices
+    if indices is not None:
+        digest.update(np.asarray(indices, np.int64).tobytes())
+    reference = sha1()
+    coords = trajectory._getCoords()
+    if coords is not None:
+        reference.update(np.asarray(coords, float).tobytes())
+    weights = trajectory._getWeights()
+    if weights is not None:
+        reference.update(np.asarray(weights, float).tobytes())
+    return dict(n_frames=len(trajectory), aligned=bool(aligned),
+                files='\n'.join(files), selection=digest.hexdigest(),
+                reference=reference.hexdigest())
+
+
+def _iterBlocks(coordsets, chunk=256, align=True, label=None):
+    """Yield coordinate sets of *coordsets* as ``(n_csets, dof)`` arrays of
+    at most *chunk* rows.  Frames of trajectories are superposed onto the
+    reference coordinates, unless *align* is **False**."""
+
+    if isinstance(coordsets, TrajBase):
+        n_csets = len(coordsets)
+        dof = coordsets.numSelected() * 3
+    else:
+        n_csets = coordsets.shape[0]
+        dof = coordsets.shape[1] * 3
+    if label is not None:
+        LOGGER.progress(label, n_csets, '_prody_pca_blocks')
+
+    if isinstance(coordsets, TrajBase):
+        nfi = coordsets.nextIndex()
+        coordsets.reset()
+        n_done = 0
+        try:
+            for block in coordsets.iterChunks(chunk, align=align):
+                yield block.reshape((-1, dof))
+                n_done += len(block)
+                if label is not None:
+                    LOGGER.update(n_done, label='_prody_pca_blocks')
+        finally:
+            coordsets.goto(nfi)
+    else:
+        for i in range(0, n_csets, chunk):
+            yield np.asarray(coordsets[i:i+chunk], float).reshape((-1, dof))
+            if label is not None:
+                LOGGER.update(min(i + chunk, n_csets), label='_prody_pca_blocks')
+    if label is not None:
+        LOGGER.finish()
+
+
+def _incrementalSVD(blocks, n_modes, oversampling=10):
+    """Return variances, principal directions (as columns), and total
+    variance of data yielded by *blocks*.  The truncated SVD of the centered
+    data is updated one block at a time, keeping *n_modes* plus
+    *oversampling* singular triplets between updates.  Mean shifts between
+    blocks are accounted for as described in [DR08]_.
+
+    .. [DR08] Ross DA, Lim J, Lin RS, Yang MH. Incremental learning for
+       robust visual tracking. *Int J Comput Vis* **2008** 77:125-141."""
+
+    linalg = importLA()
+
+    n_keep = n_modes + oversampling
+    n_csets = 0
+    mean = None
+    sumsq = 0.
+    values = vectors = None
+    for block in blocks:
+        n_block = block.shape[0]
+        block_mean = block.mean(0)
+        deviations = block - block_mean
+        sumsq += deviations.ravel().dot(deviations.ravel())
+        if n_csets:
+            scale = (n_csets * n_block / float(n_csets + n_block)) ** 0.5
+            shift = scale * (mean - block_mean)
+            deviations = np.concatenate([values[:, None] * vectors,
+                                         deviations, shift[None, :]])
+            sumsq += (shift ** 2).sum()
+            mean += (block_mean - mean) * (n_block / float(n_csets + n_block))
+        else:
+            mean = block_mean
+        _, values, vectors = linalg.svd(deviations, full_matrices=False)
+        values = values[:n_keep]
+        vectors = vectors[:n_keep]
+        n_csets += n_block
+
+    if n_csets <= 3:
+        raise ValueError('coordsets must have more than 3 coordinate sets')
+    return ((values[:n_modes] ** 2) / n_csets, vectors[:n_modes].T,
+            sumsq / n_csets)
+
+
+def _randomizedSVD(blocks, dof, n_modes, oversampling=10, n_iter=3, seed=None):
+    """Return variances, principal directions (as columns), and total
+    variance of data yielded by calls to *blocks*, using randomized range
+    finding with *n_iter* power iterations [HMT11]_.  Data is read
+    ``n_iter + 1`` times and the covariance matrix is applied to a
+    ``dof`` by ``n_modes + oversampling`` basis without being formed.
+
+    .. [HMT11] Halko N, Martinsson PG, Tropp JA. Finding structure with
+       randomness: probabilistic algorithms for constructing approximate
+       matrix decompositions. *SIAM Rev* **2011** 53(2):217-288."""
+
+    linalg = importLA()
+
+    n_basis = min(n_modes + oversampling, dof)
+    basis = np.random.RandomState(seed).standard_normal((dof, n_basis))
+
+    # the first pass finds the mean as well, data is shifted by the first
+    # coordinate set to avoid cancellation when it is subtracted
+    n_csets = 0
+    origin = None
+    total = np.zeros(dof)
+    sumsq = 0.
+    image = np.zeros((dof, n_basis))
+    for block in blocks():
+        if origin is None:
+            origin = block[0].copy()
+        block = block - origin
+        total += block.sum(0)
+        sumsq += block.ravel().dot(block.ravel())
+        image += np.dot(block.T, np.dot(block, basis))
+        n_csets += block.shape[0]
+    if n_csets <= 3:
+        raise ValueError('coordsets must have more than 3 coordinate sets')
+    shift = total / n_csets
+    image -= n_csets * np.outer(shift, np.dot(shift, basis))
+    image /= n_csets
+    mean = origin + shift
+
+    for i in range(max(n_iter, 1)):
+        basis = linalg.qr(image, mode='economic')[0]
+        image = np.zeros((dof, n_basis))
+        for block in blocks():
+            block = block - mean
+            image += np.dot(block.T, np.dot(block, basis))
+        image /= n_csets
+
+    projected = np.dot(basis.T, image)
+    values, vectors = linalg.eigh((projected + projected.T) / 2)
+    order = values.argsort()[::-1][:n_modes]
+    return (values[order], np.dot(basis, vectors[:, order]),
+            sumsq / n_csets - np.dot(shift, shift))
+
+
 class PCA(NMA):
 
     """A class for Principal Component Analysis (PCA) of conformational
@@ -73,6 +349,26 @@ class PCA(NMA):
         coordinate set (see :meth:`.Frame.superpose`).  If frames are already
         aligned, use ``aligned=True`` argument to skip this step.
 
+        For trajectory objects and single precision coordinate arrays, 
+        covariance is accumulated from blocks of *chunk* frames (default 256) 
+        using matrix products.  Following arguments control the accumulation:
+
+        :arg dtype: precision of the accumulated and returned matrix,
+            ``numpy.float32`` halves the memory, default is ``float``
+        :type dtype: :class:`numpy.dtype`
+
+        :arg memmap: name of a :file:`.npy` file to store the matrix as a 
+            memory-mapped array, when it does not fit in memory
+        :type memmap: str
+
+        :arg checkpoint: name of a :file:`.npz` file where the state is saved 
+            every *checkpoint_interval* frames (default 10000) of a trajectory.
+            If the file exists, calculation resumes from the saved state,
+            unless it was saved for different trajectory files, atoms or
+            reference coordinates.  It is removed when the covariance matrix
+            is built.
+        :type checkpoint: str
+
 
         .. note::
            If *coordsets* is a :class:`.PDBEnsemble` instance, coordinates are
@@ -108,34 +404,55 @@ class PCA(NMA):
             coordsets.reset()
             n_atoms = coordsets.numSelected()
             dof = n_atoms * 3
-            cov = np.zeros((dof, dof))
-            #mean = coordsets._getCoords().flatten()
-            n_confs = 0
             n_frames = len(coordsets)
+            align = not kwargs.get('aligned', False)
+            chunk = int(kwargs.get('chunk', 256))
+            dtype = np.dtype(kwargs.get('dtype', float))
+            memmap = kwargs.get('memmap', None)
+            checkpoint = kwargs.get('checkpoint', None)
+            interval = int(kwargs.get('checkpoint_interval', 10000))
+            if checkpoint is not None and not checkpoint.endswith('.npz'):
+                checkpoint += '.npz'
+
+            source = _describeTrajectory(coordsets, not align)
+            accumulator = None
+            if checkpoint is not None and os.path.isfile(checkpoint):
+                accumulator, saved = _CovarianceAccumulator.load(checkpoint)
+                if (accumulator._dof != dof or accumulator._dtype != dtype or
+                    any(key not in saved or str(saved[key]) != str(value)
+                        for key, value in source.items())):
+                    LOGGER.warning('Checkpoint {0} does not match the trajectory, '
+                                   'covariance will be calculated from the '
+                                   'first frame.'.format(checkpoint))
+                    accumulator = None
+                else:
+                    coordsets.goto(accumulator.numCoordsets())
+                    if not quiet:
+                        LOGGER.info('Resuming from frame {0} using checkpoint {1}.'
+                                    .format(accumulator.numCoordsets(), checkpoint))
+            if accumulator is None:
+                accumulator = _CovarianceAccumulator(dof, dtype, memmap)
+
             if not quiet:
                 LOGGER.info('Covariance will be calculated using {0} frames.'
                             .format(n_frames))
-            coordsum = np.zeros(dof)
-            if not quiet:
                 LOGGER.progress('Building covariance', n_frames, '_prody_pca')
-            align = not kwargs.get('aligned', False)
-            for frame in coordsets:
-                if align:
-                    frame.superpose()
-                coords = frame._getCoords().flatten()
-                coordsum += coords
-                cov += np.outer(coords, coords)
-                n_confs += 1
+            n_saved = accumulator.numCoordsets()
+            for block in coordsets.iterChunks(chunk, align=align):
+                accumulator.update(block.reshape((-1, dof)))
+                n_confs = accumulator.numCoordsets()
                 if not quiet:
                     LOGGER.update(n_confs, label='_prody_pca')
+                if checkpoint is not None and n_confs - n_saved >= interval:
+                    accumulator.save(checkpoint, **source)
+                    n_saved = n_confs
             if not quiet:
                 LOGGER.finish()
-            cov /= n_confs
-            coordsum /= n_confs
-            mean = coordsum
-            cov -= np.outer(coordsum, coordsum)
+            mean = accumulator.getMean()
             coordsets.goto(nfi)
-            self._cov = cov
+            self._cov = accumulator.getCovariance()
+            if checkpoint is not None and os.path.isfile(checkpoint):
+                os.remove(checkpoint)
             if update_coords:
                 coordsets.setCoords(mean.reshape((n_atoms, 3)))
         else:
@@ -156,21 +473,22 @@ class PCA(NMA):
                     self._cov = np.cov(coordsets.reshape((n_confs, dof)).T,
                                        bias=1)
                 else:
-                    cov = np.zeros((dof, dof))
-                    coordsets = coordsets.reshape((n_confs, dof))
-                    mean = coordsets.mean(0)
+                    coordsets = coordsets.reshape(s)
+                    chunk = int(kwargs.get('chunk', 256))
+                    accumulator = _CovarianceAccumulator(
+                        dof, kwargs.get('dtype', float), kwargs.get('memmap', None))
                     if not quiet:
                         LOGGER.progress('Building covariance', n_confs,
                                     '_prody_pca')
-                    for i, coords in enumerate(coordsets.reshape(s)):
-                        deviations = coords - mean
-                        cov += np.outer(deviations, deviations)
+                    for i in range(0, n_confs, chunk):
+                        accumulator.update(coordsets[i:i+chunk])
                         if not quiet:
-                            LOGGER.update(n_confs, label='_prody_pca')
+                            LOGGER.update(accumulator.numCoordsets(), 
+                                          label='_prody_pca')
                     if not quiet:
                         LOGGER.finish()
-                    cov /= n_confs
-                    self._cov = cov
+                    mean = accumulator.getMean().reshape((n_atoms, 3))
+                    self._cov = accumulator.getCovariance()
             else:
                 # PDB ensemble case
                 mean = np.zeros((n_atoms, 3))
@@ -227,7 +545,7 @@ class PCA(NMA):
             LOGGER.debug('{0} mode was calculated in {1:.2f}s.'
                      .format(self._n_modes, time.time()-start))
 
-    def performSVD(self, coordsets):
+    def performSVD(self, coordsets, **kwargs):
         """Calculate principal modes using singular value decomposition (SVD).
         *coordsets* argument may be a :class:`.Atomic`, :class:`.Ensemble`,
         or :class:`numpy.ndarray` instance.  If *coordsets* is a numpy array,
@@ -239,14 +557,50 @@ class PCA(NMA):
         an approximate method when heterogeneous datasets are analyzed.
         Covariance method should be preferred over this one for analysis of
         ensembles with missing atomic data.  See :ref:`pca-xray-calculations`
-        example for comparison of results from SVD and covariance methods."""
+        example for comparison of results from SVD and covariance methods.
+
+        *coordsets* may also be a :class:`.TrajBase` instance, such as
+        :class:`.DCDFile` or :class:`.Trajectory`, in which case a truncated
+        SVD is calculated reading frames in blocks of *chunk* (default 256), 
+        so that neither the covariance matrix nor all coordinates are kept in 
+        memory.  Frames are superposed onto the reference coordinates unless 
+        ``aligned=True`` is passed.  Following arguments control the 
+        truncated calculation, which can also be requested for arrays and 
+        ensembles by passing *method*:
+
+        :arg n_modes: number of modes to calculate, default is 20
+        :type n_modes: int
+
+        :arg method: ``'incremental'`` (default) updates the SVD with each 
+            block and reads data once, ``'randomized'`` finds the dominant 
+            subspace with random projections and reads data *n_iter* + 1 
+            times, and is more accurate for slowly decaying spectra
+        :type method: str
+
+        :arg n_iter: number of power iterations for ``'randomized'`` method, 
+            default is 3
+        :type n_iter: int
+
+        :arg oversampling: number of extra directions that are tracked to 
+            improve accuracy of calculated modes, default is 10
+        :type oversampling: int
+
+        :arg seed: seed for random projections
+        :type seed: int"""
 
         linalg = importLA()
 
         start = time.time()
-        if not isinstance(coordsets, (Ensemble, Atomic, np.ndarray)):
+        if not isinstance(coordsets, (Ensemble, Atomic, TrajBase, np.ndarray)):
             raise TypeError('coordsets must be an Ensemble, Atomic, Numpy '
                             'array instance')
+        method = kwargs.pop('method', None)
+        if method is not None or isinstance(coordsets, TrajBase):
+            self._performTruncatedSVD(coordsets, method or 'incremental', 
+                                      **kwargs)
+            LOGGER.debug('{0} modes were calculated in {1:.2f}s.'
+                         .format(self._n_modes, time.time()-start))
+            return
         if isinstance(coordsets, np.ndarray):
             if (coordsets.ndim != 3 or coordsets.shape[2] != 3 or
                     coordsets.dtype not in (np.float32, float)):
@@ -283,6 +637,61 @@ class PCA(NMA):
         LOGGER.debug('{0} modes were calculated in {1:.2f}s.'
                      .format(self._n_modes, time.time()-start))
 
+    def _performTruncatedSVD(self, coordsets, method, **kwargs):
+        """Calculate *n_modes* principal modes reading *coordsets* in
+        blocks, see :meth:`performSVD`."""
+
+        if isinstance(coordsets, Ensemble):
+            coordsets = coordsets._getCoordsets()
+        elif isinstance(coordsets, Atomic):
+            coordsets = coordsets._getCoordsets()
+        elif isinstance(coordsets, np.ndarray):
+            if (coordsets.ndim != 3 or coordsets.shape[2] != 3 or
+                    coordsets.dtype not in (np.float32, float)):
+                raise ValueError('coordsets is not a valid coordinate array')
+
+        if isinstance(coordsets, TrajBase):
+            n_atoms = coordsets.numSelected()
+        else:
+            n_atoms = coordsets.shape[1]
+        if n_atoms <= 3:
+            raise ValueError('coordsets must have more than 3 atoms')
+        dof = n_atoms * 3
+
+        n_modes = int(kwargs.get('n_modes', 20))
+        if not 0 < n_modes <= dof:
+            raise ValueError('n_modes must be a positive integer not greater '
+                             'than {0}'.format(dof))
+        chunk = int(kwargs.get('chunk', 256))
+        align = not kwargs.get('aligned', False)
+        oversampling = int(kwargs.get('oversampling', 10))
+        quiet = kwargs.get('quiet', False)
+
+        def blocks(label=None):
+            return _iterBlocks(coordsets, chunk, align, 
+                               None if quiet else label)
+
+        if method == 'incremental':
+            values, vectors, trace = _incrementalSVD(
+                blocks('Incremental SVD'), n_modes, oversampling)
+        elif method == 'randomized':
+            values, vectors, trace = _randomizedSVD(
+                blocks, dof, n_modes, oversampling, 
+                int(kwargs.get('n_iter', 3)), kwargs.get('seed', None))
+        else:
+            raise ValueError('method must be incremental or randomized')
+
+        self._clear()
+        self._temp = None
+        self._dof = dof
+        self._n_atoms = n_atoms
+        which = values > 1e-18
+        self._eigvals = values[which]
+        self._array = vectors[:, which]
+        self._vars = self._eigvals
+        self._trace = trace
+        self._n_modes = len(self._eigvals)
+
     def addEigenpair(self, eigenvector, eigenvalue=None):
         """Add eigen *vector* and eigen *value* pair(s) to the instance.
         If eigen *value* is omitted, it will be set to 1.  Eigenvalues
@@ -49,6 +49,11 @@ def calcPerturbResponse(model, **kwargs):
     large numbers of forces and no perturbation forces are explicitly applied. 
     If set to **False**, then each residue/node is perturbed *repeats* times (default 100) 
     with a random unit force vector as in ProDy v1.8 and earlier.
+
+    Rows of the covariance matrix are calculated from the modes of *model* 
+    in tiles, so that the full covariance matrix is not built. The size of 
+    tiles is limited by *memory* in megabytes (default 1024). Tiles are 
+    processed by *n_jobs* processes in parallel (default 1).
     """
 
     if not isinstance(model, (NMA, ModeSet, Mode)):
@@ -74,70 +79,77 @@ def calcPerturbResponse(model, **kwargs):
     # LOGGER.info('Calculating covariance matrix')
     # LOGGER.timeit('_prody_cov')
 
-    cov = model.getCovariance()
-
     turbo = kwargs.get('turbo', True)
-    if turbo:
-        if not model.is3d():
-            prs_matrix = cov**2
+    memory = kwargs.get('memory', 1024)
+    n_jobs = kwargs.get('n_jobs', 1)
+
+    # the covariance matrix is never formed as a whole, but its rows are 
+    # calculated from the modes tile by tile, unless it is already available
+    if isinstance(model, NMA) and model._cov is not None:
+        source = (model._cov, None)
+    elif isinstance(model, Mode):
+        source = (model.getArray().reshape((-1, 1)),
+                  np.array([model.getVariance()]))
+    else:
+        source = (model.getArray(), model.getVariances())
 
-        else:
-            cov_squared = cov**2
-            n_by_3n_cov_squared = np.zeros((n_atoms, 3 * n_atoms))
-            prs_matrix = np.zeros((n_atoms, n_atoms))
-            i3 = -3
-            i3p3 = 0
-            for i in range(n_atoms):
-                i3 += 3
-                i3p3 += 3
-                n_by_3n_cov_squared[i,:] = (cov_squared[i3:i3p3,:]).sum(0)
-
-            j3 = -3
-            j3p3 = 0
-            for j in range(n_atoms):
-                j3 += 3
-                j3p3 += 3                
-                prs_matrix[:,j] = (n_by_3n_cov_squared[:,j3:j3p3]).sum(1)
+    is3d = model.is3d()
+    dim = 3 if is3d else 1
+    if turbo or not is3d:
+        forces = None
+        per_atom = 2 * dim
     else:
         repeats = kwargs.pop('repeats', 100)
         LOGGER.info('Calculating perturbation response with {0} repeats'.format(repeats))
-        LOGGER.timeit('_prody_prs_mat')
-
-        response_matrix = np.zeros((n_atoms, n_atoms))
-        LOGGER.progress('Calculating perturbation response', n_atoms, '_prody_prs')
-        i3 = -3
-        i3p3 = 0
-        for i in range(n_atoms):
-            i3 += 3
-            i3p3 += 3
-            forces = np.random.rand(repeats * 3).reshape((repeats, 3))
-            forces /= ((forces**2).sum(1)**0.5).reshape((repeats, 1))
-            for force in forces:
-                response_matrix[i] += (
-                    np.dot(cov[:, i3:i3p3], force)
-                    ** 2).reshape((n_atoms, 3)).sum(1)
-            LOGGER.update(i, '_prody_prs')
-
-        response_matrix /= repeats
-
-        LOGGER.clear()
-        LOGGER.report('Perturbation response matrix calculated in %.1fs.',
-                    '_prody_prs_mat')
-
-    norm_prs_matrix = np.zeros((n_atoms, n_atoms))
-    self_dp = np.diag(prs_matrix)  
-    self_dp = self_dp.reshape(n_atoms, 1)
-    re_self_dp = np.repeat(self_dp, n_atoms, axis=1)
-    norm_prs_matrix = div0(prs_matrix, re_self_dp)
+        forces = np.random.rand(n_atoms * repeats * 3).reshape((n_atoms, repeats, 3))
+        forces /= ((forces**2).sum(2)**0.5).reshape((n_atoms, repeats, 1))
+        per_atom = 3 + 2 * repeats
+
+    # number of atoms whose rows of the covariance are processed at once
+    n_block = int(memory * 1024**2 // (8 * per_atom * n_atoms * dim))
+    n_block = min(max(1, n_block), n_atoms)
+    blocks = [(start, min(start + n_block, n_atoms)) 
+              for start in range(0, n_atoms, n_block)]
+    tasks = [(start, stop, None if forces is None else forces[start:stop])
+             for start, stop in blocks]
+
+    LOGGER.timeit('_prody_prs_mat')
+    prs_matrix = np.zeros((n_atoms, n_atoms))
+    LOGGER.progress('Calculating perturbation response', len(tasks), '_prody_prs')
+    if n_jobs > 1 and len(tasks) > 1:
+        from multiprocessing import Pool
+
+        with Pool(n_jobs, initializer=_initPerturbResponse, 
+                  initargs=(source, is3d)) as pool:
+            results = pool.imap_unordered(_calcPerturbResponseBlock, tasks)
+            for k, (start, stop, response) in enumerate(results):
+                prs_matrix[start:stop] = response
+                LOGGER.update(k, label='_prody_prs')
+    else:
+        _initPerturbResponse(source, is3d)
+        for k, task in enumerate(tasks):
+            start, stop, response = _calcPerturbResponseBlock(task)
+            prs_matrix[start:stop] = response
+            LOGGER.update(k, label='_prody_prs')
+        _initPerturbResponse(None, is3d)
+
+    LOGGER.finish()
+    LOGGER.report('Perturbation response matrix calculated in %.1fs.',
+                  '_prody_prs_mat')
+
+    self_dp = np.diag(prs_matrix).reshape(n_atoms, 1)
+    norm_prs_matrix = div0(prs_matrix, self_dp)
+    del prs_matrix
+    norm_diag = np.diag(norm_prs_matrix).copy()
 
     if no_diag:
        # suppress the diagonal (self displacement) to facilitate
        # visualizing the response profile
-       norm_prs_matrix = norm_prs_matrix - np.diag(np.diag(norm_prs_matrix))
+       norm_prs_matrix[np.diag_indices(n_atoms)] = 0.
     
-    W = 1 - np.eye(n_atoms)
-    effectiveness = np.average(norm_prs_matrix, weights=W, axis=1)
-    sensitivity = np.average(norm_prs_matrix, weights=W, axis=0)
+    # averages over off-diagonal elements
+    effectiveness = (norm_prs_matrix.sum(1) - norm_diag * (not no_diag)) / (n_atoms - 1)
+    sensitivity = (norm_prs_matrix.sum(0) - norm_diag * (not no_diag)) / (n_atoms - 1)
 
     # LOGGER.report('Perturbation response scanning completed in %.1fs.',
     #               '_prody_prs_all')
@@ -158,6 +170,75 @@ def calcPerturbResponse(model, **kwargs):
     return norm_prs_matrix, effectiveness, sensitivity
 
 
+_PRS_SOURCE = None
+
+def _initPerturbResponse(source, is3d):
+    """Sets the covariance matrix, or eigenvectors and variances from which 
+    its rows are calculated, for :func:`_calcPerturbResponseBlock`.  For a 
+    few 3D modes, the response of atom *j* to atom *i* is the inner product 
+    of ``D V_i^T V_i D`` and ``V_j^T V_j``, where ``V_i`` are the rows of 
+    eigenvectors for atom *i* and ``D`` are variances, so the products 
+    ``V_j^T V_j`` are calculated once for all atoms."""
+
+    global _PRS_SOURCE
+    if source is None:
+        _PRS_SOURCE = None
+        return
+
+    array, variances = source
+    gram = None
+    if is3d and variances is not None and array.shape[1] <= 32:
+        gram = _packGram(array.reshape((-1, 3, array.shape[1])))
+    _PRS_SOURCE = (array, variances, is3d, gram)
+
+
+def _packGram(vectors):
+    """Returns upper triangles of ``V^T V`` for each of (N, 3, k) *vectors*."""
+
+    k = vectors.shape[2]
+    gram = np.matmul(vectors.transpose((0, 2, 1)), vectors)
+    upper = np.triu_indices(k)
+    return gram[:, upper[0], upper[1]]
+
+
+def _calcPerturbResponseBlock(task):
+    """Returns the rows of the PRS matrix for atoms from *start* to *stop*. 
+    Responses to explicit *forces* are averaged when they are given, 
+    otherwise the limit of large numbers of forces is used."""
+
+    start, stop, forces = task
+    array, variances, is3d, gram = _PRS_SOURCE
+    dim = 3 if is3d else 1
+    rows = slice(start * dim, stop * dim)
+    n_block = stop - start
+
+    if forces is None and gram is not None:
+        k = array.shape[1]
+        upper = np.triu_indices(k)
+        left = _packGram((array[rows] * variances).reshape((n_block, 3, k)))
+        left[:, upper[0] != upper[1]] *= 2
+        return start, stop, np.dot(left, gram.T)
+
+    if variances is None:
+        tile = np.array(array[rows])
+    else:
+        tile = np.dot(array[rows] * variances, array.T)
+
+    n_atoms = tile.shape[1] // dim
+    if not is3d:
+        return start, stop, tile ** 2
+
+    if forces is None:
+        tile **= 2
+        response = tile.reshape((n_block, 3, n_atoms, 3)).sum(axis=(1, 3))
+    else:
+        # response[b, r, :] = cov[:, 3b:3b+3] . forces[b, r], cov being symmetric
+        response = np.einsum('bjk,brj->brk', tile.reshape((n_block, 3, -1)), forces)
+        response **= 2
+        response = response.reshape((n_block, -1, n_atoms, 3)).sum(3).mean(1)
+    return start, stop, response
+
+
 def calcDynamicFlexibilityIndex(matrix, atoms, select, **kwargs):
     """
     Calculate the dynamic flexibility index for the selected residue(s).
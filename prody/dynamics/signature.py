@@ -11,8 +11,8 @@ import warnings
 from prody import LOGGER, SETTINGS
 from prody.utilities import showFigure, showMatrix, copy, checkWeights, openFile, DTYPE
 from prody.utilities import getValue, importLA, wmean, div0, isListLike
-from prody.ensemble import Ensemble, Conformation
-from prody.atomic import AtomGroup
+from prody.ensemble import Ensemble, Conformation, PDBEnsemble
+from prody.atomic import AtomGroup, Atomic
 
 from .nma import NMA
 from .modeset import ModeSet
@@ -876,8 +876,10 @@ class sdarray(ndarray):
 def calcEnsembleENMs(ensemble, model='gnm', trim='reduce', n_modes=20, **kwargs):
     """Calculates normal modes for each member of *ensemble*.
     
-    :arg ensemble: normal modes of whose members to be computed
-    :type ensemble: :class:`.PDBEnsemble`
+    :arg ensemble: normal modes of whose members to be computed. A list of 
+                   :class:`.Atomic` instances with the same number of atoms 
+                   is also accepted
+    :type ensemble: :class:`.PDBEnsemble`, list
     
     :arg model: type of ENM that will be performed. It can be either 'anm' 
                 or 'gnm'
@@ -912,18 +914,62 @@ def calcEnsembleENMs(ensemble, model='gnm', trim='reduce', n_modes=20, **kwargs)
                 Default is **False**
     :type turbo: bool
 
+    :arg n_jobs: number of worker processes that build and diagonalize the 
+                 models. Conformations sharing the same atom mapping are 
+                 processed together and the largest ones are scheduled first. 
+                 Only the modes are kept, Hessian and Kirchhoff matrices are 
+                 released as soon as each model is diagonalized. If less than 
+                 1, the number of CPUs is used. Default is 1
+    :type n_jobs: int
+
+    :arg nproc: number of BLAS threads per worker process, which requires
+                threadpoolctl. By default, CPUs are evenly shared among workers
+                and a warning is logged if threadpoolctl is not installed
+    :type nproc: int
+
     :returns: :class:`.ModeEnsemble`
     """
 
     match = kwargs.pop('match', True)
     method = kwargs.pop('method', None)
     turbo = kwargs.pop('turbo', False)
+    n_jobs = kwargs.pop('n_jobs', 1)
+    nproc = kwargs.pop('nproc', None)
 
     if isinstance(ensemble, Conformation):
         conformation = ensemble
         ensemble = conformation.getEnsemble()
         index = conformation.getIndex()
         ensemble = ensemble[index:index+1]
+    elif isListLike(ensemble):
+        ensemble = _buildAtomicEnsemble(ensemble)
+    if not isinstance(ensemble, Ensemble):
+        raise TypeError('ensemble should be an Ensemble, a Conformation or '
+                        'a list of Atomic instances')
+
+    try:
+        n_jobs = int(n_jobs)
+    except (TypeError, ValueError):
+        raise TypeError('n_jobs should be an integer')
+    if n_jobs < 1:
+        from multiprocessing import cpu_count
+        n_jobs = cpu_count()
+    n_worker = min(n_jobs, ensemble.numConfs())
+    limit = nproc is not None
+    if nproc is None:
+        from multiprocessing import cpu_count
+        nproc = max(1, cpu_count() // n_worker) if n_worker > 1 else 0
+    if n_worker > 1 and nproc > 0:
+        try:
+            import threadpoolctl
+        except ImportError:
+            if limit:
+                raise ImportError('Please install threadpoolctl to control '
+                                  'threads')
+            LOGGER.warn('threadpoolctl is not installed, number of BLAS '
+                        'threads cannot be limited in {0} worker processes '
+                        'and CPUs may be oversubscribed'.format(n_worker))
+            nproc = 0
     if model is GNM:
         model_type = 'GNM'
     elif model is ANM:
@@ -944,8 +990,8 @@ def calcEnsembleENMs(ensemble, model='gnm', trim='reduce', n_modes=20, **kwargs)
 
     ### ENMs ###
     ## ENM for every conf
-    enms = []
     n_confs = ensemble.numConfs()
+    enms = [None] * n_confs
 
     str_modes = 'all' if n_modes is None else str(n_modes)
     LOGGER.progress('Calculating {0} {1} modes for {2} conformations...'
@@ -953,26 +999,40 @@ def calcEnsembleENMs(ensemble, model='gnm', trim='reduce', n_modes=20, **kwargs)
 
     coordsets = ensemble.getCoordsets(selected=False)
     weights = ensemble.getWeights(selected=False)
-    for i in range(n_confs):
-        LOGGER.update(i, label='_prody_calcEnsembleENMs')
-        coords = coordsets[i]
-
-        if weights.ndim == 3:
-            weight = weights[i].flatten()
-        else:
-            weight = weights.flatten()
-        torf_mapped = weight != 0
-
-        coords = coords[torf_mapped, :]
-        system = torf_selected[torf_mapped]
-        mask = torf_mapped[torf_selected]
-
-        enm, _ = calcENM(coords, system, model=model, mask=mask, trim=trim, 
-                         n_modes=n_modes, title=labels[i], **kwargs)
-        enm.masked = False
-        enms.append(enm)
-
-        #lbl = labels[i] if labels[i] != '' else '%d-th conformation'%(i+1)
+    if weights.ndim == 3:
+        mapped = weights[:, :, 0] != 0
+    else:
+        mapped = np.tile(weights.flatten() != 0, (n_confs, 1))
+
+    # conformations sharing the same mapping share the system and mask arrays,
+    # and the largest systems are scheduled first to balance the workers
+    patterns, inverse = np.unique(mapped, axis=0, return_inverse=True)
+    inverse = np.asarray(inverse).flatten()
+    order = np.argsort(-patterns.sum(axis=1)[inverse], kind='stable')
+    buckets = [(torf_selected[torf_mapped], torf_mapped[torf_selected])
+               for torf_mapped in patterns]
+
+    def iterTasks():
+        for i in order:
+            torf_mapped = patterns[inverse[i]]
+            system, mask = buckets[inverse[i]]
+            yield (i, coordsets[i][torf_mapped, :], system, mask, model, trim,
+                   n_modes, labels[i], kwargs)
+
+    if n_worker > 1:
+        from multiprocessing import Pool
+
+        with Pool(n_worker, initializer=_limitWorkerThreads,
+                  initargs=(nproc,)) as pool:
+            results = pool.imap_unordered(_calcEnsembleENM, iterTasks())
+            for n, (i, enm) in enumerate(results):
+                LOGGER.update(n, label='_prody_calcEnsembleENMs')
+                enms[i] = enm
+    else:
+        for n, task in enumerate(iterTasks()):
+            LOGGER.update(n, label='_prody_calcEnsembleENMs')
+            i, enm = _calcEnsembleENM(task)
+            enms[i] = enm
     LOGGER.finish()
 
     min_n_modes = ensemble.numAtoms() * 3
@@ -1005,6 +1065,58 @@ def calcEnsembleENMs(ensemble, model='gnm', trim='reduce', n_modes=20, **kwargs)
         modeens.match(turbo=turbo, method=method)
     return modeens
 
+def _buildAtomicEnsemble(structures):
+    """Returns a :class:`.PDBEnsemble` built from a list of :class:`.Atomic`
+    instances with the same number of atoms, which are treated as mapped."""
+
+    if not len(structures):
+        raise ValueError('structures should contain at least one structure')
+
+    first = structures[0]
+    if not isinstance(first, Atomic):
+        raise TypeError('structures should be a list of Atomic instances')
+
+    n_atoms = first.numAtoms()
+    title = first.getTitle() if len(structures) == 1 else 'Unknown'
+    ensemble = PDBEnsemble(title)
+    ensemble.setAtoms(first)
+    ensemble.setCoords(first.getCoords())
+    for structure in structures:
+        if not isinstance(structure, Atomic):
+            raise TypeError('structures should be a list of Atomic instances')
+        if structure.numAtoms() != n_atoms:
+            raise ValueError('structures should have the same number of atoms, '
+                             'use buildPDBEnsemble to map them onto each other')
+        ensemble.addCoordset(structure.getCoords(), label=structure.getTitle())
+    return ensemble
+
+
+_THREAD_LIMITS = None
+
+def _limitWorkerThreads(nproc):
+    """Limits the number of BLAS threads used by a worker process."""
+
+    global _THREAD_LIMITS
+    if nproc > 0:
+        from threadpoolctl import threadpool_limits
+        _THREAD_LIMITS = threadpool_limits(limits=nproc, user_api='blas')
+
+
+def _calcEnsembleENM(task):
+    """Calculates the ENM of a single conformation for :func:`calcEnsembleENMs`
+    and releases its Hessian or Kirchhoff matrix, so that only the modes are
+    kept in memory or sent back to the parent process."""
+
+    i, coords, system, mask, model, trim, n_modes, title, kwargs = task
+
+    enm, _ = calcENM(coords, system, model=model, mask=mask, trim=trim, 
+                     n_modes=n_modes, title=title, **kwargs)
+    enm.masked = False
+    for attr in ('_hessian', '_kirchhoff'):
+        if hasattr(enm, attr):
+            setattr(enm, attr, None)
+    return i, enm
+
 def _getEnsembleENMs(ensemble, **kwargs):
     if isinstance(ensemble, (Ensemble, Conformation)):
         enms = calcEnsembleENMs(ensemble, **kwargs)
@@ -5,7 +5,9 @@ import numpy as np
 
 from prody.sequence import MSA, Sequence
 from prody.atomic import Atomic, AtomGroup
-from prody.measure import getRMSD, getTransformation, Transformation
+from prody.measure import getRMSD, getTransformations, Transformation
+from prody.measure import buildRMSDMatrix
+from prody.measure.transform import _applyTransformations
 from prody.utilities import checkCoords, checkWeights, copy
 from prody import LOGGER
 
@@ -170,7 +172,6 @@ class PDBEnsemble(Ensemble):
     def _superpose(self, **kwargs):
         """Superpose conformations and update coordinates."""
 
-        calcT = getTransformation
         if kwargs.get('trans', False):
             if self._trans is not None:
                 LOGGER.info('Existing transformations will be overwritten.')
@@ -189,12 +190,12 @@ class PDBEnsemble(Ensemble):
             confs = self._confs
             confs_selected = self._confs[:, indices]
 
-        for i, conf in enumerate(confs_selected):
-            rmat, tvec = calcT(conf, coords, weights[i])
-            if trans is not None:
-                trans[i][:3, :3] = rmat
-                trans[i][:3, 3] = tvec
-            confs[i] = tvec + np.dot(confs[i], rmat.T)
+        rotations, translations = getTransformations(confs_selected, coords,
+                                                     weights)
+        if trans is not None:
+            trans[:, :3, :3] = rotations
+            trans[:, :3, 3] = translations
+        _applyTransformations(rotations, translations, confs)
         self._trans = trans
 
     def iterpose(self, rmsd=0.0001):
@@ -573,7 +574,7 @@ class PDBEnsemble(Ensemble):
             ssqf += ((conf - mean) * weights[i]) ** 2
         return ssqf.sum(1) / weightsum.flatten()
 
-    def getRMSDs(self, pairwise=False):
+    def getRMSDs(self, pairwise=False, **kwargs):
         """Calculate and return root mean square deviations (RMSDs). Note that
         you might need to align the conformations using :meth:`superpose` or
         :meth:`iterpose` before calculating RMSDs.
@@ -581,6 +582,10 @@ class PDBEnsemble(Ensemble):
         :arg pairwise: if **True** then it will return pairwise RMSDs 
             as an n-by-n matrix. n is the number of conformations.
         :type pairwise: bool
+
+        Pairwise RMSDs are calculated using :func:`.buildRMSDMatrix` over
+        atoms resolved in both conformations, see :meth:`.Ensemble.getRMSDs`
+        for additional arguments.
         """
 
         if self._confs is None or self._coords is None:
@@ -592,16 +597,8 @@ class PDBEnsemble(Ensemble):
 
         weights = self._weights[:, indices] if self._weights is not None else None
         if pairwise:
-            n_confs = self.numConfs()
-            RMSDs = np.zeros((n_confs, n_confs))
-            for i in range(n_confs):
-                for j in range(i+1, n_confs):
-                    if weights is None:
-                        w = None
-                    else:
-                        wi = weights[i]; wj = weights[j]
-                        w = wi * wj
-                    RMSDs[i, j] = RMSDs[j, i] = getRMSD(self._confs[i, indices], self._confs[j, indices], w)
+            kwargs.setdefault('superpose', False)
+            RMSDs = buildRMSDMatrix(self._confs[:, indices], weights, **kwargs)
         else:
             RMSDs = getRMSD(self._coords[indices], self._confs[:, indices], weights)
 
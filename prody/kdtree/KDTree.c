@@ -28,6 +28,8 @@ struct KDTree
     float _neighbor_radius_sq;
     float *_center_coord;
     float *_coords;
+    char *_mask;
+    int _any;
     int _bucket_size;
     int dim;
 };
@@ -296,6 +298,8 @@ struct KDTree* KDTree_init(int dim, int bucket_size)
     tree->_bucket_size=bucket_size;
     tree->_data_point_list = NULL;
     tree->_data_point_list_size = 0;
+    tree->_mask = NULL;
+    tree->_any = 0;
 
     return tree;
 }
@@ -416,6 +420,24 @@ static int KDTree_report_point(struct KDTree* tree, long int index, float *coord
 {
     float r;
 
+    if (tree->_any)
+    {
+        /* only test for a target point, see KDTree_search_centers_any */
+        if (!tree->_count && (!tree->_mask || tree->_mask[index]) &&
+            KDTree_dist(tree->_center_coord, coord, tree->dim)<=tree->_radius_sq)
+            tree->_count=1;
+        return 1;
+    }
+
+    if (tree->_mask)
+    {
+        /* only mark points, see KDTree_search_centers_radius */
+        if (!tree->_mask[index] &&
+            KDTree_dist(tree->_center_coord, coord, tree->dim)<=tree->_radius_sq)
+            tree->_mask[index]=1;
+        return 1;
+    }
+
     r=KDTree_dist(tree->_center_coord, coord, tree->dim);
 
     if (r<=tree->_radius_sq)
@@ -440,6 +462,7 @@ static int KDTree_report_point(struct KDTree* tree, long int index, float *coord
 static int KDTree_report_subtree(struct KDTree* tree, struct Node *node)
 {
     int ok;
+    if (tree->_any && tree->_count) return 1;
     if (Node_is_leaf(node))
     {
         /* report point(s) */
@@ -469,6 +492,11 @@ long int KDTree_get_count(struct KDTree* tree)
     return tree->_count;
 }
 
+long int KDTree_get_size(struct KDTree* tree)
+{
+    return tree->_data_point_list_size;
+}
+
 long int KDTree_neighbor_get_count(struct KDTree* tree)
 {
     return tree->_neighbor_count;
@@ -576,6 +604,13 @@ static int KDTree_search(struct KDTree* tree, struct Region *region, struct Node
         }
         /* intersect_left is -1 if no overlap */
 
+        if (tree->_any && tree->_count)
+        {
+            /* a point was found, see KDTree_search_centers_any */
+            Region_destroy(region);
+            return ok;
+        }
+
         /* RIGHT HALF PLANE */
 
         right_node=node->_right;
@@ -692,6 +727,81 @@ int KDTree_search_center_radius(struct KDTree* tree, float *coord, float radius)
     return KDTree_search(tree, NULL, NULL, 0);
 }
 
+static int KDTree_search_center(struct KDTree* tree, float *coord, float *left, float *right)
+{
+    /* search around coord, without resetting search results */
+    int i;
+
+    for (i=0; i<tree->dim; i++)
+    {
+        left[i]=coord[i]-tree->_radius;
+        right[i]=coord[i]+tree->_radius;
+        tree->_center_coord[i]=coord[i];
+    }
+
+    Region_destroy(tree->_query_region);
+    tree->_query_region= Region_create(left, right);
+    if (!tree->_query_region) return 0;
+
+    return KDTree_search(tree, NULL, NULL, 0);
+}
+
+static int KDTree_search_centers(struct KDTree* tree, float *coords, long int nr_centers, float radius, char *mask, char *found)
+{
+    /* if found is NULL, set mask to 1 for points within radius of any of
+       the centers, otherwise set found to 1 for centers with any point
+       within radius, considering only points with nonzero mask values if
+       mask is given; coords are not freed and arrays are not cleared */
+    long int i;
+    int ok=1;
+    float* left = malloc(tree->dim*sizeof(float));
+    float* right = malloc(tree->dim*sizeof(float));
+    if (left==NULL || right==NULL)
+    {
+        if (left) free(left);
+        if (right) free(right);
+        return 0;
+    }
+
+    Region_dim=tree->dim;
+
+    if (tree->_radius_list)
+    {
+        free(tree->_radius_list);
+        tree->_radius_list = NULL;
+    }
+    tree->_count=0;
+
+    tree->_radius=radius;
+    tree->_radius_sq=radius*radius;
+    tree->_mask=mask;
+    tree->_any=(found!=NULL);
+
+    for (i=0; i<nr_centers && ok; i++)
+    {
+        tree->_count=0;
+        ok = KDTree_search_center(tree, coords+i*tree->dim, left, right);
+        if (found && tree->_count) found[i]=1;
+    }
+
+    tree->_count=0;
+    tree->_mask=NULL;
+    tree->_any=0;
+    free(left);
+    free(right);
+    return ok;
+}
+
+int KDTree_search_centers_radius(struct KDTree* tree, float *coords, long int nr_centers, float radius, char *mask)
+{
+    return KDTree_search_centers(tree, coords, nr_centers, radius, mask, NULL);
+}
+
+int KDTree_search_centers_any(struct KDTree* tree, float *coords, long int nr_centers, float radius, char *found, char *targets)
+{
+    return KDTree_search_centers(tree, coords, nr_centers, radius, targets, found);
+}
+
 void KDTree_copy_indices(struct KDTree* tree, long *indices)
 {
     long int i;
@@ -556,6 +556,125 @@ static PyObject *PyTree_get_indices(PyTree *self, PyObject* args)
     return Py_None;
 }
 
+static int PyTree_get_mask(PyObject *object, Py_buffer *view, Py_ssize_t n)
+{
+    /* get a writable boolean array buffer, n is its length if positive */
+    if (PyObject_GetBuffer(object, view,
+                           PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | PyBUF_WRITABLE)
+        == -1)
+        return 0;
+    if (view->itemsize != 1 || view->ndim != 1) {
+        PyErr_SetString(PyExc_ValueError,
+            "mask must be a one-dimensional boolean array");
+        PyBuffer_Release(view);
+        return 0;
+    }
+    if (n > 0 && view->shape[0] != n) {
+        PyErr_Format(PyExc_ValueError,
+            "mask has incorrect length (%zd expected %zd)", view->shape[0], n);
+        PyBuffer_Release(view);
+        return 0;
+    }
+    return 1;
+}
+
+static PyObject *PyTree_search_centers(PyTree *self, PyObject* args, int any)
+{
+    struct KDTree* tree = self->tree;
+    const int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+    char datatype;
+    double radius;
+    int ok;
+    Py_buffer view, mask, targets;
+    PyObject *object, *mobject, *tobject = Py_None;
+
+    if (!PyArg_ParseTuple(args, "OdO|O:KDTree_search_centers",
+                          &object, &radius, &mobject, &tobject))
+        return NULL;
+
+    if(radius <= 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "Radius must be positive.");
+        return NULL;
+    }
+
+    if (PyObject_GetBuffer(object, &view, flags) == -1)
+        return NULL;
+    datatype = view.format[0];
+    switch (datatype) {
+        case '@':
+        case '=':
+        case '<':
+        case '>':
+        case '!': datatype = view.format[1]; break;
+        default: break;
+    }
+    if (datatype != 'f') {
+        PyErr_Format(PyExc_RuntimeError,
+            "array has incorrect data format ('%c', expected 'f')", datatype);
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    else if (view.ndim != 2) {
+        PyErr_Format(PyExc_ValueError,
+            "array has incorrect rank (%d expected 2)", view.ndim);
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+
+    /* centers are marked in any mode and tree points in radius mode */
+    if (!PyTree_get_mask(mobject, &mask,
+                         any ? view.shape[0] : KDTree_get_size(tree))) {
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    if (any && tobject != Py_None) {
+        if (!PyTree_get_mask(tobject, &targets, KDTree_get_size(tree))) {
+            PyBuffer_Release(&mask);
+            PyBuffer_Release(&view);
+            return NULL;
+        }
+        ok = KDTree_search_centers_any(tree, (float *) view.buf,
+                                       view.shape[0], radius,
+                                       (char *) mask.buf,
+                                       (char *) targets.buf);
+        PyBuffer_Release(&targets);
+    }
+    else if (any)
+        ok = KDTree_search_centers_any(tree, (float *) view.buf,
+                                       view.shape[0], radius,
+                                       (char *) mask.buf, NULL);
+    else
+        ok = KDTree_search_centers_radius(tree, (float *) view.buf,
+                                          view.shape[0], radius,
+                                          (char *) mask.buf);
+    PyBuffer_Release(&mask);
+    PyBuffer_Release(&view);
+    if (!ok) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+static char PyTree_search_centers_radius__doc__[] =
+"marks points within radius of any of the centers in a boolean array\n";
+
+static PyObject *PyTree_search_centers_radius(PyTree *self, PyObject* args)
+{
+    return PyTree_search_centers(self, args, 0);
+}
+
+static char PyTree_search_centers_any__doc__[] =
+"marks centers with any point within radius in a boolean array, optionally\n"
+"considering only target points marked in a second boolean array\n";
+
+static PyObject *PyTree_search_centers_any(PyTree *self, PyObject* args)
+{
+    return PyTree_search_centers(self, args, 1);
+}
+
 static char PyTree_get_radii__doc__[] =
 "returns distances of coordinates within radius as a Numpy array.\n";
 
@@ -604,6 +723,8 @@ static PyMethodDef PyTree_methods[] = {
     {"get_count", (PyCFunction)PyTree_get_count, METH_NOARGS, NULL},
     {"set_data", (PyCFunction)PyTree_set_data, METH_VARARGS, NULL},
     {"search_center_radius", (PyCFunction)PyTree_search_center_radius, METH_VARARGS, NULL},
+    {"search_centers_radius", (PyCFunction)PyTree_search_centers_radius, METH_VARARGS, PyTree_search_centers_radius__doc__},
+    {"search_centers_any", (PyCFunction)PyTree_search_centers_any, METH_VARARGS, PyTree_search_centers_any__doc__},
     {"neighbor_get_count", (PyCFunction)PyTree_neighbor_get_count, METH_NOARGS, NULL},
     {"neighbor_search", (PyCFunction)PyTree_neighbor_search, METH_VARARGS, NULL},
     {"neighbor_simple_search", (PyCFunction)PyTree_neighbor_simple_search, METH_VARARGS, NULL},
@@ -2,7 +2,7 @@
 """This module defines :class:`KDTree` class for dealing with atomic coordinate
 sets and handling periodic boundary conditions."""
 
-from numpy import array, ndarray, concatenate, empty
+from numpy import array, ndarray, concatenate, empty, zeros, ascontiguousarray
 
 from prody import LOGGER
 
@@ -148,6 +148,7 @@ class KDTree(object):
         self._coords = None
         self._unitcell = None
         self._neighbors = None
+        self._n_points = coords.shape[0]
         if unitcell is None:
             self._kdtree = CKDTree(coords, self._bucketsize)
         else:
@@ -252,6 +253,93 @@ class KDTree(object):
                 self._pdbkeys = list(_dict)
 
 
+    def getMask(self, radius, centers):
+        """Returns a boolean array that is **True** for points within *radius*
+        of any of the *centers*.  All centers are searched in a single call
+        to the C extension, when it is available.  When centers
+        outnumber the points around them, :meth:`getCenterMask` is faster.
+
+        :arg radius: distance (Å)
+        :type radius: float
+
+        :arg centers: coordinate array with shape ``(M, 3)``
+        :type centers: :class:`numpy.ndarray`"""
+
+        centers = self._checkCenters(radius, centers)
+        mask = zeros(self._n_points, bool)
+        self._neighbors = None
+        kdtree = self._kdtree
+        if hasattr(kdtree, 'search_centers_radius'):
+            if self._unitcell is not None:
+                centers = concatenate([centers + rep
+                                       for rep in self._replicate])
+            kdtree.search_centers_radius(ascontiguousarray(centers, 'f'),
+                                         radius, mask)
+            if self._unitcell is not None:
+                self._pbcdict = {}
+                self._pdbkeys = []
+        else:
+            for center in centers:
+                self.search(radius, center)
+                if self.getCount():
+                    mask[self.getIndices()] = True
+        return mask
+
+    def getCenterMask(self, radius, centers, targets=None):
+        """Returns a boolean array that is **True** for *centers* that have
+        any point within *radius*.  See also :meth:`getMask`.
+
+        :arg radius: distance (Å)
+        :type radius: float
+
+        :arg centers: coordinate array with shape ``(M, 3)``
+        :type centers: :class:`numpy.ndarray`
+
+        :arg targets: boolean array marking the points to consider, by
+            default all points are considered
+        :type targets: :class:`numpy.ndarray`"""
+
+        centers = self._checkCenters(radius, centers)
+        if targets is not None:
+            targets = ascontiguousarray(targets, bool)
+            if targets.shape != (self._n_points,):
+                raise ValueError('targets.shape must be ({0},)'
+                                 .format(self._n_points))
+        n_centers = len(centers)
+        self._neighbors = None
+        kdtree = self._kdtree
+        if hasattr(kdtree, 'search_centers_any'):
+            if self._unitcell is not None:
+                centers = concatenate([centers + rep
+                                       for rep in self._replicate])
+            found = zeros(len(centers), bool)
+            kdtree.search_centers_any(ascontiguousarray(centers, 'f'),
+                                      radius, found, targets)
+            if self._unitcell is not None:
+                self._pbcdict = {}
+                self._pdbkeys = []
+                found = found.reshape((-1, n_centers)).any(0)
+        else:
+            found = zeros(n_centers, bool)
+            for i, center in enumerate(centers):
+                self.search(radius, center)
+                if self.getCount():
+                    found[i] = (targets is None or
+                                targets[self.getIndices()].any())
+        return found
+
+    def _checkCenters(self, radius, centers):
+
+        if not isinstance(radius, (float, int)):
+            raise TypeError('radius must be a number')
+        if radius <= 0:
+            raise ValueError('radius must be a positive number')
+        if not isinstance(centers, ndarray):
+            raise TypeError('centers must be a Numpy array instance')
+        if centers.ndim != 2 or centers.shape[1] != 3:
+            raise ValueError('centers.shape must be (M,3)')
+        return centers
+
     def getIndices(self):
         """Returns array of indices for points or pairs, depending on the type
         of the most recent search."""
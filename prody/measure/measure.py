@@ -574,12 +574,11 @@ def calcMSF(coordsets):
                         '_prody_calcMSF')
         ncsets = 0
         coordsets.reset()
-        for frame in coordsets:
-            frame.superpose()
-            coords = frame._getCoords()
-            total += coords
-            sqsum += coords ** 2
-            ncsets += 1
+        for chunk in coordsets.iterChunks(align=True):
+            total += chunk.sum(0)
+            chunk **= 2
+            sqsum += chunk.sum(0)
+            ncsets += len(chunk)
             LOGGER.update(ncsets, label='_prody_calcMSF')
         LOGGER.finish()
         msf = (sqsum/ncsets - (total/ncsets)**2).sum(1)
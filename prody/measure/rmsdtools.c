@@ -0,0 +1,265 @@
+#include "Python.h"
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include "numpy/arrayobject.h"
+#include <math.h>
+#include <stdlib.h>
+
+/* Pairwise RMSD after optimal superposition, calculated using the
+   quaternion characteristic polynomial (QCP) method of Theobald (2005)
+   Acta Cryst A61:478 and Liu et al. (2010) J Comput Chem 31:1561.  The
+   largest eigenvalue of the key matrix is found by Newton-Raphson
+   iterations, so rotations are never calculated. */
+
+#define TILE 64
+
+
+static double qcpRMSD(const double *S, double E0, double wsum) {
+
+    /* S is the 3x3 inner product matrix of centered coordinates, E0 is the
+       half of the sum of squared norms of the two coordinate sets */
+
+    double Sxx = S[0], Sxy = S[1], Sxz = S[2],
+           Syx = S[3], Syy = S[4], Syz = S[5],
+           Szx = S[6], Szy = S[7], Szz = S[8];
+    double Sxx2 = Sxx * Sxx, Syy2 = Syy * Syy, Szz2 = Szz * Szz,
+           Sxy2 = Sxy * Sxy, Syz2 = Syz * Syz, Sxz2 = Sxz * Sxz,
+           Syx2 = Syx * Syx, Szy2 = Szy * Szy, Szx2 = Szx * Szx;
+    double SyzSzymSyySzz2 = 2.0 * (Syz * Szy - Syy * Szz);
+    double Sxx2Syy2Szz2Syz2Szy2 = Syy2 + Szz2 - Sxx2 + Syz2 + Szy2;
+    double Sxy2Sxz2Syx2Szx2 = Sxy2 + Sxz2 - Syx2 - Szx2;
+    double SxzpSzx = Sxz + Szx, SyzpSzy = Syz + Szy, SxypSyx = Sxy + Syx,
+           SyzmSzy = Syz - Szy, SxzmSzx = Sxz - Szx, SxymSyx = Sxy - Syx,
+           SxxpSyy = Sxx + Syy, SxxmSyy = Sxx - Syy;
+    double C2, C1, C0, x2, a, b, delta, lambda, old, msd;
+    int i;
+
+    C2 = -2.0 * (Sxx2 + Syy2 + Szz2 + Sxy2 + Syx2 + Sxz2 + Szx2 + Syz2 +
+                 Szy2);
+    C1 = 8.0 * (Sxx * Syz * Szy + Syy * Szx * Sxz + Szz * Sxy * Syx -
+                Sxx * Syy * Szz - Syz * Szx * Sxy - Szy * Syx * Sxz);
+    C0 = Sxy2Sxz2Syx2Szx2 * Sxy2Sxz2Syx2Szx2 +
+         (Sxx2Syy2Szz2Syz2Szy2 + SyzSzymSyySzz2) *
+         (Sxx2Syy2Szz2Syz2Szy2 - SyzSzymSyySzz2) +
+         (-(SxzpSzx) * (SyzmSzy) + (SxymSyx) * (SxxmSyy - Szz)) *
+         (-(SxzmSzx) * (SyzpSzy) + (SxymSyx) * (SxxmSyy + Szz)) +
+         (-(SxzpSzx) * (SyzpSzy) - (SxypSyx) * (SxxpSyy - Szz)) *
+         (-(SxzmSzx) * (SyzmSzy) - (SxypSyx) * (SxxpSyy + Szz)) +
+         (+(SxypSyx) * (SyzpSzy) + (SxzpSzx) * (SxxmSyy + Szz)) *
+         (-(SxymSyx) * (SyzmSzy) + (SxzpSzx) * (SxxpSyy + Szz)) +
+         (+(SxypSyx) * (SyzmSzy) + (SxzmSzx) * (SxxmSyy - Szz)) *
+         (-(SxymSyx) * (SyzpSzy) + (SxzmSzx) * (SxxpSyy - Szz));
+
+    lambda = E0;
+    for (i = 0; i < 50; i++) {
+        old = lambda;
+        x2 = lambda * lambda;
+        b = (x2 + C2) * lambda;
+        a = b + C1;
+        delta = (a * lambda + C0) / (2.0 * x2 * lambda + b + a);
+        if (!isfinite(delta))
+            break;
+        lambda -= delta;
+        if (fabs(lambda - old) < fabs(1e-11 * lambda))
+            break;
+    }
+    msd = 2.0 * (E0 - lambda) / wsum;
+    return msd > 0 ? sqrt(msd) : 0.0;
+}
+
+
+static PyObject *pairwiseRMSD(PyObject *self, PyObject *args,
+                              PyObject *kwargs) {
+
+    PyArrayObject *coords, *out;
+    PyObject *weights_obj = Py_None;
+    PyArrayObject *weights = NULL;
+    long start, stop;
+    int shared = 0;
+
+    static char *kwlist[] = {"coords", "out", "start", "stop", "weights",
+                             NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OOll|O", kwlist,
+                                     &coords, &out, &start, &stop,
+                                     &weights_obj))
+        return NULL;
+
+    if (!PyArray_Check(coords) || PyArray_TYPE(coords) != NPY_DOUBLE ||
+        PyArray_NDIM(coords) != 3 || PyArray_DIMS(coords)[2] != 3 ||
+        !PyArray_ISCARRAY_RO(coords)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "coords must be a contiguous float64 array with "
+                        "shape (n_csets, n_atoms, 3)");
+        return NULL;
+    }
+    const long n_csets = (long) PyArray_DIMS(coords)[0];
+    const long n_atoms = (long) PyArray_DIMS(coords)[1];
+
+    if (!PyArray_Check(out) || PyArray_TYPE(out) != NPY_DOUBLE ||
+        PyArray_NDIM(out) != 1 || !PyArray_ISCARRAY(out) ||
+        PyArray_DIMS(out)[0] != n_csets * (n_csets - 1) / 2) {
+        PyErr_SetString(PyExc_TypeError,
+                        "out must be a contiguous float64 array with length "
+                        "n_csets * (n_csets - 1) / 2");
+        return NULL;
+    }
+    if (weights_obj != Py_None) {
+        weights = (PyArrayObject *) weights_obj;
+        if (!PyArray_Check(weights) || PyArray_TYPE(weights) != NPY_DOUBLE ||
+            PyArray_NDIM(weights) != 2 || !PyArray_ISCARRAY_RO(weights) ||
+            PyArray_DIMS(weights)[1] != n_atoms ||
+            (PyArray_DIMS(weights)[0] != n_csets &&
+             PyArray_DIMS(weights)[0] != 1)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "weights must be a contiguous float64 array with "
+                            "shape (n_csets, n_atoms) or (1, n_atoms)");
+            return NULL;
+        }
+        shared = PyArray_DIMS(weights)[0] == 1;
+    }
+    if (start < 0 || stop > n_csets || start > stop) {
+        PyErr_SetString(PyExc_ValueError, "invalid range of rows");
+        return NULL;
+    }
+
+    const double *xyz = (const double *) PyArray_DATA(coords);
+    const double *w = weights ? (const double *) PyArray_DATA(weights) : NULL;
+    double *rmsd = (double *) PyArray_DATA(out);
+    double *sqnorms = NULL, wsum = (double) n_atoms;
+    long i, j, k, tile, stride = n_atoms * 3;
+
+    if (!w || shared) {
+        sqnorms = (double *) malloc(n_csets * sizeof(double));
+        if (!sqnorms)
+            return PyErr_NoMemory();
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+
+    if (sqnorms) {
+        /* coordinates are centered, only inner products are needed */
+        if (w) {
+            wsum = 0;
+            for (k = 0; k < n_atoms; k++)
+                wsum += w[k];
+        }
+        for (i = 0; i < n_csets; i++) {
+            const double *a = xyz + i * stride;
+            double g = 0;
+            for (k = 0; k < n_atoms; k++) {
+                double d = a[3*k] * a[3*k] + a[3*k+1] * a[3*k+1] +
+                           a[3*k+2] * a[3*k+2];
+                g += w ? w[k] * d : d;
+            }
+            sqnorms[i] = g;
+        }
+    }
+
+    /* rows of a tile of columns stay in cache for all rows */
+    for (tile = start + 1; tile < n_csets; tile += TILE) {
+        long tile_end = tile + TILE < n_csets ? tile + TILE : n_csets;
+        for (i = start; i < stop && i < tile_end; i++) {
+            const double *a = xyz + i * stride;
+            long row = n_csets * i - i * (i + 1) / 2 - i - 1;
+            for (j = i + 1 > tile ? i + 1 : tile; j < tile_end; j++) {
+                const double *b = xyz + j * stride;
+                double S[9] = {0, 0, 0, 0, 0, 0, 0, 0, 0};
+                double E0;
+
+                if (sqnorms) {
+                    for (k = 0; k < n_atoms; k++) {
+                        double x1 = a[3*k], y1 = a[3*k+1], z1 = a[3*k+2];
+                        double x2 = b[3*k], y2 = b[3*k+1], z2 = b[3*k+2];
+                        if (w) {
+                            x1 *= w[k]; y1 *= w[k]; z1 *= w[k];
+                        }
+                        S[0] += x1 * x2; S[1] += x1 * y2; S[2] += x1 * z2;
+                        S[3] += y1 * x2; S[4] += y1 * y2; S[5] += y1 * z2;
+                        S[6] += z1 * x2; S[7] += z1 * y2; S[8] += z1 * z2;
+                    }
+                    E0 = (sqnorms[i] + sqnorms[j]) / 2.0;
+                } else {
+                    /* weights are products of weights of both sets, so
+                       sets are centered for each pair */
+                    const double *wa = w + i * n_atoms, *wb = w + j * n_atoms;
+                    double W = 0, A[3] = {0, 0, 0}, B[3] = {0, 0, 0};
+                    double Ga = 0, Gb = 0;
+                    int p, q;
+                    for (k = 0; k < n_atoms; k++) {
+                        double wk = wa[k] * wb[k];
+                        double x1, y1, z1, x2, y2, z2;
+                        if (wk == 0)
+                            continue;
+                        x1 = a[3*k]; y1 = a[3*k+1]; z1 = a[3*k+2];
+                        x2 = b[3*k]; y2 = b[3*k+1]; z2 = b[3*k+2];
+                        W += wk;
+                        A[0] += wk * x1; A[1] += wk * y1; A[2] += wk * z1;
+                        B[0] += wk * x2; B[1] += wk * y2; B[2] += wk * z2;
+                        Ga += wk * (x1 * x1 + y1 * y1 + z1 * z1);
+                        Gb += wk * (x2 * x2 + y2 * y2 + z2 * z2);
+                        x1 *= wk; y1 *= wk; z1 *= wk;
+                        S[0] += x1 * x2; S[1] += x1 * y2; S[2] += x1 * z2;
+                        S[3] += y1 * x2; S[4] += y1 * y2; S[5] += y1 * z2;
+                        S[6] += z1 * x2; S[7] += z1 * y2; S[8] += z1 * z2;
+                    }
+                    if (W == 0) {
+                        rmsd[row + j] = 0;
+                        continue;
+                    }
+                    for (p = 0; p < 3; p++)
+                        for (q = 0; q < 3; q++)
+                            S[3*p+q] -= A[p] * B[q] / W;
+                    Ga -= (A[0] * A[0] + A[1] * A[1] + A[2] * A[2]) / W;
+                    Gb -= (B[0] * B[0] + B[1] * B[1] + B[2] * B[2]) / W;
+                    E0 = (Ga + Gb) / 2.0;
+                    wsum = W;
+                }
+                rmsd[row + j] = qcpRMSD(S, E0, wsum);
+            }
+        }
+    }
+
+    Py_END_ALLOW_THREADS
+
+    free(sqnorms);
+    Py_RETURN_NONE;
+}
+
+
+static PyMethodDef rmsdtools_methods[] = {
+
+    {"pairwiseRMSD",  (PyCFunction)pairwiseRMSD,
+     METH_VARARGS | METH_KEYWORDS,
+     "Calculate RMSDs after optimal superposition between coordinate sets\n"
+     "in rows from *start* to *stop* and all following sets, and write\n"
+     "them into condensed array *out*.  Without *weights*, or with shared\n"
+     "weights of shape (1, n_atoms), *coords* must be centered.  Weights\n"
+     "with shape (n_csets, n_atoms) are multiplied for each pair."},
+
+    {NULL, NULL, 0, NULL}
+};
+
+
+
+#if PY_MAJOR_VERSION >= 3
+
+static struct PyModuleDef rmsdtools = {
+        PyModuleDef_HEAD_INIT,
+        "rmsdtools",
+        "RMSD tools.",
+        -1,
+        rmsdtools_methods,
+};
+PyMODINIT_FUNC PyInit_rmsdtools(void) {
+    import_array();
+    return PyModule_Create(&rmsdtools);
+}
+#else
+PyMODINIT_FUNC initrmsdtools(void) {
+
+    Py_InitModule3("rmsdtools", rmsdtools_methods,
+        "RMSD tools.");
+
+    import_array();
+}
+#endif
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """ This module defines a class for identifying contacts."""
 
+import threading
+
 import numpy as np
 
 from prody import LOGGER
@@ -12,7 +14,7 @@ from .measure import calcCenter
 linalg = importLA()
 
 __all__ = ['Transformation', 'applyTransformation', 'alignCoordsets',
-           'calcRMSD', 'calcTransformation', 'superpose',
+           'calcRMSD', 'calcTransformation', 'superpose', 'buildRMSDMatrix',
            'moveAtoms', 'wrapAtoms',
            'printRMSD']
 
@@ -162,6 +164,68 @@ def getTransformation(mob, tar, weights=None):
     return rotation, tar_com - np.dot(mob_com, rotation.T)
 
 
+def getTransformations(mobs, tar, weights=None, chunk=1024):
+    """Returns rotation matrices and translation vectors that superpose each
+    coordinate set in *mobs*, an array with shape ``(n_csets, n_atoms, 3)``,
+    onto *tar*, the same as :func:`getTransformation` called for each
+    coordinate set.  Cross-covariance matrices of *chunk* coordinate sets are
+    calculated at once using matrix products, and the 3x3 problems are
+    solved as a stack.  *weights* may have shape ``(n_atoms, 1)``, or
+    ``(n_csets, n_atoms, 1)`` when they differ between coordinate sets."""
+
+    n_csets = len(mobs)
+    rotations = np.zeros((n_csets, 3, 3))
+    translations = np.zeros((n_csets, 3))
+    # translating target does not change rotations, but improves precision
+    tar_mean = tar.mean(0)
+    tar = tar - tar_mean
+    if weights is not None:
+        weights = weights[..., 0]
+
+    for start in range(0, n_csets, chunk):
+        stop = min(start + chunk, n_csets)
+        mob = mobs[start:stop]
+        if weights is None:
+            mob_com = mob.mean(1)
+            tar_com = np.zeros((1, 3))
+            # target is centered, so mob need not be
+            matrix = np.matmul(mob.transpose(0, 2, 1), tar)
+        else:
+            w = weights if weights.ndim == 1 else weights[start:stop]
+            w = np.broadcast_to(w, mob.shape[:2])
+            weights_sum = w.sum(1)[:, np.newaxis]
+            mob_com = np.einsum('kij,ki->kj', mob, w) / weights_sum
+            tar_com = np.dot(w, tar) / weights_sum
+            # sum of w**2 (mob - mob_com) (tar - tar_com)^T, expanded to
+            # avoid centering a copy of each coordinate set
+            w2 = w ** 2
+            mob_w2 = mob * w2[:, :, np.newaxis]
+            matrix = np.matmul(mob_w2.transpose(0, 2, 1), tar)
+            matrix -= np.einsum('kj,kl->kjl', mob_com, np.dot(w2, tar))
+            matrix -= np.einsum('kj,kl->kjl', mob_w2.sum(1), tar_com)
+            matrix += np.einsum('k,kj,kl->kjl', w2.sum(1), mob_com, tar_com)
+
+        U, _, Vh = np.linalg.svd(matrix)
+        Vh[:, 2] *= np.sign(np.linalg.det(np.matmul(U, Vh)))[:, np.newaxis]
+        rotation = np.matmul(Vh.transpose(0, 2, 1), U.transpose(0, 2, 1))
+        rotations[start:stop] = rotation
+        translations[start:stop] = (tar_com + tar_mean -
+                                    np.einsum('kij,kj->ki', rotation, mob_com))
+
+    return rotations, translations
+
+
+def _applyTransformations(rotations, translations, coordsets, chunk=1024):
+    """Transform *coordsets* in place, coordinate set *i* is rotated using
+    ``rotations[i]`` and translated using ``translations[i]``."""
+
+    for start in range(0, len(coordsets), chunk):
+        stop = min(start + chunk, len(coordsets))
+        coordsets[start:stop] = np.matmul(
+            coordsets[start:stop], rotations[start:stop].transpose(0, 2, 1))
+        coordsets[start:stop] += translations[start:stop, np.newaxis]
+
+
 def applyTransformation(transformation, atoms):
     """Returns *atoms* after applying *transformation*.  If *atoms*
     is a :class:`.Atomic` instance, it will be returned after
@@ -434,6 +498,192 @@ def getRMSD(ref, tar, weights=None):
                 return np.sqrt(rmsd / weights.sum(1).flatten())
 
 
+def buildRMSDMatrix(coordsets, weights=None, superpose=True, format='mat',
+                    n_cpu=1, memmap=None):
+    """Returns RMSDs between all pairs of coordinate sets.  When *superpose*
+    is **True** (default), RMSDs after optimal superposition of each pair are
+    calculated using the quaternion characteristic polynomial method [DLT05]_,
+    without calculating rotations.  Otherwise, RMSDs of coordinates as they
+    are, e.g. after aligning an ensemble, are calculated using matrix
+    products.
+
+    :arg coordsets: coordinate sets with shape ``(n_csets, n_atoms, 3)``, or
+        an object with :meth:`getCoordsets` method, e.g. an :class:`.Ensemble`
+        whose weights are used when *weights* is not given
+    :type coordsets: :class:`numpy.ndarray`, :class:`.Ensemble`,
+        :class:`.Atomic`
+
+    :arg weights: atomic weights with shape ``(n_atoms, 1)``, or
+        ``(n_csets, n_atoms, 1)`` as in :class:`.PDBEnsemble`, in which case
+        each pair is weighted by products of weights of the two sets, so that
+        atoms missing in either set are ignored
+    :type weights: :class:`numpy.ndarray`
+
+    :arg format: ``'mat'`` for a symmetric matrix (default) or ``'arr'`` for
+        the condensed array of the upper triangle, as returned by
+        :func:`scipy.spatial.distance.pdist`
+    :type format: str
+
+    :arg n_cpu: number of threads that calculate blocks of rows
+    :type n_cpu: int
+
+    :arg memmap: name of a :file:`.npy` file, the condensed array is written
+        into this file and returned as a memory-mapped array, e.g. for tens
+        of thousands of conformations that do not fit in memory
+    :type memmap: str
+
+    .. [DLT05] Theobald DL. Rapid calculation of RMSDs using a
+       quaternion-based characteristic polynomial. *Acta Crystallogr A*
+       **2005** 61:478-480."""
+
+    if not isinstance(coordsets, np.ndarray):
+        if weights is None:
+            try:
+                weights = coordsets._getWeights()
+            except AttributeError:
+                pass
+        try:
+            coordsets = coordsets._getCoordsets()
+        except AttributeError:
+            raise TypeError('coordsets must be a numpy array or an object '
+                            'with getCoordsets method')
+    if coordsets is None or coordsets.ndim != 3 or coordsets.shape[2] != 3:
+        raise ValueError('coordsets must have shape (n_csets, n_atoms, 3)')
+    if format not in ('mat', 'arr'):
+        raise ValueError('format must be one of mat or arr')
+    if not isinstance(n_cpu, int) or n_cpu < 1:
+        raise ValueError('n_cpu must be a positive integer')
+    n_csets, n_atoms = coordsets.shape[:2]
+
+    if weights is not None:
+        weights = np.asarray(weights, float)
+        if weights.ndim == 3:
+            weights = checkWeights(weights, n_atoms, n_csets)
+            weights = weights.reshape((n_csets, n_atoms))
+        else:
+            weights = checkWeights(weights, n_atoms)
+            weights = weights.reshape((1, n_atoms))
+        weights = np.ascontiguousarray(weights)
+
+    # translating all sets together does not change RMSDs
+    coords = np.array(coordsets, float, order='C')
+    coords -= coords.reshape((-1, 3)).mean(0)
+    if superpose and (weights is None or len(weights) == 1):
+        # center each set for the QCP kernel
+        if weights is None:
+            coords -= coords.mean(1)[:, np.newaxis]
+        else:
+            coords -= (np.einsum('kij,i->kj', coords, weights[0]) /
+                       weights.sum())[:, np.newaxis]
+
+    size = n_csets * (n_csets - 1) // 2
+    if memmap is not None:
+        if not memmap.endswith('.npy'):
+            memmap += '.npy'
+        out = np.lib.format.open_memmap(memmap, 'w+', float, (size,))
+    else:
+        out = np.zeros(size)
+
+    if superpose:
+        from .rmsdtools import pairwiseRMSD
+        fill = lambda start, stop: pairwiseRMSD(coords, out, start, stop,
+                                                weights)
+        n_blocks = min(n_csets, 64 * n_cpu)
+    else:
+        fill = lambda start, stop: _fillRMSDRows(coords, weights, out,
+                                                 start, stop)
+        # limit blocks of matrix products to about 32 MB
+        n_blocks = max(min(n_csets, 8 * n_cpu),
+                       n_csets * n_csets // 2**22 + 1)
+
+    # blocks of rows have equal areas of the upper triangle
+    bounds = n_csets - np.sqrt(np.linspace(1, 0, n_blocks + 1)) * n_csets
+    bounds = np.unique(bounds.round().astype(int))
+    blocks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    _runBlocks(fill, blocks, n_cpu)
+
+    if memmap is not None:
+        out.flush()
+        return out
+    if format == 'arr':
+        return out
+    rmsd = np.zeros((n_csets, n_csets))
+    for i in range(n_csets - 1):
+        offset = n_csets * i - i * (i + 1) // 2
+        rmsd[i, i + 1:] = rmsd[i + 1:, i] = out[offset:offset + n_csets - i - 1]
+    return rmsd
+
+
+def _fillRMSDRows(coords, weights, out, start, stop):
+    """Fills condensed RMSD array *out* for rows from *start* to *stop*,
+    without superposing coordinate sets."""
+
+    n_csets = len(coords)
+    xyz = coords.reshape((n_csets, -1))
+    if weights is None:
+        sqnorms = (xyz[start:] ** 2).sum(1)
+        msd = np.dot(xyz[start:stop], xyz[start:].T)
+        msd *= -2
+        msd += sqnorms[:stop - start, np.newaxis]
+        msd += sqnorms
+        msd /= coords.shape[1]
+    else:
+        w = weights if len(weights) == 1 else weights[start:]
+        wsq = w * (coords[start:] ** 2).sum(2)
+        wxyz = (coords[start:] * w[:, :, np.newaxis]).reshape((len(wsq), -1))
+        if len(weights) == 1:
+            msd = np.dot(wxyz[:stop - start], xyz[start:].T)
+            msd *= -2
+            msd += wsq.sum(1)[:stop - start, np.newaxis]
+            msd += wsq.sum(1)
+            msd /= w.sum()
+        else:
+            msd = np.dot(wxyz[:stop - start], wxyz.T)
+            msd *= -2
+            msd += np.dot(wsq[:stop - start], w.T)
+            msd += np.dot(w[:stop - start], wsq.T)
+            wsum = np.dot(w[:stop - start], w.T)
+            wsum[wsum == 0] = 1
+            msd /= wsum
+    np.maximum(msd, 0, msd)
+    np.sqrt(msd, msd)
+    for i in range(start, stop):
+        offset = n_csets * i - i * (i + 1) // 2
+        out[offset:offset + n_csets - i - 1] = msd[i - start, i - start + 1:]
+
+
+def _runBlocks(func, blocks, n_cpu=1):
+    """Calls *func* with bounds of each block using *n_cpu* threads."""
+
+    if n_cpu == 1:
+        for start, stop in blocks:
+            func(start, stop)
+        return
+
+    blocks = iter(blocks)
+    lock = threading.Lock()
+    errors = []
+
+    def work():
+        while not errors:
+            with lock:
+                bounds = next(blocks, None)
+            if bounds is None:
+                return
+            try:
+                func(*bounds)
+            except Exception as error:
+                errors.append(error)
+
+    threads = [threading.Thread(target=work) for _ in range(n_cpu)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
 def printRMSD(reference, target=None, weights=None, log=True, msg=None):
     """Print RMSD to the screen.  If *target* has multiple coordinate sets,
     minimum, maximum and mean RMSD values are printed.  If *log* is **True**
@@ -479,17 +729,18 @@ def alignCoordsets(atoms, weights=None):
         ag = atoms.getAtomGroup()
     except AttributeError:
         ag = atoms
-    agacsi = ag.getACSIndex()
 
+    if weights is not None:
+        weights = checkWeights(weights, atoms.numAtoms())
     tar = atoms._getCoords()
-    for i in range(n_csets):
-        if i == acsi:
-            continue
-        atoms.setACSIndex(i)
-        ag.setACSIndex(i)
-        calcTransformation(atoms, tar, weights).apply(ag)
-    atoms.setACSIndex(acsi)
-    ag.setACSIndex(agacsi)
+    others = np.flatnonzero(np.arange(n_csets) != acsi)
+    rotations, translations = getTransformations(
+        atoms._getCoordsets()[others], tar, weights)
+    coordsets = ag._getCoordsets()
+    moved = coordsets[others]
+    _applyTransformations(rotations, translations, moved)
+    coordsets[others] = moved
+    ag._setTimeStamp()
     return atoms
 
 
@@ -22,11 +22,12 @@ from numpy import *
 from prody import LOGGER, SETTINGS, PY3K
 from prody.atomic import AtomGroup, Atom, Atomic, Selection, Select
 from prody.atomic import flags
-from prody.utilities import importLA, checkCoords, showFigure, getCoords
-from prody.measure import calcDistance, calcAngle, calcCenter
+from prody.utilities import importLA, checkCoords, showFigure, getCoords, getDistance
+from prody.measure import calcDistance, calcAngle, calcCenter, getAngle
 from prody.measure.contacts import findNeighbors
+from prody.kdtree import KDTree
 from prody.proteins import writePDB, parsePDB
-from collections import Counter
+from collections import Counter, OrderedDict
 
 from prody.trajectory import TrajBase, Trajectory
 from prody.ensemble import Ensemble
@@ -94,16 +95,299 @@ def calcAngleBetweenPlanes(a1, b1, c1, a2, b2, c2):
     
 def removeDuplicates(list_of_interactions):
     """Remove duplicates from interactions."""
-    ls=[]
+    ls = set()
     newList = []
     for no, i in enumerate(list_of_interactions):
-       i = sorted(list(array(i).astype(str)))
+       i = tuple(sorted(array(i).astype(str)))
        if i not in ls:
-           ls.append(i)
+           ls.add(i)
            newList.append(list_of_interactions[no])
     return newList
 
 
+def _findPairs(coords, radius):
+    """Returns pairs of indices of *coords* that are within *radius* of each
+    other and distances between them, found by a single KDTree search."""
+
+    kdtree = KDTree(coords)
+    kdtree.search(radius)
+    if not kdtree.getCount():
+        return np.zeros((0, 2), int), np.zeros(0)
+    return kdtree.getIndices(), kdtree.getDistances()
+
+
+_FEATURE_CACHE_SIZE = 4
+
+def _getFeatures(atoms):
+    """Returns :class:`_StructureFeatures` of *atoms*.  Features are shared by
+    calls for the same atoms of an atom group, also when they are selected 
+    again, as long as atom and residue labels stay the same.  Features of a 
+    few most recently used selections are kept by the atom group, so they
+    are released together with it."""
+
+    try:
+        ag = atoms.getAtomGroup()
+    except AttributeError:
+        ag = atoms
+        indices = np.arange(atoms.numAtoms())
+    else:
+        indices = atoms.getIndices()
+
+    labels = [indices.tobytes()]
+    for data in (atoms.getNames(), atoms.getResnames(), 
+                 atoms.getResnums(), atoms.getChids()):
+        labels.append(None if data is None else data.tobytes())
+    key = hash(tuple(labels))
+
+    cache = getattr(ag, '_features', None)
+    if cache is None:
+        cache = ag._features = OrderedDict()
+    features = cache.pop(key, None)
+    if features is None:
+        features = _StructureFeatures(ag, indices)
+    cache[key] = features
+    while len(cache) > _FEATURE_CACHE_SIZE:
+        cache.popitem(last=False)
+    features._atoms = atoms
+    return features
+
+
+class _ResidueGroups(object):
+
+    """Atoms at given *positions* in a structure grouped by residue number and
+    chain identifier, in the order residues appear in the structure.  Labels 
+    are taken from the first atom of each group."""
+
+    def __init__(self, features, positions):
+
+        keys = features._getResidueKeys()[positions]
+        order = np.argsort(keys, kind='stable')
+        positions = positions[order]
+        keys = keys[order]
+        if len(keys):
+            starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        else:
+            starts = np.zeros(0, int)
+        self.positions = positions
+        self.starts = starts
+        self.counts = np.diff(np.concatenate([starts, [len(keys)]]))
+        self.keys = keys[starts]
+
+        atoms = features._atoms
+        first = positions[starts]
+        self.resnames = atoms.getResnames()[first]
+        self.resnums = atoms.getResnums()[first]
+        self.chids = atoms.getChids()[first]
+        self.names = atoms.getNames()[first]
+        indices = features._indices[positions]
+        self.indices = ['_'.join(map(str, indices[start:start+count]))
+                        for start, count in zip(starts, self.counts)]
+
+    def __len__(self):
+
+        return len(self.starts)
+
+    def getLabel(self, i, name=False):
+        """Returns residue, atoms and chain labels of group *i*, atoms are 
+        prefixed with the name of the first atom when *name* is **True**."""
+
+        atoms = self.indices[i]
+        if name:
+            atoms = self.names[i] + '_' + atoms
+        return [str(self.resnames[i]) + str(self.resnums[i]), atoms, 
+                str(self.chids[i])]
+
+
+class _StructureFeatures(object):
+
+    """Features of a structure used by interaction kernels, i.e. charged 
+    groups, aromatic rings, hydrophobic atoms and bound hydrogens.  Groups 
+    depend only on atom and residue labels and are built once.  Their centers 
+    and ring normals are recalculated only when the coordinate set changes."""
+
+    def __init__(self, ag, indices):
+
+        self._ag = ag
+        self._indices = indices
+        self._atoms = None
+        self._keys = None
+        self._masks = {}
+        self._groups = {}
+        self._centers = {}
+
+    def _getResidueKeys(self):
+        """Returns residue keys of atoms, numbered in the order residues with
+        distinct residue number and chain identifier appear."""
+
+        if self._keys is None:
+            atoms = self._atoms
+            _, chids = np.unique(atoms.getChids(), return_inverse=True)
+            labels = np.column_stack([chids, atoms.getResnums()])
+            _, first, keys = np.unique(labels, axis=0, return_index=True,
+                                       return_inverse=True)
+            rank = np.empty(len(first), int)
+            rank[np.argsort(first)] = np.arange(len(first))
+            self._keys = rank[keys.ravel()]
+        return self._keys
+
+    def getMask(self, selstr):
+        """Returns a boolean array marking atoms that match *selstr*."""
+
+        mask = self._masks.get(selstr)
+        if mask is None:
+            mask = np.zeros(len(self._indices), bool)
+            selected = self._atoms.select(selstr)
+            if selected is not None:
+                mask[np.searchsorted(self._indices, selected.getIndices())] = True
+            self._masks[selstr] = mask
+        return mask
+
+    def getGroups(self, selstr):
+        """Returns :class:`_ResidueGroups` of atoms that match *selstr*."""
+
+        groups = self._groups.get(selstr)
+        if groups is None:
+            groups = _ResidueGroups(self, np.flatnonzero(self.getMask(selstr)))
+            self._groups[selstr] = groups
+        return groups
+
+    def getRings(self, aromatic_dic):
+        """Returns :class:`_ResidueGroups` of aromatic ring atoms and the number 
+        of aromatic residues without ring atoms.  Ring atoms of a residue are
+        selected using the string in *aromatic_dic* for its residue name."""
+
+        key = ('rings',) + tuple(sorted(aromatic_dic.items()))
+        rings = self._groups.get(key)
+        if rings is None:
+            residues = self.getGroups('resname TRP PHE TYR HIS HSE HSD')
+            keys = self._getResidueKeys()
+            # residue names are taken from the first atom of each residue 
+            first = np.zeros(keys.max() + 1, int)
+            first[keys[::-1]] = np.arange(len(keys))[::-1]
+            resnames = self._atoms.getResnames()[first][keys]
+            aromatic = np.zeros(len(first), bool)
+            aromatic[residues.keys] = True
+            mask = np.zeros(len(keys), bool)
+            for resname, selstr in aromatic_dic.items():
+                mask |= (resnames == resname) & self.getMask(selstr)
+            mask &= aromatic[keys]
+            groups = _ResidueGroups(self, np.flatnonzero(mask))
+            rings = self._groups[key] = (groups, len(residues) - len(groups))
+        return rings
+
+    def getHydrophobicAtoms(self, hydrophobic_dic):
+        """Returns positions of atoms selected by strings in *hydrophobic_dic*
+        together with masks of atoms that are hydrophobic for their residue 
+        and of atoms that are hydrophobic partners, and names of residues 
+        they belong to.  An atom is a partner when it matches the string for 
+        its own residue name, whereas atoms of a residue are selected using 
+        the string for the residue name of its CA atom."""
+
+        key = ('hydrophobic',) + tuple(sorted(hydrophobic_dic.items()))
+        hydrophobic = self._groups.get(key)
+        if hydrophobic is None:
+            keys = self._getResidueKeys()
+            resnames = self._atoms.getResnames()
+            included = np.zeros(keys.max() + 1, bool)
+            included[keys[np.in1d(resnames, list(hydrophobic_dic))]] = True
+            # residues without CA atoms are skipped
+            ca = np.flatnonzero(self.getMask('name CA'))[::-1]
+            ca_resnames = np.zeros(len(included), resnames.dtype)
+            ca_resnames[keys[ca]] = resnames[ca]
+            residues = ca_resnames[keys]
+            selected = np.zeros(len(keys), bool)
+            partner = np.zeros(len(keys), bool)
+            for resname, selstr in hydrophobic_dic.items():
+                mask = self.getMask(selstr)
+                selected |= (residues == resname) & mask
+                partner |= (resnames == resname) & mask
+            selected &= included[keys]
+            positions = np.flatnonzero(selected | partner)
+            hydrophobic = (positions, selected[positions], partner[positions], 
+                           residues[positions])
+            self._groups[key] = hydrophobic
+        return hydrophobic
+
+    def getBoundHydrogens(self, is_hydrogen):
+        """Returns pairs of positions of heavy atoms and hydrogens bound to 
+        them sorted by heavy atom, and number and position of the first pair 
+        of each atom.  Pairs are taken from bonds of the atom group when they 
+        are set, otherwise hydrogens within 1.4 A of heavy atoms in the active 
+        coordinate set are paired once and reused for other coordinate sets."""
+
+        bonds = self._ag._bonds
+        cached = self._groups.get('hydrogens')
+        if cached is not None and cached[0] is bonds:
+            return cached[1:]
+
+        n_atoms = len(self._indices)
+        if bonds is not None:
+            # bonds are given for all atoms of the atom group
+            positions = np.searchsorted(self._indices, bonds)
+            positions[positions == n_atoms] = 0
+            bound = positions[(self._indices[positions] == bonds).all(1)]
+        else:
+            bound = _findPairs(self._atoms._getCoords(), 1.4)[0]
+        bound = bound[is_hydrogen[bound[:, 0]] != is_hydrogen[bound[:, 1]]]
+        flip = is_hydrogen[bound[:, 0]]
+        bound[flip] = bound[flip, ::-1]
+        bound = bound[np.lexsort((bound[:, 1], bound[:, 0]))]
+        n_bound = np.bincount(bound[:, 0], minlength=n_atoms)
+        first = np.cumsum(n_bound) - n_bound
+        self._groups['hydrogens'] = (bonds, bound, n_bound, first)
+        return bound, n_bound, first
+
+    def getCenters(self, groups):
+        """Returns centers of *groups* and normals of planes through their first
+        three atoms for the active coordinate set."""
+
+        atoms = self._atoms
+        acsi = atoms.getACSIndex()
+        stamp = (acsi, self._ag._getTimeStamp(acsi))
+        cached = self._centers.get(id(groups))
+        if cached is not None and cached[0] == stamp:
+            return cached[1:]
+
+        coords = atoms._getCoords()
+        if len(groups):
+            xyz = coords[groups.positions]
+            centers = np.add.reduceat(xyz, groups.starts) / groups.counts[:, None]
+        else:
+            centers = np.zeros((0, 3))
+        normals = np.empty((len(groups), 3))
+        normals.fill(np.nan)
+        planar = groups.counts >= 3
+        p1, p2, p3 = [coords[groups.positions[groups.starts[planar] + i]] 
+                      for i in range(3)]
+        normals[planar] = np.cross(p3 - p1, p2 - p1)
+        self._centers[id(groups)] = (stamp, centers, normals)
+        return centers, normals
+
+
+def _findGroupPairs(centers1, centers2, radius):
+    """Returns pairs of indices of *centers1* and *centers2* that are within
+    *radius* of each other, ordered by the first index, and distances between
+    them.  Pairs are found by a single KDTree search.  When *centers2* is 
+    **None**, unique pairs of *centers1* are returned."""
+
+    n_centers = len(centers1)
+    if centers2 is None:
+        if n_centers < 2:
+            return np.zeros((0, 2), int), np.zeros(0)
+        pairs, dists = _findPairs(centers1, radius)
+        pairs = np.sort(pairs, 1)
+    else:
+        if n_centers == 0 or len(centers2) == 0:
+            return np.zeros((0, 2), int), np.zeros(0)
+        pairs, dists = _findPairs(np.concatenate([centers1, centers2]), radius)
+        pairs = np.sort(pairs, 1)
+        which = (pairs[:, 0] < n_centers) & (pairs[:, 1] >= n_centers)
+        pairs, dists = pairs[which], dists[which]
+        pairs[:, 1] -= n_centers
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    return pairs[order], dists[order]
+
+
 def get_permutation_from_dic(dictionary, key):
     """Check permutations of residue pairs in a dictionary
     format: key=('VAL8', 'LEU89')
@@ -431,49 +715,43 @@ def calcHydrogenBonds(atoms, **kwargs):
     if atoms.hydrogen == None or atoms.hydrogen.numAtoms() < 10:
         LOGGER.info("Provide structure with hydrogens or install Openbabel to add missing hydrogens using addMissingAtoms(pdb_name) first.")
     
-    contacts = findNeighbors(atoms.heavy, distA)
-    short_contacts = cleanNumbers(contacts)
-    pairList = [] # list with Donor-Hydrogen-Acceptor(indices)-distance-Angle
-    
     LOGGER.info('Calculating hydrogen bonds.')
-    hydrogens = atoms.hydrogen
-    for nr_i,i in enumerate(short_contacts):
-        # Removing those close contacts which are between neighbour atoms
-        if i[1] - seq_cutoff < i[0] < i[1] + seq_cutoff:
-            continue
-        
-        if (i[2][0] in donors and i[3][0] in acceptors) or (i[2][0] in acceptors and i[3][0] in donors): # First letter is checked
-            listOfHydrogens1 = cleanNumbers(findNeighbors(hydrogens, 1.4, atoms.select('index '+str(i[0]))))
-            listOfHydrogens2 = cleanNumbers(findNeighbors(hydrogens, 1.4, atoms.select('index '+str(i[1]))))
-            AtomsForAngle = ['D','H','A', 'distance','angle']
-            
-            if not listOfHydrogens1:
-                for j in listOfHydrogens2:
-                    AtomsForAngle = [j[1], j[0], i[0], i[-1], calcAngle(atoms.select('index '+str(j[1])), 
-                                                                        atoms.select('index '+str(j[0])), 
-                                                                        atoms.select('index '+str(i[0])))[0]]                                                                                   
-                    pairList.append(AtomsForAngle)            
-            
-            elif not listOfHydrogens2:
-                for jj in listOfHydrogens1:
-                    AtomsForAngle = [jj[1], jj[0], i[1], i[-1], calcAngle(atoms.select('index '+str(jj[1])), 
-                                                                          atoms.select('index '+str(jj[0])), 
-                                                                          atoms.select('index '+str(i[1])))[0]]
-                    pairList.append(AtomsForAngle)            
-    
-            else:            
-                for j in listOfHydrogens2:
-                    AtomsForAngle = [j[1], j[0], i[0], i[-1], calcAngle(atoms.select('index '+str(j[1])), 
-                                                                        atoms.select('index '+str(j[0])), 
-                                                                        atoms.select('index '+str(i[0])))[0]]                                                                                   
-                    pairList.append(AtomsForAngle)
-
-                
-                for jj in listOfHydrogens1:
-                    AtomsForAngle = [jj[1], jj[0], i[1], i[-1], calcAngle(atoms.select('index '+str(jj[1])), 
-                                                                          atoms.select('index '+str(jj[0])), 
-                                                                          atoms.select('index '+str(i[1])))[0]]
-                    pairList.append(AtomsForAngle)
+    indices = atoms._getIndices() if hasattr(atoms, '_getIndices') else np.arange(len(coords))
+    names = atoms.getNames()
+    is_hydrogen = atoms.getFlags('hydrogen')
+    heavy = np.flatnonzero(~is_hydrogen)
+    if len(heavy) <= 1:
+        raise ValueError('atoms must be more than 1')
+
+    # donor-acceptor pairs of heavy atoms from a single pair search
+    pairs, dists = _findPairs(coords[heavy], distA)
+    pairs = heavy[pairs]
+    i0, i1 = indices[pairs[:, 0]], indices[pairs[:, 1]]
+
+    # removing those close contacts which are between neighbour atoms
+    # and checking first letters of atom names
+    unique, inverse = np.unique(names, return_inverse=True)
+    is_donor = np.array([name[:1] in donors for name in unique], bool)[inverse]
+    is_acceptor = np.array([name[:1] in acceptors for name in unique], bool)[inverse]
+    p0, p1 = pairs[:, 0], pairs[:, 1]
+    which = ~((i1 - seq_cutoff < i0) & (i0 < i1 + seq_cutoff))
+    which &= (is_donor[p0] & is_acceptor[p1]) | (is_acceptor[p0] & is_donor[p1])
+    p0, p1, dists = p0[which], p1[which], dists[which]
+
+    # hydrogens bound to heavy atoms, grouped by heavy atom
+    bound, n_bound, first = _getFeatures(atoms).getBoundHydrogens(is_hydrogen)
+
+    # D-H-A triplets, for each contact hydrogens of its second atom come 
+    # first, and each atom takes the role of donor for its own hydrogens
+    donor = np.column_stack([p1, p0]).ravel()
+    acceptor = np.column_stack([p0, p1]).ravel()
+    counts = n_bound[donor]
+    hydrogen = bound[np.arange(counts.sum()) + 
+                     np.repeat(first[donor] - np.cumsum(counts) + counts, counts), 1]
+    donor = np.repeat(donor, counts)
+    acceptor = np.repeat(acceptor, counts)
+    distances = np.repeat(np.repeat(dists, 2), counts)
+    angles = getAngle(coords[donor], coords[hydrogen], coords[acceptor])
     
     HBs_list = []
     ag = atoms.getAtomGroup()
@@ -481,17 +759,18 @@ def calcHydrogenBonds(atoms, **kwargs):
     resnums = ag.getResnums()
     names = ag.getNames()
     chids = ag.getChids()
-    for k in pairList:
-        if 180-angle < float(k[-1]) < 180 and float(k[-2]) < distA:
-            aa_donor = resnames[k[0]]+str(resnums[k[0]])
-            aa_donor_atom = names[k[0]]+'_'+str(k[0])
-            aa_donor_chain = chids[k[0]]
-            aa_acceptor = resnames[k[2]]+str(resnums[k[2]])
-            aa_acceptor_atom = names[k[2]]+'_'+str(k[2])
-            aa_acceptor_chain = chids[k[2]]
-            
-            HBs_list.append([str(aa_donor), str(aa_donor_atom), str(aa_donor_chain), str(aa_acceptor), str(aa_acceptor_atom), 
-                             str(aa_acceptor_chain), np.round(float(k[-2]),4), np.round(180.0-float(k[-1]),4)])
+    which = (180 - angle < angles) & (angles < 180) & (distances < distA)
+    for k in zip(indices[donor[which]], indices[acceptor[which]], 
+                 distances[which], angles[which]):
+        aa_donor = resnames[k[0]]+str(resnums[k[0]])
+        aa_donor_atom = names[k[0]]+'_'+str(k[0])
+        aa_donor_chain = chids[k[0]]
+        aa_acceptor = resnames[k[1]]+str(resnums[k[1]])
+        aa_acceptor_atom = names[k[1]]+'_'+str(k[1])
+        aa_acceptor_chain = chids[k[1]]
+        
+        HBs_list.append([str(aa_donor), str(aa_donor_atom), str(aa_donor_chain), str(aa_acceptor), str(aa_acceptor_atom), 
+                         str(aa_acceptor_chain), np.round(float(k[-2]),4), np.round(180.0-float(k[-1]),4)])
     
     HBs_list = sorted(HBs_list, key=lambda x : x[-2])
     HBs_list_final = removeDuplicates(HBs_list)
@@ -600,35 +879,19 @@ def calcSaltBridges(atoms, **kwargs):
     distSB = kwargs.pop('distSB', 5.)
     distA = kwargs.pop('distA', distSB)
 
-    atoms_KRED = atoms.select('protein and ((resname ASP GLU LYS ARG and not backbone and not name OXT NE "C.*" and noh) or (resname HIS HSE HSD HSP and name NE2))')
-    charged_residues = list(set(zip(atoms_KRED.getResnums(), atoms_KRED.getChids())))
+    features = _getFeatures(atoms)
+    charged = features.getGroups('protein and ((resname ASP GLU LYS ARG and not backbone and not name OXT NE "C.*" and noh) or (resname HIS HSE HSD HSP and name NE2))')
+    centers = features.getCenters(charged)[0]
     
     LOGGER.info('Calculating salt bridges.')
-    SaltBridges_list = []
-    for i in charged_residues:
-        sele1 = atoms_KRED.select('resid '+str(i[0])+' and chain '+i[1])
-        try:
-            sele1_center = calcCenter(sele1.getCoords())
-            sele2 = atoms_KRED.select('same residue as exwithin '+str(distA)+' of center', center=sele1_center)
-        except:
-            sele1_center = sele1.getCoords()
-            sele2 = atoms_KRED.select('same residue as exwithin '+str(distA)+' of center', center=sele1.getCoords())            
- 
-        if sele1 != None and sele2 != None:
-            for ii in np.unique(sele2.getResnums()):                
-                sele2_single = sele2.select('resid '+str(ii))
-                try:
-                    distance = calcDistance(sele1_center,calcCenter(sele2_single.getCoords()))
-                except: 
-                    distance = calcDistance(sele1_center,sele2_single.getCoords())
-                
-                if distance < distA and sele1.getNames()[0][0] != sele2_single.getNames()[0][0]:
-                    SaltBridges_list.append([sele1.getResnames()[0]+str(sele1.getResnums()[0]), sele1.getNames()[0]+'_'+'_'.join(map(str,sele1.getIndices())), sele1.getChids()[0],
-                                                  sele2_single.getResnames()[0]+str(sele2_single.getResnums()[0]), sele2_single.getNames()[0]+'_'+'_'.join(map(str,sele2_single.getIndices())), 
-                                                  sele2_single.getChids()[0], round(distance,4)])
+    pairs = _findGroupPairs(centers, None, distA)[0]
+    distances = getDistance(centers[pairs[:, 0]], centers[pairs[:, 1]])
+    letters = np.array([name[:1] for name in charged.names])
+    which = (distances < distA) & (letters[pairs[:, 0]] != letters[pairs[:, 1]])
+    SaltBridges_list = [charged.getLabel(i, True) + charged.getLabel(j, True) + [round(distance,4)]
+                        for (i, j), distance in zip(pairs[which], distances[which])]
     
     SaltBridges_list = sorted(SaltBridges_list, key=lambda x : x[-1])
-    [ SaltBridges_list.remove(j) for i in SaltBridges_list for j in SaltBridges_list if Counter(i) == Counter(j) ]
     SaltBridges_list_final = removeDuplicates(SaltBridges_list)
     
     selection = kwargs.get('selection', None)
@@ -685,34 +948,19 @@ def calcRepulsiveIonicBonding(atoms, **kwargs):
     distRB = kwargs.pop('distRB', 4.5)
     distA = kwargs.pop('distA', distRB)
 
-    atoms_KRED = atoms.select('protein and resname ASP GLU LYS ARG and not backbone and not name OXT NE "C.*" and noh')
-    charged_residues = list(set(zip(atoms_KRED.getResnums(), atoms_KRED.getChids())))
+    features = _getFeatures(atoms)
+    charged = features.getGroups('protein and resname ASP GLU LYS ARG and not backbone and not name OXT NE "C.*" and noh')
+    centers = features.getCenters(charged)[0]
     
     LOGGER.info('Calculating repulsive ionic bonding.')
-    RepulsiveIonicBonding_list = []
-    for i in charged_residues:
-        sele1 = atoms_KRED.select('resid '+str(i[0])+' and chain '+i[1])
-        try:
-            sele1_center = calcCenter(sele1.getCoords())
-            sele2 = atoms_KRED.select('same residue as exwithin '+str(distA)+' of center', center=sele1_center)
-        except:
-            sele1_center = sele1.getCoords()
-            sele2 = atoms_KRED.select('same residue as exwithin '+str(distA)+' of center', center=sele1_center)            
- 
-        if sele1 != None and sele2 != None:
-            for ii in np.unique(sele2.getResnums()):                
-                sele2_single = sele2.select('resid '+str(ii))
-                try:
-                    distance = calcDistance(sele1_center,calcCenter(sele2_single.getCoords()))
-                except: 
-                    distance = calcDistance(sele1_center,sele2_single.getCoords())
-                
-                if distance < distA and sele1.getNames()[0][0] == sele2_single.getNames()[0][0] and distance > 0:
-                    RepulsiveIonicBonding_list.append([sele1.getResnames()[0]+str(sele1.getResnums()[0]), sele1.getNames()[0]+'_'+'_'.join(map(str,sele1.getIndices())), sele1.getChids()[0],
-                                                  sele2_single.getResnames()[0]+str(sele2_single.getResnums()[0]), sele2_single.getNames()[0]+'_'+'_'.join(map(str,sele2_single.getIndices())), 
-                                                  sele2_single.getChids()[0], round(distance,4)])
+    pairs = _findGroupPairs(centers, None, distA)[0]
+    distances = getDistance(centers[pairs[:, 0]], centers[pairs[:, 1]])
+    letters = np.array([name[:1] for name in charged.names])
+    which = ((distances < distA) & (distances > 0) & 
+             (letters[pairs[:, 0]] == letters[pairs[:, 1]]))
+    RepulsiveIonicBonding_list = [charged.getLabel(i, True) + charged.getLabel(j, True) + [round(distance,4)]
+                                  for (i, j), distance in zip(pairs[which], distances[which])]
     
-    [ RepulsiveIonicBonding_list.remove(j) for i in RepulsiveIonicBonding_list for j in RepulsiveIonicBonding_list if Counter(i) == Counter(j) ]
     RepulsiveIonicBonding_list = sorted(RepulsiveIonicBonding_list, key=lambda x : x[-1])
     RepulsiveIonicBonding_list_final = removeDuplicates(RepulsiveIonicBonding_list)
 
@@ -729,15 +977,6 @@ def calcRepulsiveIonicBonding(atoms, **kwargs):
     return RepulsiveIonicBonding_list_final2
 
 
-def calcPiStacking_once(sele1, sele2, distA, angle_min, angle_max, data):
-    """Helper function to be used by calcPiStacking"""
-    a1, b1, c1, a2, b2, c2 = calcPlane(sele1)[:3]+calcPlane(sele2)[:3]
-    RingRing_angle = calcAngleBetweenPlanes(a1, b1, c1, a2, b2, c2) # plane is computed based on 3 points of rings
-    RingRing_distance = calcDistance(calcCenter(sele1), calcCenter(sele2))
-    if RingRing_distance < distA and angle_min < RingRing_angle < angle_max:
-        return data+[round(RingRing_distance,4), round(RingRing_angle,4)]
-
-
 def calcPiStacking(atoms, **kwargs):
     """Finds π–π stacking interactions (between aromatic rings).
     
@@ -819,37 +1058,24 @@ def calcPiStacking(atoms, **kwargs):
     for key, value in non_standard.items():
         aromatic_dic[key] = value
     
-    atoms_cylic = atoms.select('resname TRP PHE TYR HIS HSE HSD')
-    if atoms_cylic is None:
+    features = _getFeatures(atoms)
+    rings = features.getRings(aromatic_dic)[0]
+    if not len(rings):
         return []
-    
-    aromatic_resids = list(set(zip(atoms_cylic.getResnums(), atoms_cylic.getChids())))
 
     LOGGER.info('Calculating Pi stacking interactions.')
-    PiStack_calculations = []
-    items = []
-    for i in aromatic_resids:
-        for j in aromatic_resids:
-            if i != j: 
-                sele1_full = atoms.select('resid '+str(i[0])+' and chain '+i[1])
-                sele1_name = sele1_full.getResnames()
-                sele1 = sele1_full.select(aromatic_dic[sele1_name[0]])
-                
-                sele2_full = atoms.select('resid '+str(j[0])+' and chain '+j[1])
-                sele2_name = sele2_full.getResnames()
-                sele2 = sele2_full.select(aromatic_dic[sele2_name[0]])
-
-                if sele1 != None and sele2 != None:
-                    items.append([sele1.getCoords(), sele2.getCoords(), distA, angle_min, angle_max,
-                                  [str(sele1.getResnames()[0])+str(sele1.getResnums()[0]), '_'.join(map(str,sele1.getIndices())), str(sele1.getChids()[0]),
-                                   str(sele2.getResnames()[0])+str(sele2.getResnums()[0]), '_'.join(map(str,sele2.getIndices())), str(sele2.getChids()[0])]])
-
-    # create a process pool that uses all cpus
-    with multiprocessing.Pool() as pool:
-        # call the function for each item in parallel with multiple arguments
-        for result in pool.starmap(calcPiStacking_once, items):
-            if result is not None:
-                PiStack_calculations.append(result)
+    centers, normals = features.getCenters(rings)
+    pairs = _findGroupPairs(centers, None, distA)[0]
+    distances = getDistance(centers[pairs[:, 0]], centers[pairs[:, 1]])
+    # planes are computed based on 3 points of rings
+    normals1, normals2 = normals[pairs[:, 0]], normals[pairs[:, 1]]
+    cosines = ((normals1 * normals2).sum(1) / 
+               (np.sqrt((normals1 ** 2).sum(1)) * np.sqrt((normals2 ** 2).sum(1))))
+    angles = np.degrees(np.arccos(np.clip(cosines, -1, 1)))
+    which = (distances < distA) & (angle_min < angles) & (angles < angle_max)
+    PiStack_calculations = [rings.getLabel(i) + rings.getLabel(j) + [round(distance,4), round(RingRing_angle,4)]
+                            for (i, j), distance, RingRing_angle 
+                            in zip(pairs[which], distances[which], angles[which])]
     
     PiStack_calculations = sorted(PiStack_calculations, key=lambda x : x[-2])   
     PiStack_calculations_final = removeDuplicates(PiStack_calculations)
@@ -935,37 +1161,22 @@ def calcPiCation(atoms, **kwargs):
     for key, value in non_standard.items():
         aromatic_dic[key] = value
         
-    atoms_cylic = atoms.select('resname TRP PHE TYR HIS HSE HSD')
-    if atoms_cylic is None:
+    features = _getFeatures(atoms)
+    rings, missing = features.getRings(aromatic_dic)
+    if not len(rings) and not missing:
         return []
-    
-    aromatic_resids = list(set(zip(atoms_cylic.getResnums(), atoms_cylic.getChids())))
+    if missing:
+        raise ValueError("Missing atoms from the side chains of the structure. Use addMissingAtoms.")
+    cations = features.getGroups('resname ARG LYS and noh and not backbone and not name NE "C.*"')
 
-    PiCation_calculations = []
     LOGGER.info('Calculating cation-Pi interactions.')
-    
-    for i in aromatic_resids:
-        sele1_name = atoms.select('resid '+str(i[0])+' and chain '+i[1]+' and name CA').getResnames()
-        
-        try:
-            sele1 = atoms.select('resid '+str(i[0])+' and chain '+i[1]+' and '+aromatic_dic[sele1_name[0]])
-            sele2 = atoms.select('(same residue as exwithin '+str(distA)+' of center) and resname ARG LYS and noh and not backbone and not name NE "C.*"', 
-                               center=calcCenter(sele1.getCoords()))
-        except:
-            raise ValueError("Missing atoms from the side chains of the structure. Use addMissingAtoms.")
-        
-        if sele1 != None and sele2 != None:
-            for ii in np.unique(sele2.getResnums()):
-                sele2_single = sele2.select('resid '+str(ii))
-                try:
-                    RingCation_distance = calcDistance(calcCenter(sele1.getCoords()),calcCenter(sele2_single.getCoords()))
-                except: 
-                    RingCation_distance = calcDistance(calcCenter(sele1.getCoords()),sele2_single.getCoords())
-                
-                if RingCation_distance < distA:
-                    PiCation_calculations.append([str(sele1_name[0])+str(sele1.getResnums()[0]), '_'.join(map(str,sele1.getIndices())), str(sele1.getChids()[0]),
-                                                  str(sele2_single.getResnames()[0])+str(sele2_single.getResnums()[0]), sele2_single.getNames()[0]+'_'+'_'.join(map(str,sele2_single.getIndices())), 
-                                                  str(sele2_single.getChids()[0]), round(RingCation_distance,4)])
+    ring_centers = features.getCenters(rings)[0]
+    cation_centers = features.getCenters(cations)[0]
+    pairs = _findGroupPairs(ring_centers, cation_centers, distA)[0]
+    distances = getDistance(ring_centers[pairs[:, 0]], cation_centers[pairs[:, 1]])
+    which = distances < distA
+    PiCation_calculations = [rings.getLabel(i) + cations.getLabel(j, True) + [round(distance,4)]
+                             for (i, j), distance in zip(pairs[which], distances[which])]
     
     PiCation_calculations = sorted(PiCation_calculations, key=lambda x : x[-1]) 
     PiCation_calculations_final = removeDuplicates(PiCation_calculations)
@@ -1053,18 +1264,15 @@ def calcHydrophobic(atoms, **kwargs):
         hydrophobic_dic[key] = value
 
     
-    Hydrophobic_list = []  
-    # All residues, also non-standard will be included in the selection:
-    residue_list = list(hydrophobic_dic.keys())
-    atoms_hydrophobic = atoms.select('resname '+' '.join(residue_list))
-    hydrophobic_resids = list(set(zip(atoms_hydrophobic.getResnums(), atoms_hydrophobic.getChids())))
-
     if atoms.aromatic is None:
         return []
     
-    aromatic_nr = list(set(zip(atoms.aromatic.getResnums(),atoms.aromatic.getChids())))   
     aromatic = list(set(atoms.aromatic.getResnames()))
     
+    # All residues, also non-standard will be included in the selection:
+    residue_list = list(hydrophobic_dic.keys())
+    atoms_hydrophobic = atoms.select('resname '+' '.join(residue_list))
+
     # Computing hydrophobic overlaping areas for pairs of residues:
     try:
         hpb_overlaping_results = calcHydrophobicOverlapingAreas(atoms_hydrophobic, cumulative_values='pairs')
@@ -1072,59 +1280,55 @@ def calcHydrophobic(atoms, **kwargs):
         LOGGER.info('Please provide hpb.so file to obtain additional data.')
     
     LOGGER.info('Calculating hydrophobic interactions.')
+    features = _getFeatures(atoms)
+    positions, selected, partner, residues = features.getHydrophobicAtoms(hydrophobic_dic)
+    keys = features._getResidueKeys()[positions]
+    resnames = atoms.getResnames()[positions]
+    if len(positions) > 1:
+        pairs, dists = _findPairs(atoms._getCoords()[positions], distA)
+    else:
+        pairs, dists = np.zeros((0, 2), int), np.zeros(0)
+
+    # atoms of each residue are compared with partners in other residues,
+    # aromatic residues are not paired with TYR, PHE and TRP to avoid double
+    # counting pi stacking
+    atoms1 = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    atoms2 = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    dists = np.concatenate([dists, dists])
+    which = selected[atoms1] & partner[atoms2] & (keys[atoms1] != keys[atoms2])
+    which &= ~(np.in1d(residues[atoms1], aromatic) & 
+               np.in1d(resnames[atoms2], ['TYR', 'PHE', 'TRP']))
+    which &= dists < distA
+    atoms1, atoms2, dists = atoms1[which], atoms2[which], dists[which]
+
+    # only the closest pair of atoms is kept for each residue
+    order = np.lexsort((dists, keys[atoms1]))
+    atoms1, atoms2, dists = atoms1[order], atoms2[order], dists[order]
+    first = np.ones(len(atoms1), bool)
+    first[1:] = keys[atoms1][1:] != keys[atoms1][:-1]
+
+    indices = features._indices[positions]
+    names = atoms.getNames()[positions]
+    resnums = atoms.getResnums()[positions]
+    chids = atoms.getChids()[positions]
     Hydrophobic_calculations = []
-    for i in hydrophobic_resids:
+    for i, j, distance in zip(atoms1[first], atoms2[first], dists[first]):
+        residue1 = resnames[i] + str(resnums[i]) 
+        residue2 = resnames[j] + str(resnums[j])
         try:
-            sele1_name = atoms.select('resid '+str(i[0])+' and chain '+i[1]+' and name CA').getResnames()
-            sele1 = atoms.select('resid '+str(i[0])+' and '+' chain '+i[1]+' and '+hydrophobic_dic[sele1_name[0]]) 
-            sele1_nr = sele1.getResnums()[0]  
-            sele2 = atoms.select('(same residue as exwithin '+str(distA)+' of (resid '+str(sele1_nr)+' and chain '+i[1]+' and resname '+sele1_name[0]+
-                               ')) and ('+' or '.join([ '(resname '+item[0]+' and '+item[1]+')' for item in hydrophobic_dic.items() ])+')')
-
+            Hydrophobic_calculations.append([residue1, 
+                                        names[i]+'_'+str(indices[i]), chids[i],
+                                        residue2, 
+                                        names[j]+'_'+str(indices[j]), chids[j],
+                                        round(float(distance),4),
+                                        round(get_permutation_from_dic(hpb_overlaping_results,(residue1+chids[i],
+                                        residue2+chids[j])),4)])
         except:
-            LOGGER.info("Missing atoms from the side chains of the structure. Use PDBFixer.")
-            sele1 = None
-            sele2 = None
-        
-        if sele2 != None:
-            sele2_nr = list(set(zip(sele2.getResnums(), sele2.getChids())))
-
-            if sele1_name[0] in aromatic:
-                # avoid double counting pi stacking and don't include same residue interactions
-                sele2_filter = sele2.select('all and not (resname TYR PHE TRP or resid '+str(i[0])+' and chain '+i[1]+')')
-                if sele2_filter != None:
-                    listOfAtomToCompare = cleanNumbers(findNeighbors(sele1, distA, sele2_filter))
-                
-            elif sele1_name[0] not in aromatic and i in sele2_nr:
-                # don't include same residue interactions but don't worry about double counting pi stacking
-                sele2_filter = sele2.select(sele2.select('all and not (resid '+str(i[0])+' and chain '+i[1]+')'))
-                if sele2_filter != None:
-                    listOfAtomToCompare = cleanNumbers(findNeighbors(sele1, distA, sele2_filter))
-            else:
-                listOfAtomToCompare = cleanNumbers(findNeighbors(sele1, distA, sele2))
-                                                           
-            if listOfAtomToCompare != []:
-                listOfAtomToCompare = sorted(listOfAtomToCompare, key=lambda x : x[-1])
-                minDistancePair = listOfAtomToCompare[0]
-                if minDistancePair[-1] < distA:
-                    sele1_new = atoms.select('index '+str(minDistancePair[0])+' and name '+str(minDistancePair[2]))
-                    sele2_new = atoms.select('index '+str(minDistancePair[1])+' and name '+str(minDistancePair[3]))
-                    residue1 = sele1_new.getResnames()[0]+str(sele1_new.getResnums()[0]) 
-                    residue2 = sele2_new.getResnames()[0]+str(sele2_new.getResnums()[0])
-                    try:
-                        Hydrophobic_calculations.append([residue1, 
-                                                    minDistancePair[2]+'_'+str(minDistancePair[0]), sele1_new.getChids()[0],
-                                                    residue2, 
-                                                    minDistancePair[3]+'_'+str(minDistancePair[1]), sele2_new.getChids()[0],
-                                                    round(minDistancePair[-1],4),
-                                                    round(get_permutation_from_dic(hpb_overlaping_results,(residue1+sele1_new.getChids()[0],
-                                                    residue2+sele2_new.getChids()[0])),4)])
-                    except:
-                        Hydrophobic_calculations.append([residue1, 
-                                                    minDistancePair[2]+'_'+str(minDistancePair[0]), sele1_new.getChids()[0],
-                                                    residue2, 
-                                                    minDistancePair[3]+'_'+str(minDistancePair[1]), sele2_new.getChids()[0],
-                                                    round(minDistancePair[-1],4)])                         
+            Hydrophobic_calculations.append([residue1, 
+                                        names[i]+'_'+str(indices[i]), chids[i],
+                                        residue2, 
+                                        names[j]+'_'+str(indices[j]), chids[j],
+                                        round(float(distance),4)])                         
     
     selection = kwargs.get('selection', None)
     selection2 = kwargs.get('selection2', None) 
@@ -1295,6 +1499,122 @@ def calcMetalInteractions(atoms, distA=3.0, extraIons=['FE'], excluded_ions=['SO
         raise TypeError('An object should contain ions')
 
 
+def _getFrameRange(n_frames, start_frame, stop_frame):
+    """Returns indices of frames from *start_frame* to *stop_frame* (inclusive)
+    as in slicing of trajectories, ``stop_frame=-1`` reads to the end."""
+
+    if stop_frame == -1:
+        return range(n_frames)[start_frame:]
+    return range(n_frames)[start_frame:stop_frame+1]
+
+
+def _readFrames(trajectory, start, stop):
+    """Returns coordinate sets of selected atoms from *start* to *stop* 
+    without changing the position of *trajectory*."""
+
+    if isinstance(trajectory, TrajBase):
+        coords = np.empty((stop - start, trajectory.numSelected(), 3))
+        trajectory._readChunk(start, stop, coords, trajectory._indices)
+        return coords
+    return trajectory.getCoordsets(list(range(start, stop)))
+
+
+def _profileFrames(atoms, funcs, frames, trajectory=None, select='protein',
+                   n_cpu=1, label='Frame', **kwargs):
+    """Returns a list with results of each of *funcs* for each of *frames*.
+    When *trajectory* is given, its coordinate sets are read in chunks and
+    set to a single copy of *atoms*, otherwise *frames* are coordinate sets 
+    of *atoms*.  Atoms matching *select* are selected once and passed to 
+    *funcs* with *kwargs*.  When *n_cpu* is greater than 1, chunks of frames 
+    are profiled by a pool of processes and results are merged in order."""
+
+    if trajectory is not None:
+        atoms = atoms.copy()
+
+    frames = list(frames)
+    n_cpu = min(multiprocessing.cpu_count(), max(1, int(n_cpu)), 
+                max(1, len(frames)))
+    if n_cpu == 1:
+        size = 64
+    else:
+        size = int(np.clip(len(frames) // (8 * n_cpu), 1, 64))
+    chunks = [frames[i:i+size] for i in range(0, len(frames), size)]
+
+    def tasks(chunks):
+        for chunk in chunks:
+            if trajectory is None:
+                yield chunk, None
+            else:
+                # frames are consecutive
+                yield chunk, _readFrames(trajectory, chunk[0], chunk[-1] + 1)
+
+    results = []
+    if n_cpu == 1:
+        _attachFrameProfiler(atoms, funcs, select, label, kwargs)
+        try:
+            for task in tasks(chunks):
+                results.extend(_profileFrameChunk(task))
+        finally:
+            _attachFrameProfiler(None, None, None, None, None)
+        return results
+
+    pool = multiprocessing.Pool(n_cpu, initializer=_attachFrameProfiler,
+                                initargs=(atoms, funcs, select, label, kwargs))
+    try:
+        # a limited number of chunks are read ahead of workers
+        n_round = 4 * n_cpu
+        for i in range(0, len(chunks), n_round):
+            for result in pool.map(_profileFrameChunk, 
+                                   tasks(chunks[i:i+n_round]), chunksize=1):
+                results.extend(result)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+_FRAME_PROFILER = None
+
+def _attachFrameProfiler(atoms, funcs, select, label, kwargs):
+    """Prepares a process for :func:`_profileFrameChunk` calls.  The selection
+    of profiled atoms is made once and is kept for the lifetime of workers."""
+
+    global _FRAME_PROFILER
+    if atoms is None:
+        _FRAME_PROFILER = None
+        return
+    selected = atoms if select is None else atoms.select(select)
+    _FRAME_PROFILER = (atoms, selected, funcs, label, kwargs)
+
+
+def _profileFrameChunk(task):
+    """Returns results of profiled functions for a chunk of frames."""
+
+    atoms, selected, funcs, label, kwargs = _FRAME_PROFILER
+    indices, coordsets = task
+    results = []
+    for k, index in enumerate(indices):
+        LOGGER.info('{0}: {1}'.format(label, index))
+        if coordsets is None:
+            selected.setACSIndex(index)
+        else:
+            atoms.setCoords(coordsets[k])
+        results.append([func(selected, **kwargs) for func in funcs])
+    return results
+
+
+def _listFrameLigandInteractions(atoms, **kwargs):
+    """Returns a list of protein-ligand interactions of all ligands in *atoms*
+    for profiling frames with :func:`_profileFrames`."""
+
+    ligand_interactions, ligand = calcLigandInteractions(atoms)
+
+    interactions = []
+    for ligs in ligand_interactions:
+        interactions.extend(listLigandInteractions(ligs, **kwargs))
+    return interactions
+
+
 def calcInteractionsMultipleFrames(atoms, interaction_type, trajectory, **kwargs):
     """Compute selected type interactions for DCD trajectory or multi-model PDB 
     using default parameters."""
@@ -1308,9 +1628,9 @@ def calcInteractionsMultipleFrames(atoms, interaction_type, trajectory, **kwargs
             raise TypeError('coords must be an object '
                             'with `getCoords` method')    
     
-    interactions_all = []
     start_frame = kwargs.pop('start_frame', 0)
     stop_frame = kwargs.pop('stop_frame', -1)
+    n_cpu = kwargs.pop('n_cpu', 1)
 
     interactions_dic = {
     "HBs": calcHydrogenBonds,
@@ -1321,41 +1641,26 @@ def calcInteractionsMultipleFrames(atoms, interaction_type, trajectory, **kwargs
     "HPh": calcHydrophobic,
     "DiB": calcDisulfideBonds
     }
+    funcs = [interactions_dic[interaction_type]]
     
     if trajectory is not None: 
         if isinstance(trajectory, Atomic):
             trajectory = Ensemble(trajectory)
         
-        nfi = trajectory._nfi    
-        trajectory.reset()
-        numFrames = trajectory._n_csets
-        
-        if stop_frame == -1:
-            traj = trajectory[start_frame:]
-        else:
-            traj = trajectory[start_frame:stop_frame+1]
-        
-        atoms_copy = atoms.copy()
-        for j0, frame0 in enumerate(traj, start=start_frame):
-            LOGGER.info('Frame: {0}'.format(j0))
-            atoms_copy.setCoords(frame0.getCoords())
-            protein = atoms_copy.select('protein')
-            interactions = interactions_dic[interaction_type](protein, **kwargs)
-            interactions_all.append(interactions)
-        trajectory._nfi = nfi
+        frames = _getFrameRange(trajectory.numCoordsets(), start_frame, stop_frame)
+        results = _profileFrames(atoms, funcs, frames, trajectory, 
+                                 n_cpu=n_cpu, **kwargs)
     
     else:
         if atoms.numCoordsets() > 1:
-            for i in range(len(atoms.getCoordsets()[start_frame:stop_frame])):
-                LOGGER.info('Model: {0}'.format(i+start_frame))
-                atoms.setACSIndex(i+start_frame)
-                protein = atoms.select('protein')
-                interactions = interactions_dic[interaction_type](protein, **kwargs)
-                interactions_all.append(interactions)
+            frames = _getFrameRange(atoms.numCoordsets(), start_frame, stop_frame)
+            results = _profileFrames(atoms, funcs, frames, n_cpu=n_cpu, 
+                                     label='Model', **kwargs)
         else:
             LOGGER.info('Include trajectory or use multi-model PDB file.')
+            results = []
     
-    return interactions_all
+    return [result[0] for result in results]
 
 
 def calcProteinInteractions(atoms, **kwargs):
@@ -1440,6 +1745,10 @@ def calcHydrogenBondsTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
@@ -1475,6 +1784,10 @@ def calcSaltBridgesTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
@@ -1511,6 +1824,10 @@ def calcRepulsiveIonicBondingTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
@@ -1555,6 +1872,10 @@ def calcPiStackingTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
@@ -1592,6 +1913,10 @@ def calcPiCationTrajectory(atoms, trajectory=None, **kwargs):
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
 
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
+
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
         selection='chain A and resid 1 to 50'
@@ -1626,6 +1951,10 @@ def calcHydrophobicTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     
     Selection:
     If we want to select interactions for the particular residue or group of residues: 
@@ -1654,6 +1983,10 @@ def calcDisulfideBondsTrajectory(atoms, trajectory=None, **kwargs):
 
     :arg stop_frame: index of last frame to read
     :type stop_frame: int
+
+    :arg n_cpu: number of processes profiling frames in parallel,
+        default is 1
+    :type n_cpu: int
     """
 
     return calcInteractionsMultipleFrames(atoms, 'DiB', trajectory, **kwargs)
@@ -3439,6 +3772,10 @@ class InteractionsTrajectory(object):
 
         :arg stop_frame: index of last frame to read
         :type stop_frame: int
+
+        :arg n_cpu: number of processes profiling frames in parallel,
+            default is 1
+        :type n_cpu: int
     
         Selection:
         If we want to select interactions for the particular residue or group of residues: 
@@ -3474,83 +3811,35 @@ class InteractionsTrajectory(object):
 
         start_frame = kwargs.pop('start_frame', 0)
         stop_frame = kwargs.pop('stop_frame', -1)
+        n_cpu = kwargs.pop('n_cpu', 1)
+
+        funcs = [calcHydrogenBonds, calcSaltBridges, calcRepulsiveIonicBonding,
+                 calcPiStacking, calcPiCation, calcHydrophobic, calcDisulfideBonds]
+        results = []
 
         if trajectory is not None:
             if isinstance(trajectory, Atomic):
                 trajectory = Ensemble(trajectory)
-        
-            nfi = trajectory._nfi
-            trajectory.reset()
-            numFrames = trajectory._n_csets
-
-            if stop_frame == -1:
-                traj = trajectory[start_frame:]
-            else:
-                traj = trajectory[start_frame:stop_frame+1]
-
-            atoms_copy = atoms.copy()
-            protein = atoms_copy.protein
 
-            for j0, frame0 in enumerate(traj, start=start_frame):
-                LOGGER.info('Frame: {0}'.format(j0))
-                atoms_copy.setCoords(frame0.getCoords())
-                
-                hydrogen_bonds = calcHydrogenBonds(protein, **kwargs)
-                salt_bridges = calcSaltBridges(protein, **kwargs)
-                RepulsiveIonicBonding = calcRepulsiveIonicBonding(protein, **kwargs)
-                Pi_stacking = calcPiStacking(protein, **kwargs)
-                Pi_cation = calcPiCation(protein, **kwargs)
-                hydrophobic = calcHydrophobic(protein, **kwargs)
-                Disulfide_Bonds = calcDisulfideBonds(protein, **kwargs)
-
-                HBs_all.append(hydrogen_bonds)
-                SBs_all.append(salt_bridges)
-                RIB_all.append(RepulsiveIonicBonding)
-                PiStack_all.append(Pi_stacking)
-                PiCat_all.append(Pi_cation)
-                HPh_all.append(hydrophobic)
-                DiBs_all.append(Disulfide_Bonds)
-            
-                HBs_nb.append(len(hydrogen_bonds))
-                SBs_nb.append(len(salt_bridges))
-                RIB_nb.append(len(RepulsiveIonicBonding))
-                PiStack_nb.append(len(Pi_stacking))
-                PiCat_nb.append(len(Pi_cation))
-                HPh_nb.append(len(hydrophobic))
-                DiBs_nb.append(len(Disulfide_Bonds))
+            frames = _getFrameRange(trajectory.numCoordsets(), start_frame, stop_frame)
+            results = _profileFrames(atoms, funcs, frames, trajectory, 
+                                     n_cpu=n_cpu, **kwargs)
       
         else:
             if atoms.numCoordsets() > 1:
-                for i in range(len(atoms.getCoordsets()[start_frame:stop_frame])):
-                    LOGGER.info('Model: {0}'.format(i+start_frame))
-                    atoms.setACSIndex(i+start_frame) 
-                    protein = atoms.select('protein')
-                    
-                    hydrogen_bonds = calcHydrogenBonds(atoms.protein, **kwargs)
-                    salt_bridges = calcSaltBridges(atoms.protein, **kwargs)
-                    RepulsiveIonicBonding = calcRepulsiveIonicBonding(atoms.protein, **kwargs)
-                    Pi_stacking = calcPiStacking(atoms.protein, **kwargs)
-                    Pi_cation = calcPiCation(atoms.protein, **kwargs)
-                    hydrophobic = calcHydrophobic(atoms.protein, **kwargs)
-                    Disulfide_Bonds = calcDisulfideBonds(atoms.protein, **kwargs)
-
-                    HBs_all.append(hydrogen_bonds)
-                    SBs_all.append(salt_bridges)
-                    RIB_all.append(RepulsiveIonicBonding)
-                    PiStack_all.append(Pi_stacking)
-                    PiCat_all.append(Pi_cation)
-                    HPh_all.append(hydrophobic)
-                    DiBs_all.append(Disulfide_Bonds)
-            
-                    HBs_nb.append(len(hydrogen_bonds))
-                    SBs_nb.append(len(salt_bridges))
-                    RIB_nb.append(len(RepulsiveIonicBonding))
-                    PiStack_nb.append(len(Pi_stacking))
-                    PiCat_nb.append(len(Pi_cation))
-                    HPh_nb.append(len(hydrophobic))
-                    DiBs_nb.append(len(Disulfide_Bonds))
+                frames = _getFrameRange(atoms.numCoordsets(), start_frame, stop_frame)
+                results = _profileFrames(atoms, funcs, frames, n_cpu=n_cpu, 
+                                         label='Model', **kwargs)
             else:
                 LOGGER.info('Include trajectory or use multi-model PDB file.') 
+
+        for frame_interactions in results:
+            for interactions_all, interactions_nb, interactions in zip(
+                    [HBs_all, SBs_all, RIB_all, PiStack_all, PiCat_all, HPh_all, DiBs_all],
+                    [HBs_nb, SBs_nb, RIB_nb, PiStack_nb, PiCat_nb, HPh_nb, DiBs_nb],
+                    frame_interactions):
+                interactions_all.append(interactions)
+                interactions_nb.append(len(interactions))
         
         self._atoms = atoms
         self._traj = trajectory
@@ -4002,7 +4291,11 @@ class LigandInteractionsTrajectory(object):
         :type start_frame: int
 
         :arg stop_frame: index of last frame to read
-        :type stop_frame: int 
+        :type stop_frame: int
+
+        :arg n_cpu: number of processes profiling frames in parallel,
+            default is 1
+        :type n_cpu: int 
         
         :arg output: parameter to print the interactions on the screen
                     while analyzing the structure,
@@ -4027,56 +4320,31 @@ class LigandInteractionsTrajectory(object):
         stop_frame = kwargs.pop('stop_frame', -1)
         output = kwargs.pop('output', False)
         filename = kwargs.pop('filename', None)
+        n_cpu = kwargs.pop('n_cpu', 1)
+
+        funcs = [_listFrameLigandInteractions]
+        results = []
 
         if trajectory is not None:
             if isinstance(trajectory, Atomic):
                 trajectory = Ensemble(trajectory)
-        
-            nfi = trajectory._nfi
-            trajectory.reset()
-            numFrames = trajectory._n_csets
-
-            if stop_frame == -1:
-                traj = trajectory[start_frame:]
-            else:
-                traj = trajectory[start_frame:stop_frame+1]
 
-            atoms_copy = atoms.copy()
-            
-            for j0, frame0 in enumerate(traj, start=start_frame):
-                LOGGER.info(' ')
-                LOGGER.info('Frame: {0}'.format(j0))
-                atoms_copy.setCoords(frame0.getCoords())
-
-                ligand_interactions, ligand = calcLigandInteractions(atoms_copy)
-                
-                ligs_per_frame_interactions = []
-                for ligs in ligand_interactions:
-                    LP_interactions = listLigandInteractions(ligs, output=output) 
-                    ligs_per_frame_interactions.extend(LP_interactions)
-                
-                interactions_all.append(ligs_per_frame_interactions)
-                interactions_all_nb.append(len(ligs_per_frame_interactions))
+            frames = _getFrameRange(trajectory.numCoordsets(), start_frame, stop_frame)
+            results = _profileFrames(atoms, funcs, frames, trajectory, select=None,
+                                     n_cpu=n_cpu, output=output)
 
         else:
             if atoms.numCoordsets() > 1:
-                for i in range(len(atoms.getCoordsets()[start_frame:stop_frame+1])):
-                    LOGGER.info(' ')
-                    LOGGER.info('Model: {0}'.format(i+start_frame))
-                    atoms.setACSIndex(i+start_frame) 
-
-                    ligand_interactions, ligand = calcLigandInteractions(atoms)
-                    
-                    ligs_per_frame_interactions = []
-                    for ligs in ligand_interactions:
-                        LP_interactions = listLigandInteractions(ligs, output=output) 
-                        ligs_per_frame_interactions.extend(LP_interactions)
-                    
-                    interactions_all.append(ligs_per_frame_interactions)
-                    interactions_all_nb.append(len(ligs_per_frame_interactions))
+                frames = _getFrameRange(atoms.numCoordsets(), start_frame, stop_frame)
+                results = _profileFrames(atoms, funcs, frames, select=None, 
+                                         n_cpu=n_cpu, label='Model', output=output)
 
             else:
                 LOGGER.info('Include trajectory or use multi-model PDB file.') 
+
+        for ligs_per_frame_interactions, in results:
+            interactions_all.append(ligs_per_frame_interactions)
+            interactions_all_nb.append(len(ligs_per_frame_interactions))
         
         self._atoms = atoms
         self._traj = trajectory
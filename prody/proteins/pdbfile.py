@@ -89,6 +89,9 @@ _parsePDBdoc = _parsePQRdoc + """
 
 _PDBSubsets = {'ca': 'ca', 'calpha': 'ca', 'bb': 'bb', 'backbone': 'bb'}
 
+_PDBRecordKinds = {'ATOM': 1, 'HETATM': 2, 'TER': 3, 'CONECT': 5,
+                   'ANISOU': 6, 'SIGUIJ': 6, 'MODEL': 7}
+
 def parsePDB(*pdb, **kwargs):
     """Returns an :class:`.AtomGroup` and/or dictionary containing header data
     parsed from a PDB file.
@@ -327,8 +330,12 @@ def parsePDBStream(stream, **kwargs):
         if header or biomol or secondary:
             hd, split = getHeaderDict(lines)
         bonds = [] if get_bonds else None
-        _parsePDBLines(ag, lines, split, model, chain, subset, altloc, bonds=bonds, 
-                       long_resname=long_resname, long_chid=long_chid)
+        if long_chid or _parsePDBBuffer(ag, lines, split, model, chain,
+                                        subset, altloc, bonds=bonds,
+                                        long_resname=long_resname) is None:
+            _parsePDBLines(ag, lines, split, model, chain, subset, altloc,
+                           bonds=bonds, long_resname=long_resname,
+                           long_chid=long_chid)
         if bonds:
             try:
                 ag.setBonds(bonds)
@@ -780,21 +787,7 @@ def _parsePDBLines(atomgroup, lines, split, model, chain, subset,
                         np.zeros(asize, ATOMIC_FIELDS['radius'].dtype)))
         elif startswith == 'CONECT':
             if bonds is not None:
-                atom_serial = line[6:11]
-                bonded1_serial = line[11:16]
-                bonds_serial.append([int(atom_serial), int(bonded1_serial)])
-
-                bonded2_serial = line[16:21]
-                if len(bonded2_serial.strip()):
-                    bonds_serial.append([int(atom_serial), int(bonded2_serial)])
-
-                bonded3_serial = line[21:26]
-                if len(bonded3_serial.strip()):
-                    bonds_serial.append([int(atom_serial), int(bonded3_serial)])
-
-                bonded4_serial = line[26:31]  # fixed typo
-                if len(bonded4_serial.strip()):
-                    bonds_serial.append([int(atom_serial), int(bonded4_serial)])
+                _parseConect(line, bonds_serial)
 
         elif not onlycoords and (startswith == 'TER   ' or
             startswith.strip() == 'TER'):
@@ -1005,6 +998,345 @@ def _parsePDBLines(atomgroup, lines, split, model, chain, subset,
         charges.resize(acount, refcheck=False)
         atomgroup.setCharges(charges)
 
+    _rematchBonds(bonds, bonds_serial, serials)
+
+    if altloc and altloc_torf:
+        _evalAltlocs(atomgroup, altloc, chainids, resnums, resnames, atomnames)
+
+    return atomgroup
+
+def _parsePDBBuffer(atomgroup, lines, split, model, chain, subset,
+                    altloc_torf, bonds=None, long_resname=False):
+    """Returns an AtomGroup, or **None** when *lines* need to be parsed using
+    :func:`_parsePDBLines`.  See also :func:`.parsePDBStream()`.
+
+    Lines are joined into a single buffer, records are identified by their
+    first six characters, and fixed-width columns of all ATOM/HETATM records
+    are decoded at once.  Data that needs record-by-record handling, such as
+    hexadecimal or hybrid-36 numbers, ANISOU and SIGUIJ records, invalid
+    fields, or models with different numbers of atoms, is left to
+    :func:`_parsePDBLines` so that the same data and warnings are produced.
+
+    :arg lines: PDB lines
+    :arg split: starting index for coordinate data lines"""
+
+    if atomgroup.numAtoms() or atomgroup.numCoordsets():
+        return None
+
+    n_lines = len(lines)
+    if lines[0].endswith('\n'):
+        text = ''.join(lines)
+    else:
+        text = '\n'.join(lines)
+    try:
+        # zeros at the end allow reading 80 columns of the last line
+        buf = np.frombuffer((text + '\0' * 80).encode('ascii'), np.uint8)
+    except UnicodeEncodeError:
+        return None
+    size = len(text)
+    newlines = (buf == 10).nonzero()[0]
+    if len(newlines) not in (n_lines - 1, n_lines):
+        return None
+    starts = np.zeros(n_lines, int)
+    starts[1:] = newlines[:n_lines - 1] + 1
+    lengths = np.append(starts[1:], size) - starts
+
+    # identify records by their first six characters
+    records, inverse = _decodeStrings(_gatherColumns(buf, starts[split:],
+                                      lengths[split:], 0, 6), inverse=True)
+    kinds = np.array([_PDBRecordKinds.get(record, 0) if record[:3] != 'END'
+                      else 4 for record in records.tolist()], np.int8)
+    kinds = kinds[inverse]
+    start = split
+    if model is not None and model != 1:
+        models = (kinds == 7).nonzero()[0]
+        if len(models) < model:
+            raise PDBParseError('model {0} is not found'.format(model))
+        start = split + models[model - 1] + 1
+        kinds = kinds[start - split:]
+    if (kinds == 6).any():
+        return None
+
+    lines_atom = ((kinds == 1) | (kinds == 2)).nonzero()[0]
+    if not len(lines_atom):
+        return None
+    if model is not None:
+        # parsing stops at the end of the requested model
+        ends = (kinds == 4).nonzero()[0]
+        ends = ends[ends > lines_atom[0]]
+        if len(ends):
+            if bonds is not None and lines_atom[-1] > ends[0]:
+                return None
+            lines_atom = lines_atom[lines_atom < ends[0]]
+    columns = _gatherColumns(buf, starts[start + lines_atom],
+                             lengths[start + lines_atom], 0, 80)
+    hetero = kinds[lines_atom] == 2
+
+    # filter atoms in the order of _parsePDBLines: subset, chain, altloc
+    resname_columns = slice(17, 21 if long_resname else 20)
+    atomnames = resnames = chainids = None
+    keep = np.ones(len(lines_atom), bool)
+    if subset:
+        atomnames = _decodeStrings(columns[:, 12:16], inverse=True)
+        resnames = _decodeStrings(columns[:, resname_columns], inverse=True)
+        if subset == 'ca':
+            subset = set(('CA',))
+        elif subset in 'bb':
+            subset = flags.BACKBONE
+        keep &= np.isin(atomnames[0], list(subset))[atomnames[1]]
+        keep &= np.isin(resnames[0], list(flags.AMINOACIDS))[resnames[1]]
+    if chain is not None:
+        chainids = _decodeStrings(columns[:, 21:22], inverse=True)
+        keep &= np.array([chid in chain for chid in
+                          chainids[0].tolist()], bool)[chainids[1]]
+
+    altloc_info = None
+    if isinstance(altloc_torf, str):
+        if altloc_torf == 'all':
+            which_altlocs = 'all'
+        elif altloc_torf.strip() != 'A':
+            altloc_info = altloc_torf
+            which_altlocs = ' ' + ''.join(altloc_torf.split())
+        else:
+            which_altlocs = ' A'
+        altloc_torf = False
+    else:
+        which_altlocs = ' A'
+        altloc_torf = True
+    if which_altlocs == 'all':
+        rejected = np.zeros(len(lines_atom), bool)
+    else:
+        rejected = keep & ~np.isin(columns[:, 16],
+                                   list(which_altlocs.encode('ascii')))
+        keep &= ~rejected
+
+    # follow TER, END, ENDMDL, and CONECT records to find models
+    accepted = np.zeros(len(kinds), int)
+    accepted[lines_atom[keep]] = 1
+    accepted = np.cumsum(accepted)
+    stop = len(lines)
+    base = n_atoms = nmodel = 0
+    onlycoords = END = False
+    last = len(kinds)
+    termini = []
+    conects = []
+    events = ((kinds >= 3) & (kinds <= 5)).nonzero()[0]
+    for i, kind in zip(events.tolist(), kinds[events].tolist()):
+        acount = accepted[i] - base
+        if kind == 5:
+            if bonds is not None:
+                conects.append(start + i)
+        elif kind == 3:
+            if not onlycoords and acount:
+                termini.append(acount - 1)
+        elif acount:
+            if model is not None:
+                last = i + 1
+                if bonds is not None:
+                    conects.extend((start + events[(events > i) &
+                                    (kinds[events] == 5)]).tolist())
+                break
+            diff = stop - (start + i) - 1
+            END = diff < acount
+            if onlycoords:
+                if acount != n_atoms:
+                    return None
+                nmodel += 1
+                base = accepted[i]
+                if END and accepted[-1] > base:
+                    return None
+            else:
+                n_atoms = acount
+                nmodel = 1
+                base = accepted[i]
+                if END:
+                    last = i + 1
+                    break
+                onlycoords = True
+    if onlycoords:
+        acount = accepted[last - 1] - base
+        if acount == n_atoms:
+            nmodel += 1
+        elif acount > n_atoms:
+            return None
+    elif not END:
+        n_atoms = accepted[last - 1]
+        nmodel = 1
+    if not n_atoms:
+        return None
+
+    # alternate locations are evaluated only for single model structures
+    altloc = defaultdict(list)
+    if altloc_torf:
+        rejected &= lines_atom < last
+        if rejected.any() and onlycoords:
+            return None
+        for i in (start + lines_atom[rejected]).tolist():
+            altloc[lines[i][16]].append((lines[i], i))
+
+    # decode columns of atoms in the first model and coordinates of all models
+    rows = keep.nonzero()[0][:nmodel * n_atoms]
+    coordinates = np.zeros((len(rows), 3), float)
+    try:
+        for j, col in enumerate((30, 38, 46)):
+            coordinates[:, j] = _decodeNumbers(columns[rows, col:col + 8])
+        rows = rows[:n_atoms]
+        columns = columns[rows]
+        serials = _decodeNumbers(columns[:, 6:11],
+                                 ATOMIC_FIELDS['serial'].dtype)
+        resnums = _decodeNumbers(columns[:, 22:26],
+                                 ATOMIC_FIELDS['resnum'].dtype)
+        occupancies = _decodeNumbers(columns[:, 54:60],
+                                     ATOMIC_FIELDS['occupancy'].dtype)
+        bfactors = _decodeNumbers(columns[:, 60:66],
+                                  ATOMIC_FIELDS['beta'].dtype)
+    except ValueError:
+        return None
+    icodes = columns[:, 26]
+    if ((icodes >= 48) & (icodes <= 57)).any():
+        return None
+    if n_atoms > 3 and ((resnums[:-2] > resnums[2:]) &
+                        (resnums[:-2] >= MAX_N_RES))[1:].any():
+        return None
+
+    if atomnames is None:
+        atomnames = _decodeStrings(columns[:, 12:16])
+        resnames = _decodeStrings(columns[:, resname_columns])
+    else:
+        atomnames = atomnames[0][atomnames[1][rows]]
+        resnames = resnames[0][resnames[1][rows]]
+    if chainids is None:
+        chainids = _decodeStrings(columns[:, 21:22])
+    else:
+        chainids = chainids[0][chainids[1][rows]]
+    elements = _decodeStrings(columns[:, 76:78])
+    flags_ter = np.zeros(n_atoms, bool)
+    flags_ter[termini] = True
+    charges = np.ascontiguousarray(columns[:, [79, 78]])
+    charges, inverse = np.unique(charges.view(np.uint16),
+                                 return_inverse=True)
+    charges = np.array([_decodeCharge(charge) for charge in
+                        charges.view(np.uint8).reshape(-1, 2)])[inverse]
+
+    if altloc_info is not None:
+        LOGGER.info('Parsing alternate locations {0}.'.format(altloc_info))
+
+    if nmodel > 1:
+        atomgroup._setCoords(coordinates.reshape((nmodel, n_atoms, 3)))
+    else:
+        atomgroup._setCoords(coordinates)
+    atomgroup.setNames(atomnames)
+    atomgroup.setResnames(resnames)
+    atomgroup.setResnums(resnums)
+    atomgroup.setChids(chainids)
+    atomgroup.setFlags('hetatm', hetero[rows])
+    atomgroup.setFlags('pdbter', flags_ter)
+    atomgroup.setFlags('selpdbter', flags_ter)
+    atomgroup.setAltlocs(columns[:, 16].view('S1').astype(
+                         ATOMIC_FIELDS['altloc'].dtype))
+    atomgroup.setIcodes(_decodeStrings(columns[:, 26:27]))
+    atomgroup.setSerials(serials)
+    atomgroup.setBetas(bfactors)
+    atomgroup.setOccupancies(occupancies)
+    atomgroup.setSegnames(_decodeStrings(columns[:, 72:76]))
+    atomgroup.setElements(elements)
+    from prody.utilities.misctools import getMasses
+    elements, inverse = np.unique(elements, return_inverse=True)
+    atomgroup.setMasses(getMasses(elements)[inverse])
+    atomgroup.setCharges(charges)
+
+    bonds_serial = []
+    for i in conects:
+        _parseConect(lines[i], bonds_serial)
+    _rematchBonds(bonds, bonds_serial, atomgroup._getSerials())
+
+    if altloc:
+        _evalAltlocs(atomgroup, altloc, chainids, resnums, resnames,
+                     atomnames)
+
+    return atomgroup
+
+
+def _gatherColumns(buf, starts, lengths, first, last):
+    """Returns an array with columns *first* to *last* of lines that start at
+    *starts* positions of *buf* and have *lengths* including the newline
+    character.  Columns beyond the end of a line are zero.  *buf* must have
+    at least *last* bytes after the start of the last line."""
+
+    width = last - first
+    windows = np.lib.stride_tricks.as_strided(buf[first:],
+                        (len(buf) - last + 1, width), (1, 1), writeable=False)
+    columns = windows[starts]
+    short = (lengths < last).nonzero()[0]
+    if len(short):
+        columns[short] *= (np.arange(first, last) <
+                           lengths[short, None]).astype(np.uint8)
+    return columns
+
+
+def _decodeStrings(columns, inverse=False):
+    """Returns stripped strings for rows of *columns*.  Distinct rows are
+    decoded only once, and if *inverse* is **True** distinct strings and
+    indices that reconstruct rows from them are returned."""
+
+    n_rows, width = columns.shape
+    keys = np.zeros((n_rows, 8), np.uint8)
+    keys[:, :width] = columns
+    keys, indices = np.unique(keys.view(np.uint64).ravel(),
+                              return_inverse=True)
+    strings = np.array([key.tobytes().rstrip(b'\0').decode('ascii').strip()
+                        for key in keys], 'U{0}'.format(width))
+    if inverse:
+        return strings, indices
+    return strings[indices]
+
+
+def _decodeNumbers(columns, dtype=float):
+    """Returns numbers in rows of *columns* converted to *dtype* in the same
+    way as numbers in PDB lines are converted by :func:`_parsePDBLines`.
+    Raises :exc:`ValueError` when a row is not a valid number, e.g. a
+    hexadecimal or hybrid-36 number or an empty field."""
+
+    columns = np.ascontiguousarray(columns)
+    return columns.view('S{0}'.format(columns.shape[1])).ravel().astype(dtype)
+
+
+def _decodeCharge(columns):
+    """Returns charge for columns 80 and 79 of a line as parsed by
+    :func:`_parsePDBLines`."""
+
+    try:
+        return int(bytes(columns).decode('ascii'))
+    except ValueError:
+        return 0
+
+
+def _parseConect(line, bonds_serial):
+    """Append pairs of serial numbers of bonded atoms in CONECT *line* to
+    *bonds_serial*."""
+
+    atom_serial = line[6:11]
+    bonded1_serial = line[11:16]
+    bonds_serial.append([int(atom_serial), int(bonded1_serial)])
+
+    bonded2_serial = line[16:21]
+    if len(bonded2_serial.strip()):
+        bonds_serial.append([int(atom_serial), int(bonded2_serial)])
+
+    bonded3_serial = line[21:26]
+    if len(bonded3_serial.strip()):
+        bonds_serial.append([int(atom_serial), int(bonded3_serial)])
+
+    bonded4_serial = line[26:31]  # fixed typo
+    if len(bonded4_serial.strip()):
+        bonds_serial.append([int(atom_serial), int(bonded4_serial)])
+
+
+def _rematchBonds(bonds, bonds_serial, serials):
+    """Append pairs of atom indices for *bonds_serial* to *bonds*."""
+
+    if not bonds_serial:
+        return
     # rematch the bond-atom serial numbers to atom ids
     serial_to_id = {int(serial): aidx for aidx, serial in enumerate(serials)}
     for bond in bonds_serial:
@@ -1016,10 +1348,6 @@ def _parsePDBLines(atomgroup, lines, split, model, chain, subset,
                         .format(bond[0], bond[1])
                         )
 
-    if altloc and altloc_torf:
-        _evalAltlocs(atomgroup, altloc, chainids, resnums, resnames, atomnames)
-
-    return atomgroup
 
 def _evalAltlocs(atomgroup, altloc, chainids, resnums, resnames, atomnames):
     altloc_keys = list(altloc)
@@ -2,7 +2,7 @@
 
 from prody.tests import TestCase
 
-from numpy import arange
+from numpy import arange, zeros
 from numpy.random import shuffle
 
 from prody import *
@@ -45,4 +45,47 @@ class TestTerRecord(TestCase):
 
     def testSelectionResidueIndexing2(self):
 
-        self.assertEqual(len(RTER[20:].getHierView()['A', 866]), 3)
\ No newline at end of file
+        self.assertEqual(len(RTER[20:].getHierView()['A', 866]), 3)
+
+class TestNonContiguous(TestCase):
+
+    def setUp(self):
+
+        self.ag = AtomGroup()
+        self.ag.setCoords(zeros((8, 3)))
+        self.ag.setNames(['N', 'CA', 'N', 'CA', 'C', 'O', 'N', 'CA'])
+        self.ag.setChids(['A', 'A', 'B', 'B', 'A', 'A', 'B', 'B'])
+        self.ag.setResnums([1, 1, 1, 1, 1, 1, 2, 2])
+
+    def testChains(self):
+
+        hv = self.ag.getHierView()
+        self.assertEqual(hv.numChains(), 2)
+        self.assertEqual(list(hv['A'].getIndices()), [0, 1, 4, 5])
+        self.assertEqual(list(hv['B'].getIndices()), [2, 3, 6, 7])
+
+    def testResidues(self):
+
+        hv = self.ag.getHierView()
+        self.assertEqual(hv.numResidues(), 3)
+        self.assertEqual(list(hv['A', 1].getIndices()), [0, 1, 4, 5])
+        self.assertEqual(list(self.ag.getResindices()),
+                         [0, 0, 1, 1, 0, 0, 2, 2])
+
+    def testSegments(self):
+
+        self.ag.setSegnames(['P', 'P', 'Q', 'Q', 'P', 'P', 'R', 'R'])
+        hv = self.ag.getHierView()
+        self.assertEqual(hv.numSegments(), 3)
+        self.assertEqual(hv.numChains(), 3)
+        self.assertEqual(list(hv['P'].getIndices()), [0, 1, 4, 5])
+        self.assertEqual(list(hv['R', 'B'].getIndices()), [6, 7])
+        self.assertEqual(list(self.ag.getSegindices()),
+                         [0, 0, 1, 1, 0, 0, 2, 2])
+
+    def testSelection(self):
+
+        hv = self.ag[1:7].getHierView()
+        self.assertEqual(hv.numChains(), 2)
+        self.assertEqual(hv.numResidues(), 3)
+        self.assertEqual(list(hv['A', 1].getIndices()), [1, 4, 5])
@@ -561,3 +561,89 @@ def testGetBoolArray():
     ca = pdb3mht.ca
     assert_equal(len(ca), len(SELECT.getBoolArray(ca, 'index 510')))
 
+
+
+class TestSelectionPlan(unittest.TestCase):
+
+    """Test compiled selection plans."""
+
+    def testCache(self):
+
+        selstr = 'protein and resnum 10 to 50'
+        plan = compileSelection(selstr)
+        self.assertIs(plan, compileSelection(selstr))
+        self.assertIs(plan, compileSelection(plan))
+        self.assertEqual(plan.getSelstr(), selstr)
+        self.assertRaises(prody.select.SelectionError, compileSelection,
+                          'protein and (resnum 10')
+
+    def testSelect(self):
+
+        for selstr in ['protein and within 5 of water', 'x > 10 or ca',
+                       'same residue as exwithin 4 of hetero']:
+            plan = compileSelection(selstr)
+            assert_equal(plan.getIndices(pdb3mht),
+                         pdb3mht.select(selstr).getIndices())
+            assert_equal(pdb3mht.select(plan).getIndices(),
+                         plan.select(pdb3mht).getIndices())
+            self.assertEqual(plan.select(pdb3mht).getSelstr(), selstr)
+
+    def testCoordsChange(self):
+
+        atoms = pdb3mht.copy()
+        plan = compileSelection('within 5 of water')
+        self.assertTrue(plan.getBoolArray(atoms).sum() >
+                        atoms.numAtoms('water'))
+        coords = atoms.getCoords()
+        coords[atoms.getFlags('water')] += 100
+        atoms.setCoords(coords)
+        assert_equal(plan.getBoolArray(atoms), atoms.getFlags('water'))
+
+    def testMacro(self):
+
+        plan = compileSelection('cacb')
+        prody.defSelectionMacro('cacb', 'name CA CB')
+        self.assertIsNot(plan, compileSelection('cacb'))
+        assert_equal(compileSelection('cacb').getBoolArray(pdb3mht),
+                     SELECT.getBoolArray(pdb3mht, 'name CA CB'))
+        prody.delSelectionMacro('cacb')
+
+
+class TestDynamicSelection(unittest.TestCase):
+
+    """Test selections updated for new coordinates."""
+
+    def setUp(self):
+
+        self.atoms = pdb3mht.copy()
+        coords = self.atoms.getCoords()
+        self.frames = [coords + np.random.normal(scale=2, size=coords.shape)
+                       for i in range(3)]
+
+    def testUpdate(self):
+
+        atoms = self.atoms.copy()
+        for selstr in ['water and within 4 of protein',
+                       'name CA and not within 6 of nucleic',
+                       'same residue as exwithin 3 of hetero',
+                       'protein and x < -20 and within 5 of water']:
+            dynamic = DynamicSelection(self.atoms, selstr)
+            for frame in self.frames:
+                atoms.setCoords(frame)
+                assert_equal(dynamic.update(frame).getIndices(),
+                             atoms.select(selstr).getIndices())
+
+    def testCoordsets(self):
+
+        atoms = self.atoms
+        for frame in self.frames:
+            atoms.addCoordset(frame)
+        selstr = 'water and within 4 of protein'
+        dynamic = DynamicSelection(atoms, selstr)
+        for i in range(atoms.numCoordsets()):
+            atoms.setACSIndex(i)
+            expected = atoms.select(selstr).getIndices()
+            assert_equal(dynamic.update(i).getIndices(), expected)
+            selection = dynamic.update()
+            assert_equal(selection.getIndices(), expected)
+            self.assertIs(dynamic.update(), selection)
@@ -0,0 +1,60 @@
+"""This module contains unit tests for :mod:`~prody.dynamics.analysis` module."""
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from prody.dynamics import ANM, GNM, calcCrossCorr, calcCovariance, calcDistFlucts
+
+from prody.tests import unittest
+from prody.tests.datafiles import parseDatafile
+
+from prody import LOGGER
+
+LOGGER.verbosity = 'none'
+
+ATOMS = parseDatafile('1ubi_ca')
+N_ATOMS = ATOMS.numAtoms()
+
+anm = ANM()
+anm.buildHessian(ATOMS)
+anm.calcModes(20)
+
+gnm = GNM()
+gnm.buildKirchhoff(ATOMS)
+gnm.calcModes(20)
+
+
+class TestCrossCorr(unittest.TestCase):
+
+    def testCovariance(self):
+
+        V = anm.getArray()
+        expected = np.dot(V * anm.getVariances(), V.T)
+        for n_cpu in (1, 2):
+            assert_allclose(calcCovariance(anm[:10], n_cpu=n_cpu),
+                            np.dot(V[:, :10] * anm.getVariances()[:10], V[:, :10].T),
+                            atol=1e-12)
+            assert_allclose(calcCovariance(anm[:], n_cpu=n_cpu), expected, atol=1e-12)
+
+    def testANM(self):
+
+        cov = anm.getCovariance()
+        cc = cov.reshape((N_ATOMS, 3, N_ATOMS, 3)).trace(axis1=1, axis2=3)
+        diag = np.diag(cc) ** 0.5
+        for n_cpu in (1, 2):
+            assert_allclose(calcCrossCorr(anm, n_cpu=n_cpu, norm=False), cc, atol=1e-12)
+            assert_allclose(calcCrossCorr(anm[:], n_cpu=n_cpu),
+                            cc / np.outer(diag, diag), atol=1e-12)
+
+    def testGNM(self):
+
+        cov = gnm.getCovariance()
+        for n_cpu in (1, 2):
+            assert_allclose(calcCrossCorr(gnm[:], n_cpu=n_cpu, norm=False), cov, atol=1e-12)
+
+    def testDistFlucts(self):
+
+        cc = calcCrossCorr(anm[:], norm=False)
+        diag = np.diag(cc).reshape(-1, 1)
+        assert_allclose(calcDistFlucts(anm[:], n_cpu=2, norm=False),
+                        diag + diag.T - 2 * cc, atol=1e-12)
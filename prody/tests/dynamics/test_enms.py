@@ -256,6 +256,12 @@ class TestGNMResults(testGNMBase):
         assert_equal(slow._getKirchhoff(), gnm._getKirchhoff(),
                      'slow method does not reproduce same Kirchhoff')
 
+    def testBuildKirchoffSparse(self):
+        sparse = GNM()
+        sparse.buildKirchhoff(ATOMS, sparse=True)
+        assert_equal(sparse._getKirchhoff().toarray(), gnm._getKirchhoff(),
+                     'sparse method does not reproduce same Kirchhoff')
+
     def testCommuteTime(self):
         hitTime, commuteTime = calcHitTime(gnm)
 
@@ -365,13 +371,104 @@ class TestANM(TestGNM):
                         err_msg='slow method does not reproduce same Hessian')
         assert_equal(slow._getKirchhoff(), anm._getKirchhoff(),
                      'slow method does not reproduce same Kirchhoff')
-    
+
+    def testBuildHessianKDTree(self):
+        fast = ANM()
+        fast.buildHessian(ATOMS, kdtree=True)
+        assert_allclose(fast._getHessian(), anm._getHessian(),
+                        rtol=0, atol=ATOL,
+                        err_msg='KDTree method does not reproduce same Hessian')
+        assert_equal(fast._getKirchhoff(), anm._getKirchhoff(),
+                     'KDTree method does not reproduce same Kirchhoff')
+
+    def testBuildHessianSparse(self):
+        sparse = ANM()
+        sparse.buildHessian(ATOMS, sparse=True)
+        assert_allclose(sparse._getHessian().toarray(), anm._getHessian(),
+                        rtol=0, atol=ATOL,
+                        err_msg='sparse method does not reproduce same Hessian')
+        assert_equal(sparse._getKirchhoff().toarray(), anm._getKirchhoff(),
+                     'sparse method does not reproduce same Kirchhoff')
+
+    def testBuildHessianScalarGamma(self):
+        def gamma(dist2, i, j):
+            if dist2 < 49:
+                return 2.
+            return 1.
+
+        batch = ANM()
+        batch.buildHessian(ATOMS, gamma=lambda dist2, i, j:
+                           np.where(dist2 < 49, 2., 1.))
+        scalar = ANM()
+        scalar.buildHessian(ATOMS, gamma=gamma)
+        assert_allclose(scalar._getHessian(), batch._getHessian(),
+                        rtol=0, atol=ATOL,
+                        err_msg='scalar gamma does not reproduce same Hessian')
+
 
 class TestGNMCalcModes(unittest.TestCase):
 
     def setUp(self):
         pass
 
+
+SOLVERS = {'shift-invert': {}, 'lobpcg': {}, 'randomized': {'maxiter': 20}}
+
+class TestIterativeSolvers(unittest.TestCase):
+
+    def testANMSolvers(self):
+        for solver, kwargs in SOLVERS.items():
+            model = ANM()
+            model.buildHessian(ATOMS, sparse=True)
+            model.calcModes(10, solver=solver, **kwargs)
+            assert_allclose(model.getEigvals(), anm[6:16].getEigvals(),
+                            rtol=0, atol=ATOL*10,
+                            err_msg='{0} solver failed to get correct '
+                                    'eigenvalues'.format(solver))
+            _temp = np.abs((model.getEigvecs() *
+                            anm[6:16].getEigvecs()).sum(0))
+            assert_allclose(_temp, np.ones(10), rtol=0, atol=ATOL*10,
+                            err_msg='{0} solver failed to get correct '
+                                    'eigenvectors'.format(solver))
+
+    def testGNMSolvers(self):
+        for solver, kwargs in SOLVERS.items():
+            model = GNM()
+            model.buildKirchhoff(ATOMS, sparse=True)
+            model.calcModes(10, zeros=True, solver=solver, **kwargs)
+            assert_allclose(model.getEigvals(), gnm[:10].getEigvals(),
+                            rtol=0, atol=ATOL*10,
+                            err_msg='{0} solver failed to get correct '
+                                    'eigenvalues'.format(solver))
+
+    def testANMDeflation(self):
+        for sparse in (False, True):
+            model = ANM()
+            model.buildHessian(ATOMS, sparse=sparse)
+            model.calcModes(10, deflate=True)
+            assert_allclose(model.getEigvals(), anm[6:16].getEigvals(),
+                            rtol=0, atol=ATOL*10,
+                            err_msg='deflation failed to get correct '
+                                    'eigenvalues')
+            model.calcModes(10, zeros=True, deflate=True)
+            assert_allclose(model.getEigvals(), anm[:10].getEigvals(),
+                            rtol=0, atol=ATOL*10,
+                            err_msg='deflation failed to get correct '
+                                    'eigenvalues with zero modes')
+
+    def testGNMDeflation(self):
+        model = GNM()
+        model.buildKirchhoff(ATOMS, sparse=True)
+        model.calcModes(10, deflate=True, solver='shift-invert')
+        assert_allclose(model.getEigvals(), gnm[1:11].getEigvals(),
+                        rtol=0, atol=ATOL*10,
+                        err_msg='deflation failed to get correct eigenvalues')
+
+    def testInvalidSolver(self):
+        model = ANM()
+        model.buildHessian(ATOMS)
+        self.assertRaises(ValueError, model.calcModes, solver='none')
+
 class TestRTB(unittest.TestCase):
 
     def testHessian(self):
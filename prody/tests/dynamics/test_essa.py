@@ -0,0 +1,45 @@
+"""This module contains unit tests for :mod:`~prody.dynamics.essa` module."""
+
+from numpy.testing import assert_allclose, assert_equal
+
+from prody.dynamics import ESSA
+
+from prody.tests import unittest
+from prody.tests.datafiles import parseDatafile
+
+from prody import LOGGER
+
+LOGGER.verbosity = 'none'
+
+ATOMS = parseDatafile('1ubi')
+
+
+class TestESSA(unittest.TestCase):
+
+    def _scan(self, enm, **kwargs):
+
+        essa = ESSA()
+        essa.setSystem(ATOMS, lowmem=True)
+        essa.scanResidues(n_modes=5, enm=enm, **kwargs)
+        return essa
+
+    def _compare(self, enm):
+
+        exact = self._scan(enm)
+        updated = self._scan(enm, incremental=True)
+        assert_equal(updated._n_updated, ATOMS.ca.numAtoms())
+        assert_allclose(updated.getEigvals(), exact.getEigvals(), rtol=1e-5)
+        assert_allclose(updated.getESSAZscores(), exact.getESSAZscores(), atol=1e-3)
+
+    def testIncrementalGNM(self):
+
+        self._compare('gnm')
+
+    def testIncrementalANM(self):
+
+        self._compare('anm')
+
+    def testExactFallback(self):
+
+        essa = self._scan('gnm', incremental=True, maxiter=0)
+        assert_equal(essa._n_updated, 0)
@@ -1,5 +1,7 @@
 """This module contains unit tests for :mod:`~prody.dynamics`."""
 
+import os
+
 import numpy as np
 from numpy import arange
 from numpy.testing import *
@@ -116,5 +118,105 @@ class TestPCAResults(TestPCA):
         cov = pca.getCovariance()
         assert_equal(cov, cov.T, 'Covariance is not symmetric')
 
+
+class TestStreamingCovariance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        from os.path import join
+        from prody.tests import TEMPDIR
+
+        cls.filenames = [join(TEMPDIR, 'pca_part{0}.dcd'.format(i)) for i in range(2)]
+        for filename, coordsets in zip(cls.filenames, (COORDSETS[:50], COORDSETS[50:])):
+            ensemble = Ensemble()
+            ensemble.setCoords(COORDSETS[0])
+            ensemble.addCoordset(coordsets)
+            writeDCD(filename, ensemble)
+        cls.checkpoint = join(TEMPDIR, 'pca_checkpoint.npz')
+        coords = np.concatenate([DCDFile(fn)[:].getCoordsets() for fn in cls.filenames])
+        cls.expected = np.cov(coords.reshape((len(coords), -1)).astype(float).T, bias=1)
+
+    def _trajectory(self):
+
+        traj = Trajectory(self.filenames[0])
+        traj.addFile(self.filenames[1])
+        return traj
+
+    def testTrajectory(self):
+
+        for kwargs, atol in (({}, ATOL), ({'chunk': 7}, ATOL), 
+                             ({'dtype': np.float32}, ATOL * 10)):
+            model = PCA()
+            model.buildCovariance(self._trajectory(), aligned=True, **kwargs)
+            assert_allclose(model.getCovariance(), self.expected, rtol=0, atol=atol)
+
+    def testResume(self):
+
+        from prody.dynamics.pca import (_CovarianceAccumulator,
+                                        _describeTrajectory)
+
+        traj = self._trajectory()
+        accumulator = _CovarianceAccumulator(traj.numSelected() * 3)
+        accumulator.update(np.array([frame._getCoords().flatten() 
+                                     for frame in traj][:60]))
+        accumulator.save(self.checkpoint, **_describeTrajectory(traj, True))
+
+        model = PCA()
+        model.buildCovariance(self._trajectory(), aligned=True, 
+                              checkpoint=self.checkpoint)
+        assert_allclose(model.getCovariance(), self.expected, rtol=0, atol=ATOL)
+        self.assertFalse(os.path.isfile(self.checkpoint))
+
+    def testResumeMismatch(self):
+
+        from prody.dynamics.pca import (_CovarianceAccumulator,
+                                        _describeTrajectory)
+
+        traj = self._trajectory()
+        accumulator = _CovarianceAccumulator(traj.numSelected() * 3)
+        accumulator.update(np.random.RandomState(0).random_sample(
+                           (60, traj.numSelected() * 3)))
+        traj.setCoords(COORDSETS[1])
+        accumulator.save(self.checkpoint, **_describeTrajectory(traj, True))
+
+        model = PCA()
+        model.buildCovariance(self._trajectory(), aligned=True,
+                              checkpoint=self.checkpoint)
+        assert_allclose(model.getCovariance(), self.expected, rtol=0, atol=ATOL)
+        self.assertFalse(os.path.isfile(self.checkpoint))
+
+    def _compareModes(self, model, n_modes, rtol):
+
+        values, vectors = np.linalg.eigh(self.expected)
+        values = values[::-1][:n_modes]
+        vectors = vectors[:, ::-1][:, :n_modes]
+        assert_allclose(model.getEigvals(), values, rtol=rtol)
+        assert_allclose(np.abs((model.getArray() * vectors).sum(0)), 1, 
+                        rtol=rtol)
+        assert_allclose(model._trace, self.expected.trace(), rtol=1e-10)
+
+    def testIncrementalSVD(self):
+
+        traj = self._trajectory()
+        model = PCA()
+        model.performSVD(traj, aligned=True, n_modes=5)
+        self._compareModes(model, 5, 1e-5)
+        assert_equal(traj.nextIndex(), 0)
+
+    def testRandomizedSVD(self):
+
+        model = PCA()
+        model.performSVD(self._trajectory(), aligned=True, n_modes=5, 
+                         method='randomized', n_iter=8, seed=0)
+        self._compareModes(model, 5, 1e-5)
+
+    @classmethod
+    def tearDownClass(cls):
+
+        for fn in cls.filenames:
+            os.remove(fn)
+
+
 if __name__ == '__main__':
     unittest.main()
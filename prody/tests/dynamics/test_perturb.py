@@ -0,0 +1,61 @@
+"""This module contains unit tests for :mod:`~prody.dynamics.perturb` module."""
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal
+
+from prody.dynamics import ANM, GNM, calcPerturbResponse
+
+from prody.tests import unittest
+from prody.tests.datafiles import parseDatafile
+
+from prody import LOGGER
+
+LOGGER.verbosity = 'none'
+
+ATOMS = parseDatafile('1ubi_ca')
+N_ATOMS = ATOMS.numAtoms()
+
+anm = ANM()
+anm.buildHessian(ATOMS)
+anm.calcModes(20)
+
+gnm = GNM()
+gnm.buildKirchhoff(ATOMS)
+gnm.calcModes(20)
+
+
+def _calcPRS(cov, is3d):
+
+    prs = cov ** 2
+    if is3d:
+        prs = prs.reshape((N_ATOMS, 3, N_ATOMS, 3)).sum(axis=(1, 3))
+    return prs / np.diag(prs).reshape((N_ATOMS, 1))
+
+
+class TestPerturbResponse(unittest.TestCase):
+
+    def testANM(self):
+
+        prs, eff, sen = calcPerturbResponse(anm[:])
+        expected = _calcPRS(anm[:].getCovariance(), True)
+        assert_allclose(prs, expected, rtol=1e-10)
+        W = 1 - np.eye(N_ATOMS)
+        assert_allclose(eff, np.average(expected, weights=W, axis=1), rtol=1e-10)
+        assert_allclose(sen, np.average(expected, weights=W, axis=0), rtol=1e-10)
+
+    def testGNM(self):
+
+        prs, _, _ = calcPerturbResponse(gnm[:])
+        assert_allclose(prs, _calcPRS(gnm[:].getCovariance(), False), rtol=1e-10)
+
+    def testTiles(self):
+
+        prs = calcPerturbResponse(anm[:])[0]
+        for kwargs in ({'memory': 0.01}, {'memory': 0.01, 'n_jobs': 2}):
+            assert_allclose(calcPerturbResponse(anm[:], **kwargs)[0], prs, rtol=1e-10)
+
+    def testRepeats(self):
+
+        prs, _, _ = calcPerturbResponse(anm[:], turbo=False, repeats=20, memory=0.01)
+        assert_equal(prs.shape, (N_ATOMS, N_ATOMS))
+        assert_allclose(np.diag(prs), 1.)
@@ -1,9 +1,11 @@
 """This module contains unit tests for :mod:`~prody.KDTree` module."""
 
-from numpy.testing import assert_array_equal, assert_equal
-from numpy.random import rand, randint
+from numpy import asarray, ones
+from numpy.testing import assert_array_equal, assert_equal, assert_allclose
+from numpy.random import rand, randint, RandomState
 
-from prody.dynamics import sdarray
+from prody.dynamics import sdarray, calcEnsembleENMs, calcENM
+from prody.ensemble import PDBEnsemble
 
 from prody.tests import unittest
 from prody.tests.datafiles import parseDatafile
@@ -43,3 +45,43 @@ class TestSDArray(unittest.TestCase):
 
         s = S[0, 0, 0]
         #assert_array_equal(s, A[0, 0, 0], 'failed at sdarray slicing')
+
+
+ATOMS = parseDatafile('1ubi_ca')
+STRUCTURES = []
+for i in range(4):
+    structure = ATOMS.copy()
+    structure.setCoords(ATOMS.getCoords() + RandomState(i).normal(0, .3, (len(ATOMS), 3)))
+    structure.setTitle('conf%d' % i)
+    STRUCTURES.append(structure)
+
+class TestEnsembleENMs(unittest.TestCase):
+
+    def testAtomicList(self):
+        modeens = calcEnsembleENMs(STRUCTURES, model='gnm', n_modes=5, match=False)
+        assert_equal(modeens.numModeSets(), len(STRUCTURES))
+        assert_equal(modeens.getLabels(), [s.getTitle() for s in STRUCTURES])
+        for structure, modeset in zip(STRUCTURES, modeens):
+            gnm, _ = calcENM(structure, model='gnm', n_modes=5)
+            assert_allclose(modeset.getEigvals(), gnm.getEigvals(), rtol=1e-8)
+            assert modeset.getModel().getKirchhoff() is None
+
+    def testParallel(self):
+        ensemble = PDBEnsemble()
+        ensemble.setAtoms(ATOMS)
+        ensemble.setCoords(ATOMS.getCoords())
+        for i, structure in enumerate(STRUCTURES):
+            weights = ones((len(ATOMS), 1))
+            if i % 2:
+                weights[:5] = 0
+            ensemble.addCoordset(structure.getCoords(), weights=weights)
+
+        serial = calcEnsembleENMs(ensemble, model='anm', n_modes=5, match=False)
+        parallel = calcEnsembleENMs(ensemble, model='anm', n_modes=5, match=False,
+                                    n_jobs=2, nproc=1)
+        assert_allclose(asarray(parallel.getEigvals()), asarray(serial.getEigvals()), rtol=1e-8)
+        for modeset in parallel:
+            assert modeset.getModel().getHessian() is None
+
+    def testInvalidList(self):
+        self.assertRaises(ValueError, calcEnsembleENMs, [ATOMS, ATOMS[:10]])
@@ -1,6 +1,6 @@
 """This module contains unit tests for :mod:`~prody.KDTree` module."""
 
-from numpy import tile, array, arange, ones
+from numpy import tile, array, arange, ones, zeros
 from numpy.testing import assert_allclose
 
 from prody.tests import unittest
@@ -40,6 +40,38 @@ class TestKDTree(unittest.TestCase):
                             rtol=RTOL, atol=ATOL,
                             err_msg='KDTree all search failed')
 
+    def testMask(self):
+
+        mask = self.kdtree.getMask(1.75, array([[0., 0., 0.], [9., 9., 9.]]))
+        self.assertEqual(list(mask.nonzero()[0]), [0, 1, 8, 9],
+                         'KDTree mask search failed')
+
+    def testCenterMask(self):
+
+        centers = array([[0., 0., 1.], [20., 20., 20.], [9., 9., 8.]])
+        found = self.kdtree.getCenterMask(1.5, centers)
+        self.assertEqual(list(found), [True, False, True],
+                         'KDTree center mask search failed')
+        targets = arange(10) < 5
+        found = self.kdtree.getCenterMask(1.5, centers, targets)
+        self.assertEqual(list(found), [True, False, False],
+                         'KDTree center mask search failed')
+
+    def testMaskArguments(self):
+
+        centers = array([[0., 0., 1.]])
+        self.assertRaises(ValueError, self.kdtree.getMask, 0, centers)
+        self.assertRaises(ValueError, self.kdtree.getCenterMask, -1., centers)
+        self.assertRaises(ValueError, self.kdtree.getCenterMask, 1.5, centers,
+                          arange(5) < 5)
+        kdtree = self.kdtree._kdtree
+        if hasattr(kdtree, 'search_centers_radius'):
+            centers = centers.astype('f')
+            self.assertRaises(ValueError, kdtree.search_centers_radius,
+                              centers, 1.5, zeros(5, bool))
+            self.assertRaises(ValueError, kdtree.search_centers_any,
+                              centers, 1.5, zeros(1, bool), zeros(5, bool))
+
 
 COORDS = array([[-1., -1., 0.],
                 [-1.,  5., 0.],
@@ -73,3 +105,10 @@ class TestKDTreePBC(unittest.TestCase):
         KDTREE_PBC.search(2)
         self.assertEqual(8, KDTREE_PBC.getCount())
 
+    def testMaskPBC(self):
+
+        mask = KDTREE_PBC.getMask(2, array([[2., 2., 0.]]))
+        self.assertEqual(5, mask.sum())
+        found = KDTREE_PBC.getCenterMask(1, array([[2., 2., 0.],
+                                                   [3.5, 3.5, 0.]]))
+        self.assertEqual([True, True], list(found))
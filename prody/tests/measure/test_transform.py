@@ -1,15 +1,21 @@
 """This module contains unit tests for :mod:`prody.measure.transform` module.
 """
 
-from numpy import zeros, ones, eye, all
-from numpy.testing import assert_equal
+from os import remove
+from os.path import join
 
-from prody.tests import unittest
+from numpy import zeros, ones, eye, all, array, load, sqrt
+from numpy.testing import assert_equal, assert_allclose
+
+from prody.tests import unittest, TEMPDIR
 from prody.tests.datafiles import parseDatafile
 
-from prody.measure import moveAtoms, wrapAtoms
+from prody.measure import moveAtoms, wrapAtoms, alignCoordsets
+from prody.measure import calcTransformation, getTransformation
+from prody.measure import getTransformations, buildRMSDMatrix, getRMSD
 
 UBI = parseDatafile('1ubi')
+MODELS = parseDatafile('multi_model_truncated')
 
 
 class TestMoveAtoms(unittest.TestCase):
@@ -52,3 +58,109 @@ class TestWrapAtoms(unittest.TestCase):
         diff = xyz - UBI.getCoords()
         self.assertTrue(all(diff == unitcell))
 
+
+
+class TestTransformations(unittest.TestCase):
+
+    def setUp(self):
+
+        self.mobs = MODELS.getCoordsets()
+        self.tar = MODELS.getCoordsets(0) + 5.
+
+    def testTransformations(self):
+
+        masses = MODELS.getMasses().reshape((-1, 1))
+        n_csets = len(self.mobs)
+        for weights in (None, masses,
+                        array([masses * (i + 1) for i in range(n_csets)])):
+            rotations, translations = getTransformations(self.mobs, self.tar,
+                                                         weights, chunk=2)
+            for i, mob in enumerate(self.mobs):
+                w = weights if weights is None or weights.ndim == 2 \
+                    else weights[i]
+                rotation, translation = getTransformation(mob, self.tar, w)
+                assert_allclose(rotations[i], rotation, atol=1e-10)
+                assert_allclose(translations[i], translation, atol=1e-8)
+
+    def testAlignCoordsets(self):
+
+        atoms = MODELS.copy()
+        atoms.setACSIndex(1)
+        expected = atoms.getCoordsets()
+        for i in (0, 2):
+            atoms.setACSIndex(i)
+            t = calcTransformation(atoms.ca, expected[1][atoms.ca.getIndices()])
+            expected[i] = t.apply(atoms.getCoords())
+        atoms.setACSIndex(1)
+        alignCoordsets(atoms.ca)
+        self.assertEqual(atoms.getACSIndex(), 1)
+        assert_allclose(atoms.getCoordsets(), expected, atol=1e-8)
+
+
+class TestRMSDMatrix(unittest.TestCase):
+
+    def setUp(self):
+
+        self.coordsets = MODELS.getCoordsets()
+        self.masses = MODELS.getMasses().reshape((-1, 1))
+
+    def _pairwise(self, weights=None, superpose=True):
+
+        coordsets = self.coordsets
+        n_csets = len(coordsets)
+        rmsd = zeros((n_csets, n_csets))
+        for i in range(n_csets):
+            for j in range(i + 1, n_csets):
+                w = weights
+                if w is not None and w.ndim == 3:
+                    w = w[i] * w[j]
+                mob = coordsets[i]
+                if superpose:
+                    mob = calcTransformation(mob, coordsets[j]).apply(mob)
+                rmsd[i, j] = rmsd[j, i] = getRMSD(mob, coordsets[j], w)
+        return rmsd
+
+    def testSuperposed(self):
+
+        expected = self._pairwise()
+        assert_allclose(buildRMSDMatrix(self.coordsets), expected, atol=1e-8)
+        assert_allclose(buildRMSDMatrix(self.coordsets, n_cpu=2,
+                                        format='arr'),
+                        expected[[0, 0, 1], [1, 2, 2]], atol=1e-8)
+
+    def testWeighted(self):
+
+        assert_allclose(buildRMSDMatrix(self.coordsets, self.masses),
+                        buildRMSDMatrix(self.coordsets, self.masses * 2),
+                        atol=1e-8)
+        assert_allclose(buildRMSDMatrix(self.coordsets, self.masses * 0 + 1),
+                        buildRMSDMatrix(self.coordsets), atol=1e-8)
+
+        # pairs of sets are superposed using atoms present in both
+        weights = ones((3, len(self.masses), 1))
+        weights[0, ::3] = weights[1, 1::3] = 0
+        weights[2] = 0
+        rmsd = buildRMSDMatrix(self.coordsets, weights)
+        common = weights[0, :, 0] * weights[1, :, 0] > 0
+        assert_allclose(rmsd[0, 1],
+                        buildRMSDMatrix(self.coordsets[:2, common])[0, 1],
+                        atol=1e-8)
+        self.assertEqual(rmsd[0, 2], 0)
+
+    def testNotSuperposed(self):
+
+        weights = array([self.masses, self.masses * 2, self.masses])
+        weights[1, ::3] = 0
+        for w in (None, self.masses, weights):
+            assert_allclose(buildRMSDMatrix(self.coordsets, w,
+                                            superpose=False, n_cpu=2),
+                            self._pairwise(w, False), atol=1e-8)
+
+    def testMemmap(self):
+
+        filename = join(TEMPDIR, 'rmsd.npy')
+        rmsd = buildRMSDMatrix(self.coordsets, memmap=filename)
+        assert_allclose(load(filename), buildRMSDMatrix(self.coordsets,
+                                                        format='arr'))
+        del rmsd
+        remove(filename)
@@ -29,37 +29,32 @@ class TestInteractions(unittest.TestCase):
             self.HPH_INTERACTIONS = parseDatafile('2k39_hph')
             self.HPH_INTERACTIONS2 = parseDatafile('2k39_hph2')
             self.DISU_INTERACTIONS = parseDatafile('2k39_disu')
+
+            # reference data was calculated without the last model
+            stop = self.ATOMS.numCoordsets() - 2
             
             self.INTERACTIONS_ALL = InteractionsTrajectory()
-            self.data_all = self.INTERACTIONS_ALL.calcProteinInteractionsTrajectory(self.ATOMS)
-            np.save('test_2k39_all.npy', self.data_all, allow_pickle=True)
+            self.data_all = self.INTERACTIONS_ALL.calcProteinInteractionsTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_hbs = calcHydrogenBondsTrajectory(self.ATOMS)
-            np.save('test_2k39_hbs.npy', np.array(self.data_hbs, dtype=object), allow_pickle=True)
+            self.data_hbs = calcHydrogenBondsTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_sbs = calcSaltBridgesTrajectory(self.ATOMS)
-            np.save('test_2k39_sbs.npy', np.array(self.data_sbs, dtype=object), allow_pickle=True)
+            self.data_sbs = calcSaltBridgesTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_rib = calcRepulsiveIonicBondingTrajectory(self.ATOMS)
-            np.save('test_2k39_rib.npy', np.array(self.data_rib, dtype=object), allow_pickle=True)
+            self.data_rib = calcRepulsiveIonicBondingTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_PiStack = calcPiStackingTrajectory(self.ATOMS)
-            np.save('test_2k39_PiStack.npy', np.array(self.data_PiStack, dtype=object), allow_pickle=True)
+            self.data_PiStack = calcPiStackingTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_PiCat = calcPiCationTrajectory(self.ATOMS)
-            np.save('test_2k39_PiCat.npy', np.array(self.data_PiCat, dtype=object), allow_pickle=True)
+            self.data_PiCat = calcPiCationTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_hph = calcHydrophobicTrajectory(self.ATOMS)
-            np.save('test_2k39_hph.npy', np.array(self.data_hph, dtype=object), allow_pickle=True)
+            self.data_hph = calcHydrophobicTrajectory(self.ATOMS, stop_frame=stop)
 
-            self.data_disu = calcDisulfideBondsTrajectory(self.ATOMS)
-            np.save('test_2k39_disu.npy', np.array(self.data_disu, dtype=object), allow_pickle=True)
+            self.data_disu = calcDisulfideBondsTrajectory(self.ATOMS, stop_frame=stop)
 
     def testAllInsteractions(self):
         """Test for all types of interactions."""
 
         if prody.PY3K:        
-            data_test = np.load('test_2k39_all.npy', allow_pickle=True)
+            data_test = self.data_all
 
             try:
                 assert_equal(data_test, self.ALL_INTERACTIONS2,
@@ -74,7 +69,7 @@ class TestInteractions(unittest.TestCase):
         order can be also different in the interactions"""
 
         if prody.PY3K:                
-            data_test = np.load('test_2k39_hbs.npy', allow_pickle=True)
+            data_test = self.data_hbs
             assert_equal(sorted([i[-1][-1] for i in data_test]), sorted([i[-1][-1] for i in self.HBS_INTERACTIONS]),
                          'failed to get correct hydrogen bonds')        
                      
@@ -82,7 +77,7 @@ class TestInteractions(unittest.TestCase):
         """Test for salt bridges."""
 
         if prody.PY3K:                
-            data_test = np.load('test_2k39_sbs.npy', allow_pickle=True)
+            data_test = self.data_sbs
             assert_equal(sorted([i[-1][-1] for i in data_test]), sorted([i[-1][-1] for i in self.SBS_INTERACTIONS]),
                          'failed to get correct salt bridges')                             
 
@@ -90,7 +85,7 @@ class TestInteractions(unittest.TestCase):
         """Test for repulsive ionic bonding."""
 
         if prody.PY3K:                
-            data_test = np.load('test_2k39_rib.npy', allow_pickle=True)
+            data_test = self.data_rib
             assert_equal(sorted([i[-1][-1] for i in data_test if i]), sorted([i[-1][-1] for i in self.RIB_INTERACTIONS if i]),
                          'failed to get correct repulsive ionic bonding')                             
 
@@ -98,7 +93,7 @@ class TestInteractions(unittest.TestCase):
         """Test for pi-stacking interactions."""
 
         if prody.PY3K:                
-            data_test = np.load('test_2k39_PiStack.npy', allow_pickle=True)
+            data_test = self.data_PiStack
             assert_equal(sorted([i[-1][-1] for i in data_test if i]), sorted([i[-1][-1] for i in self.PISTACK_INTERACTIONS if i]),
                          'failed to get correct pi-stacking interactions')                             
                      
@@ -106,7 +101,7 @@ class TestInteractions(unittest.TestCase):
         """Test for pi-stacking interactions."""
 
         if prody.PY3K:                
-            data_test = np.load('test_2k39_PiCat.npy', allow_pickle=True)
+            data_test = self.data_PiCat
             assert_equal(sorted([i[-1][-1] for i in data_test if i]), sorted([i[-1][-1] for i in self.PICAT_INTERACTIONS if i]),
                          'failed to get correct pi-cation interactions')
 
@@ -115,7 +110,7 @@ class TestInteractions(unittest.TestCase):
         """Test for hydrophobic interactions."""
 
         if prody.PY3K:        
-            data_test = np.load('test_2k39_hph.npy', allow_pickle=True)                                                        
+            data_test = self.data_hph                                                        
             try:
                 assert_equal(sorted([i[-1][-1] for i in data_test]), sorted([i[-1][-1] for i in self.HPH_INTERACTIONS2]),
                          'failed to get correct hydrophobic interactions without hpb.so')
@@ -128,8 +123,129 @@ class TestInteractions(unittest.TestCase):
         """Test for disulfide bonds interactions."""
 
         if prody.PY3K:               
-             data_test = np.load('test_2k39_disu.npy', allow_pickle=True)
+             data_test = self.data_disu
              assert_equal(sorted([i[-1][-1] for i in data_test if i]), sorted([i[-1][-1] for i in self.DISU_INTERACTIONS if i]),
                           'failed to get correct disulfide bonds')
         
                      
+
+
+class TestInteractionsParallel(unittest.TestCase):
+
+    def testFrames(self):
+        """Test that frames profiled by a pool of processes are merged in order."""
+
+        if prody.PY3K:
+            atoms = parseDatafile('2k39_insty')
+            ensemble = Ensemble()
+            ensemble.setCoords(atoms.getCoords())
+            ensemble.addCoordset(atoms.getCoordsets()[:3])
+
+            serial = InteractionsTrajectory()
+            data_serial = serial.calcProteinInteractionsTrajectory(atoms, ensemble)
+            parallel = InteractionsTrajectory()
+            data_parallel = parallel.calcProteinInteractionsTrajectory(atoms, ensemble, n_cpu=2)
+            assert_equal(data_parallel, data_serial)
+            assert_equal(len(data_parallel[0]), 3)
+            self.assertEqual(parallel.getInteractions(), serial.getInteractions())
+
+            assert_equal(calcSaltBridgesTrajectory(atoms, ensemble, start_frame=1, n_cpu=2),
+                         parallel.getInteractions()[1][1:])
+
+
+class TestInteractionsModels(unittest.TestCase):
+
+    def testLastModel(self):
+        """Test that all models of a multi-model structure are profiled by default."""
+
+        if prody.PY3K:
+            atoms = parseDatafile('2k39_insty')
+            n_models = atoms.numCoordsets()
+
+            interactions = InteractionsTrajectory()
+            data = interactions.calcProteinInteractionsTrajectory(atoms)
+            self.assertEqual(len(data[0]), n_models)
+
+            salt_bridges = calcSaltBridgesTrajectory(atoms)
+            self.assertEqual(len(salt_bridges), n_models)
+            model = atoms.copy()
+            model.setACSIndex(n_models - 1)
+            assert_equal(salt_bridges[-1], calcSaltBridges(model.protein))
+            self.assertEqual(len(calcSaltBridgesTrajectory(atoms, start_frame=2,
+                                                           stop_frame=4)), 3)
+
+
+class TestHydrogenBonds(unittest.TestCase):
+
+    def _compare(self, atoms, reference):
+
+        for i, expected in enumerate(reference):
+            atoms.setACSIndex(i)
+            result = calcHydrogenBonds(atoms.protein)
+            assert_equal(sorted(list(map(str, hb)) for hb in result),
+                         sorted(list(map(str, hb)) for hb in expected),
+                         'failed to get correct hydrogen bonds for model {0}'.format(i))
+
+    def testReference(self):
+        """Test hydrogen bonds of each model against stored reference data."""
+
+        if prody.PY3K:
+            from prody.proteins.interactions import _getFeatures
+
+            atoms = parseDatafile('2k39_insty')
+            reference = parseDatafile('2k39_hbs')
+            self._compare(atoms, reference)
+            # bound hydrogens are found once and reused for other models
+            features = _getFeatures(atoms.protein)
+            bound = features._groups['hydrogens']
+            calcHydrogenBonds(atoms.protein)
+            self.assertIs(_getFeatures(atoms.protein)._groups['hydrogens'], bound)
+
+    def testBonds(self):
+        """Test hydrogen bonds with hydrogens bound according to bonds."""
+
+        if prody.PY3K:
+            atoms = parseDatafile('2k39_insty')
+            kdtree = KDTree(atoms.getCoords())
+            kdtree.search(1.4)
+            atoms.setBonds(kdtree.getIndices())
+            self._compare(atoms, parseDatafile('2k39_hbs'))
+
+
+class TestInteractionFeatures(unittest.TestCase):
+
+    def testCoordsChange(self):
+        """Test that cached centers of residue groups follow coordinates."""
+
+        if prody.PY3K:
+            atoms = parseDatafile('2k39_insty')
+            model = atoms.copy()
+            model.setACSIndex(13)
+
+            interactions = [func(atoms.protein) for func in 
+                            (calcSaltBridges, calcPiCation, calcHydrophobic)]
+            atoms.setCoords(model.getCoords())
+            for func, before in zip((calcSaltBridges, calcPiCation, calcHydrophobic),
+                                    interactions):
+                after = func(atoms.protein)
+                self.assertNotEqual(after, before)
+                assert_equal(after, func(model.protein))
+
+    def testRelease(self):
+        """Test that cached features are kept by the atom group only."""
+
+        if prody.PY3K:
+            import gc
+            from prody.proteins.interactions import _getFeatures
+
+            def count():
+                gc.collect()
+                return sum(isinstance(obj, AtomGroup) for obj in gc.get_objects())
+
+            n_groups = count()
+            atoms = parseDatafile('2k39_insty')
+            calcSaltBridges(atoms.protein)
+            self.assertIs(_getFeatures(atoms.protein), _getFeatures(atoms.protein))
+            self.assertEqual(len(atoms._features), 1)
+            del atoms
+            self.assertEqual(count(), n_groups)
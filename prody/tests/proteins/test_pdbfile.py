@@ -13,6 +13,7 @@ from prody import LOGGER
 from prody.utilities import which
 from prody.tests import TEMPDIR, unittest
 from prody.tests.datafiles import *
+from prody.proteins.pdbfile import _parsePDBBuffer, _parsePDBLines
 
 LOGGER.verbosity = 'none'
 
@@ -534,3 +535,79 @@ class TestParsePDBAltloc(unittest.TestCase):
 
         self.assertEqual(len(parsePDB(self.pdbfile, altloc='C')), 496,
             'failed to parse alternate locations C correctly')
+
+
+class TestParsePDBBuffer(unittest.TestCase):
+
+    """Test that parsing columns of all records at once gives the same
+    atom group as parsing records one by one."""
+
+    def readLines(self, filename):
+
+        with open(pathDatafile(filename)) as inp:
+            return inp.readlines()
+
+    def assertSameParse(self, lines, model=None, chain=None, subset=None,
+                        altloc='A', bonds=None):
+
+        args = (lines, 0, model, chain, subset, altloc)
+        fast_bonds = None if bonds is None else []
+        fast = _parsePDBBuffer(AtomGroup(), *args, bonds=fast_bonds)
+        self.assertIsNotNone(fast, 'failed to parse lines at once')
+        slow = _parsePDBLines(AtomGroup(), *args, bonds=bonds)
+        self.assertEqual(fast_bonds, bonds)
+
+        self.assertEqual(fast.numAtoms(), slow.numAtoms())
+        assert_equal(fast.getCoordsets(), slow.getCoordsets())
+        assert_equal(fast.getCSLabels(), slow.getCSLabels())
+        for label in ('name', 'resname', 'resnum', 'chain', 'altloc',
+                      'icode', 'serial', 'beta', 'occupancy', 'segment',
+                      'element', 'mass', 'charge'):
+            assert_equal(fast.getData(label), slow.getData(label),
+                         'failed to parse {0} correctly'.format(label))
+        for label in ('hetatm', 'pdbter'):
+            assert_equal(fast.getFlags(label), slow.getFlags(label))
+
+    def testSingleModel(self):
+
+        self.assertSameParse(self.readLines('pdb3mht.pdb'))
+        self.assertSameParse(self.readLines('pdb3enl.pdb'), bonds=[])
+
+    def testMultipleModels(self):
+
+        self.assertSameParse(self.readLines('2k39_insty.pdb'))
+        lines = self.readLines(DATA_FILES['multi_model_truncated']['file'])
+        self.assertSameParse(lines, model=1)
+        self.assertSameParse(lines, model=2)
+
+    def testSubsetAndChain(self):
+
+        lines = self.readLines('pdb3mht.pdb')
+        self.assertSameParse(lines, subset='ca')
+        self.assertSameParse(lines, subset='bb', chain='A')
+        self.assertSameParse(lines, chain='AD')
+
+    def testAltlocs(self):
+
+        lines = [line for line in self.readLines('pdb1ejg.pdb')
+                 if not line.startswith('ANISOU')]
+        self.assertSameParse(lines)
+        self.assertSameParse(lines, altloc='B')
+        self.assertSameParse(lines, altloc='all')
+        self.assertSameParse(lines, altloc=None)
+
+    def testFallback(self):
+
+        lines = self.readLines(DATA_FILES['five_digits']['file'])
+        self.assertIsNone(_parsePDBBuffer(AtomGroup(), lines, 0, None,
+                                          None, None, 'A'))
+
+        lines = self.readLines('pdb3mht.pdb')
+        index = [line[:4] for line in lines].index('ATOM')
+        for start, stop, field in ((6, 11, '186a0'), (22, 26, 'A000'),
+                                   (60, 66, '      ')):
+            modified = list(lines)
+            modified[index] = (lines[index][:start] + field +
+                               lines[index][stop:])
+            self.assertIsNone(_parsePDBBuffer(AtomGroup(), modified, 0,
+                                              None, None, None, 'A'))
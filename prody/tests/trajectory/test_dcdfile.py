@@ -46,3 +46,26 @@ class TestDCDFile(TestCase):
         assert_allclose(coordsets[:n_csets], ENSEMBLE._getCoordsets(),
                         rtol=RTOL, atol=ATOL,
                         err_msg='failed to parse DCD file correctly')
+
+    def testMappedFrames(self):
+        writeDCD(self.dcd, ALLATOMS)
+        coordsets = ALLATOMS.getCoordsets()
+        dcd = DCDFile(self.dcd)
+        view = dcd.getCoordsets(slice(None, None, 2), copy=False)
+        self.assertFalse(view.flags.writeable)
+        assert_allclose(view, coordsets[::2], rtol=RTOL, atol=ATOL)
+        assert_allclose(dcd[::-2].getCoordsets(), coordsets[::-2][::-1],
+                        rtol=RTOL, atol=ATOL)
+        assert_allclose(dcd.getFrame(1).getCoords(), coordsets[1],
+                        rtol=RTOL, atol=ATOL)
+        dcd.reset()
+        assert_allclose([frame.getCoords() for frame in dcd], coordsets,
+                        rtol=RTOL, atol=ATOL)
+
+        indices = [0, 2, 3]
+        dcd.setAtoms(ALLATOMS[indices])
+        assert_allclose(dcd.getCoordsets([2, 0]), coordsets[[0, 2]][:, indices],
+                        rtol=RTOL, atol=ATOL)
+        assert_allclose(dcd.getCoordsets(slice(None), copy=False),
+                        coordsets[:, indices], rtol=RTOL, atol=ATOL)
+        dcd.close()
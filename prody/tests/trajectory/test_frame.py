@@ -3,9 +3,10 @@
 from code import interact
 from prody.tests import TestCase
 
-from numpy import array
+from numpy import array, concatenate, ones
 from numpy.testing import assert_allclose
 
+from prody.measure import calcTransformation
 from prody.trajectory import Trajectory
 from prody.tests.datafiles import parseDatafile, pathDatafile
 
@@ -38,3 +39,66 @@ class TestSuperpose(TestCase):
             frame.superpose()
             rmsd.append(frame.getRMSD())
         assert_allclose(rmsd, RMSD_CARBON, atol=0.001)
+
+
+class TestChunks(TestCase):
+
+    def setUp(self):
+
+        DCD.setCoords(PDB.getCoords())
+        DCD.setAtoms(PDB)
+        DCD.reset()
+
+    def _superposed(self, atoms=None):
+
+        DCD.setAtoms(atoms or PDB)
+        DCD.reset()
+        coords = []
+        for frame in DCD:
+            frame.superpose()
+            coords.append(frame.getCoords())
+        DCD.setAtoms(PDB)
+        DCD.reset()
+        return array(coords)
+
+    def testChunks(self):
+
+        chunks = [chunk.copy() for chunk in DCD.iterChunks(2)]
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        assert_allclose(concatenate(chunks), DCD.getCoordsets(), rtol=1e-6)
+        self.assertEqual(DCD.nextIndex(), DCD.numFrames())
+
+    def testAlign(self):
+
+        chunks = [chunk.copy() for chunk in DCD.iterChunks(2, align=True)]
+        assert_allclose(concatenate(chunks), self._superposed(), atol=1e-4)
+
+        DCD.reset()
+        chunks = [chunk.copy() for chunk in DCD.iterChunks(2, 'carbon',
+                                                          align=True)]
+        assert_allclose(concatenate(chunks), self._superposed(PDB.carbon),
+                        atol=1e-4)
+
+    def testAlignSelection(self):
+
+        DCD.setWeights(PDB.getMasses())
+        expected = []
+        for coords in DCD.getCoordsets():
+            mobile = PDB.copy()
+            mobile.setCoords(coords)
+            calcTransformation(mobile.ca, PDB.ca,
+                               PDB.ca.getMasses()).apply(mobile)
+            expected.append(mobile.carbon.getCoords())
+        chunks = [chunk.copy() for chunk in DCD.iterChunks(2, 'carbon',
+                                                          align='name CA')]
+        DCD.setWeights(ones(DCD.numAtoms()))
+        assert_allclose(concatenate(chunks), expected, atol=1e-4)
+
+    def testRMSDs(self):
+
+        DCD.setWeights(ones(DCD.numAtoms()))
+        DCD.goto(1)
+        assert_allclose(DCD.getRMSDs(align=True), RMSD_ALL, atol=0.001)
+        self.assertEqual(DCD.nextIndex(), 1)
+        DCD.setAtoms(PDB.carbon)
+        assert_allclose(DCD.getRMSDs(2, align=True), RMSD_CARBON, atol=0.001)
@@ -0,0 +1,144 @@
+"""This module contains unit tests for :mod:`.trajectory` module."""
+
+from os import remove
+from os.path import join
+
+import numpy as np
+from numpy.testing import assert_equal, assert_allclose
+
+from prody.tests import TestCase, TEMPDIR
+from prody.tests.datafiles import pathDatafile
+
+from prody import LOGGER, AtomGroup
+from prody.ensemble import Ensemble
+from prody.trajectory import DCDFile, Trajectory, writeDCD
+
+LOGGER.verbosity = 'none'
+
+COORDSETS = DCDFile(pathDatafile('dcd')).getCoordsets()
+
+
+class TestTrajectoryIndex(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        cls.filenames = []
+        for i in range(3):
+            ensemble = Ensemble()
+            ensemble.setCoords(COORDSETS[0])
+            ensemble.addCoordset(COORDSETS[i:])
+            filename = join(TEMPDIR, 'traj_part{0}.dcd'.format(i))
+            cls.filenames.append(writeDCD(filename, ensemble))
+        cls.expected = np.concatenate([COORDSETS[i:] for i in range(3)])
+        cls.index = join(TEMPDIR, 'traj.index.npz')
+
+    def _trajectory(self):
+
+        traj = Trajectory(self.filenames[0])
+        for filename in self.filenames[1:]:
+            traj.addFile(filename)
+        return traj
+
+    def testRandomAccess(self):
+
+        traj = self._trajectory()
+        for i in (4, 0, 5, 3, len(self.expected) - 1):
+            frame = traj[i]
+            assert_equal(frame.getIndex(), i)
+            assert_allclose(frame.getCoords(), self.expected[i])
+        traj.goto(2)
+        traj.skip(2)
+        assert_allclose(traj.nextCoordset(), self.expected[4])
+        assert_allclose(traj.getCoordsets([5, 1, 3]), self.expected[[1, 3, 5]])
+
+    def testIndex(self):
+
+        traj = self._trajectory()
+        self.assertEqual(traj.saveIndex(self.index), self.index)
+
+        indexed = Trajectory(self.index)
+        assert_equal(indexed.numFrames(), len(self.expected))
+        assert_equal(indexed.numFiles(), len(self.filenames))
+        assert_equal(indexed.getFrameFreq(), traj.getFrameFreq())
+        self.assertIsNone(indexed._trajectories[-1])
+        assert_allclose(indexed[len(self.expected) - 1].getCoords(),
+                        self.expected[-1])
+        self.assertIsNotNone(indexed._trajectories[-1])
+        self.assertIsNone(indexed._trajectories[1])
+        assert_allclose(indexed.getCoordsets(), self.expected)
+        indexed.reset()
+        assert_allclose([frame.getCoords() for frame in indexed], self.expected)
+
+        # an index can be saved before all files are opened
+        Trajectory(self.index).saveIndex(self.index)
+        assert_allclose(Trajectory(self.index).getCoordsets(), self.expected)
+
+    def testOutdatedIndex(self):
+
+        self._trajectory().saveIndex(self.index)
+        with open(self.filenames[-1], 'ab') as out:
+            out.write(b'\0')
+        traj = Trajectory(self.index)
+        assert_allclose(traj.getCoordsets(), self.expected)
+        with open(self.filenames[-1], 'rb+') as out:
+            out.truncate(out.seek(0, 2) - 1)
+
+    def testIndexDuplicates(self):
+
+        self._trajectory().saveIndex(self.index)
+        with open(self.filenames[0], 'ab') as out:
+            out.write(b'\0')
+        try:
+            traj = Trajectory(self.filenames[-1])
+            self.assertRaises(IOError, traj.loadIndex, self.index)
+            assert_equal(traj.numFiles(), 1)
+        finally:
+            with open(self.filenames[0], 'rb+') as out:
+                out.truncate(out.seek(0, 2) - 1)
+
+    def testIndexAppended(self):
+
+        traj = Trajectory(self.filenames[0])
+        traj.addFile(self.filenames[1])
+        traj.saveIndex(self.index)
+        traj = Trajectory(self.filenames[2])
+        traj.loadIndex(self.index)
+        assert_equal(traj.numFiles(), 3)
+        assert_allclose(traj.getCoordsets(), np.concatenate(
+            [COORDSETS[2:], COORDSETS, COORDSETS[1:]]))
+
+    def testPrefetch(self):
+
+        traj = self._trajectory()
+        traj.prefetch(4, workers=2)
+        assert_allclose([traj.nextCoordset() for i in range(3)],
+                        self.expected[:3])
+        traj.goto(len(self.expected) - 6)
+        assert_allclose([frame.getCoords() for frame in traj],
+                        self.expected[-6:])
+
+        atoms = AtomGroup()
+        atoms.setCoords(self.expected[0])
+        traj.link(atoms)
+        traj.reset()
+        for i, frame in enumerate(traj):
+            assert_allclose(atoms.getCoords(), self.expected[i])
+            frame.superpose()
+        traj.prefetch(0)
+        self.assertIsNone(traj._prefetcher)
+        traj.close()
+
+    def testPrefetchIndex(self):
+
+        self._trajectory().saveIndex(self.index)
+        traj = Trajectory(self.index)
+        traj.prefetch(2)
+        assert_allclose([frame.getCoords() for frame in traj], self.expected)
+        traj.close()
+
+    @classmethod
+    def tearDownClass(cls):
+
+        for filename in cls.filenames + [cls.index]:
+            remove(filename)
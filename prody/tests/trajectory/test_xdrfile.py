@@ -0,0 +1,103 @@
+"""This module contains unit tests for :mod:`.xdrfile` module."""
+
+from os import remove
+from os.path import join
+from struct import pack
+
+import numpy as np
+from numpy.testing import assert_equal, assert_allclose
+
+from prody.tests import TestCase, TEMPDIR
+from prody.tests.datafiles import pathDatafile
+
+from prody import LOGGER
+from prody.trajectory import DCDFile, XTCFile, TRRFile, Trajectory
+
+LOGGER.verbosity = 'none'
+
+XTC = pathDatafile('MCV1900370.xtc')
+DCD = pathDatafile('MCV1900370.dcd')
+COORDSETS = DCDFile(DCD).getCoordsets()
+
+
+def writeTRR(filename, coordsets, box):
+    """Write *coordsets* in Å into a single precision TRR file, a frame with
+    velocities only is written after the first frame."""
+
+    with open(filename, 'wb') as out:
+        for step, xyz in enumerate(coordsets):
+            n_atoms = len(xyz)
+            sizes = [(n_atoms * 12, 0)]
+            if step == 0:
+                sizes.append((0, n_atoms * 12))
+            for x_size, v_size in sizes:
+                out.write(pack('>iii12s', 1993, 13, 12, b'GMX_trn_file'))
+                out.write(pack('>13i', 0, 0, 36, 0, 0, 0, 0, x_size, v_size, 0,
+                               n_atoms, step * 10, 0))
+                out.write(pack('>ff', step * 0.02, 0))
+                out.write(np.asarray(box, '>f4').tobytes())
+                out.write(np.asarray(xyz / 10., '>f4').tobytes())
+
+
+class TestXTCFile(TestCase):
+
+    def testCoordsets(self):
+
+        xtc = XTCFile(XTC)
+        assert_equal(xtc.numFrames(), len(COORDSETS))
+        assert_equal(xtc.numAtoms(), COORDSETS.shape[1])
+        assert_allclose(xtc.getCoordsets(), COORDSETS, atol=1e-4)
+        assert_allclose(xtc.getCoords(), COORDSETS[0], atol=1e-4)
+
+    def testRandomAccess(self):
+
+        xtc = XTCFile(XTC)
+        assert_allclose(xtc[4].getCoords(), COORDSETS[4], atol=1e-4)
+        assert_allclose(xtc[::-2].getCoordsets(), COORDSETS[1::2], atol=1e-4)
+        xtc.goto(-1)
+        assert_equal(xtc.nextIndex(), len(COORDSETS) - 1)
+        assert_allclose(xtc.nextCoordset(), COORDSETS[-1], atol=1e-4)
+        self.assertIsNone(next(xtc))
+
+    def testMixedTrajectory(self):
+
+        traj = Trajectory(DCD)
+        traj.addFile(XTC)
+        n_csets = len(COORDSETS)
+        assert_equal(traj.numFrames(), 2 * n_csets)
+        assert_allclose(traj.getCoordsets([1, n_csets + 1]),
+                        COORDSETS[[1, 1]], atol=1e-4)
+        traj.goto(n_csets + 2)
+        assert_allclose(next(traj).getCoords(), COORDSETS[2], atol=1e-4)
+
+    def testWriteMode(self):
+
+        self.assertRaises(IOError, XTCFile, join(TEMPDIR, 'temp.xtc'), 'w')
+
+
+class TestTRRFile(TestCase):
+
+    def setUp(self):
+
+        self.trr = join(TEMPDIR, 'temp.trr')
+        writeTRR(self.trr, COORDSETS[:, :100], np.diag([5., 6., 7.]))
+
+    def testCoordsets(self):
+
+        trr = TRRFile(self.trr)
+        assert_equal(trr.numFrames(), len(COORDSETS))
+        assert_allclose(trr.getCoordsets(), COORDSETS[:, :100], atol=1e-4)
+        assert_allclose(trr.getTimes(), np.arange(len(COORDSETS)) * 0.02,
+                        rtol=1e-6)
+        assert_equal(trr.getFrameFreq(), 10)
+
+    def testUnitcell(self):
+
+        trr = TRRFile(self.trr)
+        self.assertTrue(trr.hasUnitcell())
+        assert_allclose(trr[2].getUnitcell(), [50, 60, 70, 90, 90, 90],
+                        rtol=1e-6)
+
+    def tearDown(self):
+
+        remove(self.trr)
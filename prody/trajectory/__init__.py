@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-"""This module defines classes for handling trajectory files in DCD format.
+"""This module defines classes for handling trajectory files in DCD, XTC, and
+TRR formats.
 
 
 Parse/write DCD files
@@ -9,6 +10,12 @@ Parse/write DCD files
   * :func:`.parseDCD`
   * :func:`.writeDCD`
 
+Parse GROMACS trajectory files
+===============================================================================
+
+  * :class:`.XTCFile`
+  * :class:`.TRRFile`
+
 Parse structure files
 ===============================================================================
 
@@ -58,6 +65,10 @@ from . import dcdfile
 from .dcdfile import *
 __all__.extend(dcdfile.__all__)
 
+from . import xdrfile
+from .xdrfile import *
+__all__.extend(xdrfile.__all__)
+
 from . import frame
 from .frame import *
 __all__.extend(frame.__all__)
@@ -66,5 +77,5 @@ from . import psffile
 from .psffile import *
 __all__.extend(psffile.__all__)
 
-TRAJFILE = {'dcd': DCDFile}
+TRAJFILE = {'dcd': DCDFile, 'xtc': XTCFile, 'trr': TRRFile}
 
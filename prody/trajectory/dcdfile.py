@@ -8,9 +8,10 @@ from time import time
 from struct import calcsize, unpack, pack
 from os.path import getsize
 import datetime
+from numbers import Integral
 
 import numpy as np
-from numpy import float32, fromstring
+from numpy import float32
 
 from prody.atomic import Atomic
 from prody.ensemble import Ensemble
@@ -48,8 +49,14 @@ class DCDFile(TrajFile):
 
         TrajFile.__init__(self, filename, mode)
         self._astype = kwargs.get('astype', None)
+        self._frames = None
+        self._unitcells = None
         if not self._mode.startswith('w'):
-            self._parseHeader()
+            index = kwargs.get('index', None)
+            if index is None:
+                self._parseHeader()
+            else:
+                self._setIndex(*index)
 
     __init__.__doc__ = TrajFile.__init__.__doc__
 
@@ -218,10 +225,83 @@ class DCDFile(TrajFile):
                            .format(self._n_csets, n_csets))
             self._n_csets = n_csets
 
+        self._mapFrames()
         self._coords = self.nextCoordset()
         self._file.seek(self._first_byte)
         self._nfi = 0
 
+    def _getIndex(self):
+
+        header, arrays = TrajFile._getIndex(self)
+        endian = self._endian
+        if isinstance(endian, bytes):
+            endian = endian.decode()
+        header.update({'_unitcell': bool(self._unitcell),
+                       '_is64bit': bool(self._is64bit),
+                       '_endian': endian,
+                       '_n_floats': int(self._n_floats),
+                       '_bytes_per_frame': int(self._bytes_per_frame),
+                       '_itemsize': int(self._itemsize),
+                       '_first_byte': int(self._first_byte),
+                       '_dtype': np.dtype(self._dtype).name,
+                       '_dcdtitle': self._dcdtitle.decode('latin-1'),
+                       '_remarks': getattr(self, '_remarks', b'').decode('latin-1')})
+        arrays['offsets'] = (self._first_byte + self._bytes_per_frame *
+                             np.arange(self._n_csets, dtype=np.int64))
+        return header, arrays
+
+    def _setIndex(self, header, arrays):
+
+        TrajFile._setIndex(self, header, arrays)
+        self._dtype = np.dtype(self._dtype).type
+        self._dcdtitle = self._dcdtitle.encode('latin-1')
+        self._remarks = self._remarks.encode('latin-1')
+        self._mapFrames()
+        self._coords = self.nextCoordset()
+        self._file.seek(self._first_byte)
+        self._nfi = 0
+
+    _getIndex.__doc__ = TrajFile._getIndex.__doc__
+    _setIndex.__doc__ = TrajFile._setIndex.__doc__
+
+    def _mapFrames(self):
+        """Map frames in the file to memory.  Coordinate sets are exposed as
+        a strided ``(n_csets, n_atoms, 3)`` view of the mapped file, so that
+        only pages of the frames that are accessed are read from disk."""
+
+        n_csets = self._n_csets
+        bpf = self._bytes_per_frame
+        if n_csets:
+            raw = np.memmap(self._filename, np.uint8, 'r', self._first_byte,
+                            (n_csets, bpf))
+        else:
+            raw = np.zeros((0, bpf), np.uint8)
+
+        endian = self._endian
+        if isinstance(endian, bytes):
+            endian = endian.decode()
+        endian = endian or '='
+
+        offset = 56 if self._unitcell else 0
+        frames = raw[:, offset:].view(np.dtype(self._dtype).newbyteorder(endian))
+        # shape is set in place, so that an error is raised instead of
+        # making a copy of the mapped file
+        frames.shape = (n_csets, 3, self._n_atoms + 2)
+        self._frames = frames[:, :, 1:-1].transpose(0, 2, 1)
+        if self._unitcell:
+            self._unitcells = raw[:, 4:52].view(
+                np.dtype(np.float64).newbyteorder(endian))
+        else:
+            self._unitcells = None
+
+    def _getFrames(self):
+        """Returns mapped coordinate sets, mapping is updated when frames are
+        appended to the file."""
+
+        if self._frames is None or len(self._frames) != self._n_csets:
+            self._mapFrames()
+        return self._frames
+
     def hasUnitcell(self):
 
         return self._unitcell
@@ -258,9 +338,6 @@ class DCDFile(TrajFile):
         if self._closed:
             raise ValueError('I/O operation on closed file')
         if self._nfi < self._n_csets:
-            #Skip extended system coordinates (unit cell data)
-            if self._unitcell:
-                self._file.seek(56, 1)
             if self._indices is None:
                 return self._nextCoordset()
             else:
@@ -268,14 +345,13 @@ class DCDFile(TrajFile):
 
     def _nextCoordset(self):
 
-        n_floats = self._n_floats
-        n_atoms = self._n_atoms
-        xyz = fromstring(self._file.read(self._itemsize * n_floats),
-                            self._dtype)
-        if len(xyz) != n_floats:
+        frames = self._getFrames()
+        if self._nfi >= len(frames):
             return None
-        xyz = xyz.reshape((3, n_atoms+2)).T[1:-1,:]
-        xyz = xyz.reshape((n_atoms, 3))
+        if self._prefetcher is None:
+            xyz = np.array(frames[self._nfi], self._dtype)
+        else:
+            xyz = self._prefetcher.get(self._nfi)
         if self._ag is not None:
             self._ag._setCoords(xyz, self._title + ' frame ' + str(self._nfi),
                                 overwrite=True)
@@ -287,56 +363,65 @@ class DCDFile(TrajFile):
 
     nextCoordset.__doc__ = TrajBase.nextCoordset.__doc__
 
+    def _readCoordset(self, index, out):
+
+        out[:] = self._getFrames()[index]
+
+    _readCoordset.__doc__ = TrajBase._readCoordset.__doc__
+
+    def _readChunk(self, start, stop, out, indices=None):
+
+        frames = self._getFrames()[start:stop]
+        if indices is None:
+            out[:] = frames
+        else:
+            out[:] = frames[:, indices]
+
+    _readChunk.__doc__ = TrajBase._readChunk.__doc__
+
     def _nextUnitcell(self):
 
         if self._unitcell:
-            self._file.read(4)
-            unitcell = fromstring(self._file.read(48), dtype=np.float64)
-            unitcell = unitcell[[0,2,5,1,3,4]]
+            self._getFrames()
+            unitcell = self._unitcells[self._nfi, [0,2,5,1,3,4]]
+            unitcell = unitcell.astype(np.float64)
             if np.all(abs(unitcell[3:]) <= 1):
                 # This file was generated by CHARMM, or by NAMD > 2.5, with the angle */
                 # cosines of the periodic cell angles written to the DCD file.        */
                 # This formulation improves rounding behavior for orthogonal cells    */
                 # so that the angles end up at precisely 90 degrees, unlike acos().   */
                 unitcell[3:] = 90. - np.arcsin(unitcell[3:]) * 90 / PISQUARE
-            self._file.read(4)
             return unitcell
 
-    def getCoordsets(self, indices=None):
+    def getCoordsets(self, indices=None, copy=True):
         """Returns coordinate sets at given *indices*. *indices* may be an
-        integer, a list of integers or **None**. **None** returns all
-        coordinate sets."""
+        integer, a slice, a list of integers or **None**. **None** returns all
+        coordinate sets.  Only frames at *indices* are read from the file.
+
+        When atoms are not selected and *indices* is **None** or a slice,
+        ``copy=False`` returns a read-only strided view of the memory-mapped
+        file, so that frames are read only when the array is accessed."""
 
         if self._closed:
             raise ValueError('I/O operation on closed file')
-        if (self._indices is None and
-            (indices is None or indices == slice(None))):
-            nfi = self._nfi
-            self.reset()
-            n_floats = self._n_floats + self._unitcell * 14
-            n_atoms = self._n_atoms
-            n_csets = self._n_csets
-            data = self._file.read(self._itemsize * n_floats * n_csets)
-            data = fromstring(data, self._dtype)
-            if len(data) > n_floats * n_csets:
-                n_csets = len(data)/n_floats
-                data = data[:n_csets]
-                LOGGER.warning('DCD is corrupt, {0} out of {1} frames '
-                               'were parsed.'.format(n_csets, self._n_csets))
-            data = data.reshape((n_csets, n_floats))
-            if self._unitcell:
-                data = data[:, 14:]
-            data = data.reshape((n_csets, 3, n_atoms+2))
-            data = data[:, :, 1:-1]
-            data = data.transpose(0, 2, 1)
-            self.goto(nfi)
-            if self._astype is not None and self._astype != data.dtype:
-                data = data.astype(self._astype)
-            return data
+        if indices is None:
+            indices = slice(None)
+        if isinstance(indices, slice):
+            if indices.indices(self._n_csets)[2] < 0:
+                indices = np.arange(*indices.indices(self._n_csets))[::-1]
+        elif isinstance(indices, Integral):
+            indices = np.array([indices])
+        elif isinstance(indices, (list, np.ndarray)):
+            indices = np.unique(indices)
         else:
-            return TrajFile.getCoordsets(self, indices)
+            raise TypeError('indices must be an integer or a list of integers')
 
-    getCoordsets.__doc__ = TrajBase.getCoordsets.__doc__
+        frames = self._getFrames()[indices]
+        if self._indices is not None:
+            frames = frames[:, self._indices]
+        elif not copy and isinstance(indices, slice):
+            return frames
+        return np.array(frames, self._astype or self._dtype)
 
     def write(self, coords, unitcell=None, **kwargs):
         """Write *coords* to a file open in 'a' or 'w' mode.  *coords* may be
@@ -463,6 +548,14 @@ class DCDFile(TrajFile):
             dcd.seek(0, 2)
         self._nfi = self._n_csets
 
+    def close(self):
+
+        self._frames = None
+        self._unitcells = None
+        TrajFile.close(self)
+
+    close.__doc__ = TrajBase.close.__doc__
+
     def flush(self):
         """Flush the internal output buffer."""
 
@@ -1,17 +1,160 @@
 # -*- coding: utf-8 -*-
 """This module defines base class for trajectory handling."""
 
+import threading
+import weakref
 from numbers import Integral
-from numpy import ndarray, unique
 
+import numpy as np
+from numpy import ndarray, unique, zeros
+
+from prody import PY2K
 from prody.ensemble import Ensemble
+from prody.measure import getTransformations
+from prody.measure.transform import _applyTransformations
 from prody.utilities import checkCoords, checkWeights
 
 from .frame import Frame
 
+if PY2K:
+    from Queue import Queue, Empty
+else:
+    from queue import Queue, Empty
+
 __all__ = ['TrajBase']
 
 
+def _superposeChunk(chunk, tar, fit=None, weights=None):
+    """Superpose coordinate sets in *chunk* onto *tar* in place.  When *fit*
+    indices are given, transformations are calculated for those atoms of the
+    chunk and applied to all atoms."""
+
+    mobs = chunk if fit is None else chunk[:, fit]
+    rotations, translations = getTransformations(mobs, tar, weights)
+    _applyTransformations(rotations, translations, chunk)
+
+
+class _Prefetcher(object):
+
+    """Reads coordinate sets of a trajectory ahead of iteration.  Background
+    threads read frames into a ring buffer of *n_frames* preallocated arrays
+    using the trajectory's :meth:`_readCoordset` method, and frames are
+    copied out of the buffer when they are requested in order.  When frames
+    are requested out of order, e.g. after :meth:`~.TrajBase.goto`,
+    reading ahead restarts from the requested frame."""
+
+    def __init__(self, traj, n_frames, workers):
+
+        self._traj = weakref.ref(traj)
+        self._n_csets = traj.numFrames()
+        self._buffer = zeros((n_frames, traj.numAtoms(), 3), traj._dtype)
+        self._workers = workers
+        self._ready = [threading.Event() for _ in range(n_frames)]
+        self._errors = [None] * n_frames
+        self._tasks = Queue()
+        self._pending = 0
+        self._done = threading.Condition()
+        self._next = None
+        self._threads = [threading.Thread(target=self._work)
+                         for _ in range(workers)]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def _work(self):
+
+        while True:
+            try:
+                task = self._tasks.get(timeout=1.)
+            except Empty:
+                if self._traj() is None:
+                    return
+                continue
+            if task is None:
+                return
+            slot, index = task
+            traj = self._traj()
+            try:
+                if traj is None:
+                    raise ValueError('trajectory is deleted')
+                traj._readCoordset(index, self._buffer[slot])
+            except Exception as error:
+                self._errors[slot] = error
+            traj = None
+            self._ready[slot].set()
+            with self._done:
+                self._pending -= 1
+                self._done.notify_all()
+
+    def _schedule(self, index):
+
+        if index < self._n_csets:
+            slot = index % len(self._buffer)
+            self._ready[slot].clear()
+            self._errors[slot] = None
+            with self._done:
+                self._pending += 1
+            self._tasks.put((slot, index))
+
+    def _restart(self, index):
+
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except Empty:
+                break
+            with self._done:
+                self._pending -= 1
+        with self._done:
+            while self._pending:
+                self._done.wait()
+        for i in range(index, index + len(self._buffer)):
+            self._schedule(i)
+
+    def get(self, index):
+        """Returns a copy of coordinate set at *index*."""
+
+        if index != self._next:
+            self._restart(index)
+        slot = index % len(self._buffer)
+        self._ready[slot].wait()
+        error = self._errors[slot]
+        if error is not None:
+            self._next = None
+            raise error
+        xyz = self._buffer[slot].copy()
+        self._next = index + 1
+        self._schedule(index + len(self._buffer))
+        return xyz
+
+    def close(self):
+
+        self._restart(self._n_csets)
+        for thread in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class _PrefetchView(object):
+
+    """Serves coordinate sets of a file in a multi-file trajectory from the
+    trajectory's prefetcher, frame indices are shifted by *offset*."""
+
+    def __init__(self, prefetcher, offset):
+
+        self._prefetcher = prefetcher
+        self._offset = offset
+
+    def get(self, index):
+
+        return self._prefetcher.get(index + self._offset)
+
+    def close(self):
+
+        pass
+
+
 class TrajBase(object):
 
     """Base class for :class:`.Trajectory` and :class:`.TrajFile`.  Derived
@@ -30,6 +173,7 @@ class TrajBase(object):
         self._frame = None # if atoms are set, always return the same frame
         self._nfi = 0
         self._closed = False
+        self._prefetcher = None
 
     def __iter__(self):
 
@@ -306,6 +450,184 @@ class TrajBase(object):
         while self._nfi < self._n_csets:
             yield self.nextCoordset()
 
+    def _getSelectionIndices(self, selection):
+        """Returns indices of atoms in *selection*, which may be a selection
+        string, an :class:`.Atomic` instance, or an array of atom indices.
+        **None** returns indices of selected atoms."""
+
+        if selection is None:
+            return self._indices
+        if isinstance(selection, str):
+            if self._atoms is None:
+                raise ValueError('atoms must be set to make a selection')
+            atoms = self._atoms.select(selection)
+            if atoms is None:
+                raise ValueError('selection {0} does not match any atoms'
+                                 .format(repr(selection)))
+            return atoms.getIndices()
+        try:
+            indices = selection.getIndices()
+        except AttributeError:
+            indices = np.asarray(selection, int)
+        if indices.ndim != 1:
+            raise ValueError('selection must be a one-dimensional array of '
+                             'atom indices')
+        if len(indices) and (indices.min() < 0 or
+                             indices.max() >= self._n_atoms):
+            raise ValueError('selection contains atom indices out of range')
+        return indices
+
+    def iterChunks(self, size=256, selection=None, align=False, dtype=float):
+        """Yield coordinate sets in chunks of up to *size* frames, as arrays
+        with shape ``(n_frames, n_atoms, 3)``.  Iteration starts from the next
+        frame in line and the trajectory is left after the last frame.
+        Reference coordinates are not included.
+
+        :arg size: maximum number of frames in a chunk, default is 256
+        :type size: int
+
+        :arg selection: atoms whose coordinates are yielded, a selection
+            string evaluated for atoms set using :meth:`setAtoms`, an
+            :class:`.Atomic` instance, or atom indices, default is selected
+            atoms
+        :type selection: str, :class:`.Atomic`, :class:`numpy.ndarray`
+
+        :arg align: when **True**, frames are superposed onto reference
+            coordinates based on yielded atoms, atoms used for superposition
+            may also be specified in the same way as *selection*.  Trajectory
+            weights are used when they are set.
+        :type align: bool, str, :class:`.Atomic`, :class:`numpy.ndarray`
+
+        :arg dtype: data type of yielded arrays, default is ``float``
+        :type dtype: :class:`numpy.dtype`
+
+        Yielded arrays are views of buffers that are reused for the next
+        chunk, so they must be copied to be kept.  Unlike :meth:`next`,
+        linked :class:`.AtomGroup` coordinates are not updated."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        size = int(size)
+        if size < 1:
+            raise ValueError('size must be a positive integer')
+
+        indices = self._getSelectionIndices(selection)
+        aligned = align is not False and align is not None
+        read, select, fit = indices, None, None
+        if aligned:
+            if self._coords is None:
+                raise ValueError('reference coordinates are not set')
+            if align is not True:
+                # read both yielded and fitted atoms and locate them
+                fit = self._getSelectionIndices(align)
+                if indices is not None:
+                    read = np.union1d(indices, fit)
+                    if len(read) != len(indices) or (read != indices).any():
+                        select = read.searchsorted(indices)
+                    fit = read.searchsorted(fit)
+            tar = self._coords if read is None else self._coords[read]
+            weights = self._weights
+            if weights is not None and read is not None:
+                weights = weights[read]
+            if fit is not None:
+                tar = tar[fit]
+                if weights is not None:
+                    weights = weights[fit]
+
+        n_read = self._n_atoms if read is None else len(read)
+        buffer = zeros((size, n_read, 3), dtype)
+        if select is not None:
+            output = zeros((size, len(select), 3), dtype)
+
+        n_csets = self._n_csets
+        start = self._nfi
+        while start < n_csets:
+            stop = min(start + size, n_csets)
+            chunk = buffer[:stop - start]
+            self._readChunk(start, stop, chunk, read)
+            self.goto(stop)
+            if aligned:
+                _superposeChunk(chunk, tar, fit, weights)
+            if select is not None:
+                chunk = np.take(chunk, select, 1, output[:stop - start])
+            yield chunk
+            start = stop
+
+    def getRMSDs(self, size=256, align=False):
+        """Returns root mean square deviations (RMSDs) of selected atoms from
+        the reference coordinates for all frames, calculated in chunks of
+        *size* frames.  When *align* is **True**, frames are superposed onto
+        the reference coordinates first.  If weights are set, weighted RMSDs
+        are returned.  Position of the trajectory does not change."""
+
+        if self._coords is None:
+            raise ValueError('reference coordinates are not set')
+        nfi = self._nfi
+        self.reset()
+        indices = self._indices
+        ref = self._coords if indices is None else self._coords[indices]
+        weights = self._weights
+        if weights is not None and indices is not None:
+            weights = weights[indices]
+        rmsds = zeros(self._n_csets)
+        try:
+            start = 0
+            for chunk in self.iterChunks(size, align=align):
+                chunk -= ref
+                chunk **= 2
+                if weights is None:
+                    msd = chunk.sum((1, 2)) / len(ref)
+                else:
+                    msd = np.einsum('kij,i->k', chunk,
+                                    weights[:, 0]) / weights.sum()
+                rmsds[start:start + len(chunk)] = msd
+                start += len(chunk)
+        finally:
+            self.goto(nfi)
+        return rmsds ** 0.5
+
+    def _readChunk(self, start, stop, out, indices=None):
+        """Read coordinate sets from *start* to *stop* into *out* for atoms
+        with given *indices* or for all atoms, without changing the position
+        of the trajectory."""
+
+        if indices is None:
+            for i in range(start, stop):
+                self._readCoordset(i, out[i - start])
+        else:
+            xyz = zeros((self._n_atoms, 3), out.dtype)
+            for i in range(start, stop):
+                self._readCoordset(i, xyz)
+                np.take(xyz, indices, 0, out[i - start])
+
+    def prefetch(self, n_frames=32, workers=1):
+        """Read up to *n_frames* coordinate sets ahead of iteration using
+        *workers* background threads, so that reading and decompression of
+        upcoming frames overlap with calculations on the current frame.
+        Frames are returned as usual by :meth:`next` and :meth:`nextCoordset`,
+        so :meth:`.Frame.superpose` and updating a linked
+        :class:`.AtomGroup` work the same way.  Pass ``n_frames=0`` to stop
+        reading ahead, which also happens when the trajectory is closed."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+        n_frames = int(n_frames)
+        if n_frames > 0:
+            workers = int(workers)
+            if workers < 1:
+                raise ValueError('workers must be a positive integer')
+            self._prefetcher = _Prefetcher(self, n_frames, workers)
+
+    def _readCoordset(self, index, out):
+        """Read coordinate set at *index* for all atoms into *out* without
+        changing the position of the trajectory.  This method is called from
+        prefetching threads."""
+
+        pass
+
     def getCoordsets(self, indices=None):
         """Returns coordinate sets at given *indices*. *indices* may be an
         integer, a list of ordered integers or **None**. **None** returns all
@@ -2,17 +2,33 @@
 """This module defines a class for handling multiple trajectories."""
 
 import os.path
+import json
+import threading
+from zlib import crc32
 
 import numpy as np
 from numbers import Integral
 
-from .trajbase import TrajBase
+from prody import LOGGER
+
+from .trajbase import TrajBase, _PrefetchView
 from .frame import Frame
 
 from prody.trajectory import openTrajFile
+from prody.utilities import relpath
 
 __all__ = ['Trajectory']
 
+INDEX_VERSION = 1
+
+
+def _checksum(filename, size=4096):
+    """Returns CRC32 checksum of the first *size* bytes of *filename*."""
+
+    with open(filename, 'rb') as inp:
+        return crc32(inp.read(size)) & 0xffffffff
+
+
 class Trajectory(TrajBase):
 
     """A class for handling trajectories in multiple files."""
@@ -20,18 +36,27 @@ class Trajectory(TrajBase):
     def __init__(self, name, **kwargs):
         """Trajectory can be instantiated with a *name* or a filename. When
         name is a valid path to a trajectory file it will be opened for
-        reading."""
+        reading.  When it is an index file saved using :meth:`saveIndex`,
+        files in the index will be added to the trajectory."""
 
         TrajBase.__init__(self, name)
         self._trajectory = None
         self._trajectories = []
         self._filenames = set()
+        self._paths = []
+        self._headers = []
+        self._index = None
+        self._bounds = np.zeros(1, np.int64)
         self._n_files = 0
         self._cfi = 0 # current file index
+        self._lock = threading.Lock()
         assert 'mode' not in kwargs, 'mode is an invalid keyword argument'
         self._kwargs = kwargs
         if os.path.isfile(name):
-            self.addFile(name)
+            if name.endswith('.npz'):
+                self.loadIndex(name)
+            else:
+                self.addFile(name)
 
     def __repr__(self):
 
@@ -57,11 +82,53 @@ class Trajectory(TrajBase):
         return '<Trajectory: {0} ({1}{2}{3}{4})>'.format(
                                         self._title, link, files, next, atoms)
 
+    def _getFile(self, i):
+        """Returns file at index *i*, files added from an index are opened
+        when they are first accessed."""
+
+        traj = self._trajectories[i]
+        if traj is None:
+            with self._lock:
+                traj = self._trajectories[i]
+                if traj is None:
+                    filename = self._paths[i]
+                    header = self._headers[i]
+                    if _checksum(filename) != header['checksum']:
+                        raise IOError('{0} has changed since the index was '
+                                      'saved'.format(filename))
+                    arrays = dict((key,
+                                   self._index['file{0}_{1}'.format(i, key)])
+                                  for key in header['arrays'])
+                    traj = openTrajFile(filename,
+                                        index=(header['file'], arrays),
+                                        **self._kwargs)
+                    self._setupFile(traj, i)
+                    self._trajectories[i] = traj
+        return traj
+
+    def _setupFile(self, traj, i):
+
+        if self._ag is not None:
+            traj.link(self._ag)
+        if self._atoms is not None:
+            traj.setAtoms(self._atoms)
+        if self._prefetcher is not None:
+            traj._prefetcher = _PrefetchView(self._prefetcher,
+                                             int(self._bounds[i]))
+
+    def _getFileAttrs(self, attr):
+        """Returns *attr* of files, without opening files added from an
+        index."""
+
+        return [getattr(traj, attr) if traj is not None
+                else self._headers[i]['file'][attr]
+                for i, traj in enumerate(self._trajectories)]
+
     def _nextFile(self):
 
         self._cfi += 1
         if self._cfi < self._n_files:
-            self._trajectory = self._trajectories[self._cfi]
+            self._trajectory = self._getFile(self._cfi)
             if self._trajectory.nextIndex() > 0:
                 self._trajectory.reset()
 
@@ -69,14 +136,15 @@ class Trajectory(TrajBase):
 
         if i < self._n_files:
             self._cfi = i
-            self._trajectory = self._trajectories[i]
+            self._trajectory = self._getFile(i)
             if self._trajectory.nextIndex() > 0:
                 self._trajectory.reset()
 
     def setAtoms(self, atoms):
 
         for traj in self._trajectories:
-            traj.setAtoms(atoms)
+            if traj is not None:
+                traj.setAtoms(atoms)
         TrajBase.setAtoms(self, atoms)
 
     setAtoms.__doc__ = TrajBase.setAtoms.__doc__
@@ -86,15 +154,16 @@ class Trajectory(TrajBase):
         if ag:
             TrajBase.link(self, *ag)
             for traj in self._trajectories:
-                traj.link(*ag)
+                if traj is not None:
+                    traj.link(*ag)
         else:
             return self._ag
 
     link.__doc__ = TrajBase.link.__doc__
 
     def addFile(self, filename, **kwargs):
-        """Add a file to the trajectory instance. Currently only DCD files
-        are supported."""
+        """Add a file to the trajectory instance. DCD, XTC, and TRR files
+        are supported and may be mixed."""
 
         if not isinstance(filename, str):
             raise ValueError('filename must be a string')
@@ -115,10 +184,124 @@ class Trajectory(TrajBase):
             self._n_atoms = traj.numAtoms()
             self._coords = traj._coords
         self._trajectories.append(traj)
+        self._filenames.add(os.path.abspath(filename))
+        self._paths.append(os.path.abspath(filename))
+        self._headers.append(None)
         self._n_csets += traj.numFrames()
+        self._bounds = np.append(self._bounds, self._n_csets)
         self._n_files += 1
-        if self._ag is not None:
-            traj.setAtoms(self._ag)
+        self._setupFile(traj, self._n_files - 1)
+        if self._prefetcher is not None:
+            self.prefetch(len(self._prefetcher._buffer),
+                          self._prefetcher._workers)
+
+    def saveIndex(self, filename=None):
+        """Save an index of trajectory files into *filename* (default is
+        the name of the first file with :file:`.index.npz` extension) and
+        return the filename.  The index contains file boundaries, header data
+        and byte offsets of frames, box vectors of XTC and TRR frames, and
+        sizes and checksums of files.  A trajectory instantiated with the
+        index file, e.g. ``Trajectory('traj.index.npz')``, opens files only
+        when their frames are accessed, and finds the file containing a frame
+        without walking the file list."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if not self._n_files:
+            raise ValueError('trajectory does not have any files')
+        if filename is None:
+            filename = self._paths[0] + '.index.npz'
+        elif not filename.endswith('.npz'):
+            filename += '.npz'
+
+        data = {}
+        headers = []
+        for i, path in enumerate(self._paths):
+            if self._trajectories[i] is None:
+                header = self._headers[i]
+                for key in header['arrays']:
+                    key = 'file{0}_{1}'.format(i, key)
+                    data[key] = self._index[key]
+            else:
+                traj = self._trajectories[i]
+                file_header, arrays = traj._getIndex()
+                header = {'size': os.path.getsize(path),
+                          'checksum': _checksum(path),
+                          'file': file_header,
+                          'arrays': sorted(arrays)}
+                for key, array in arrays.items():
+                    data['file{0}_{1}'.format(i, key)] = array
+            headers.append(header)
+
+        info = {'version': INDEX_VERSION, 'title': self._title,
+                'filenames': self._paths, 'headers': headers}
+        data['info'] = np.array(json.dumps(info).encode())
+        data['bounds'] = self._bounds
+        data['coords'] = self._coords
+        np.savez(filename, **data)
+        return filename
+
+    def loadIndex(self, filename):
+        """Add files in an index file saved using :meth:`saveIndex`.  Files
+        are not opened until their frames are accessed.  If sizes of files
+        do not match the index, or the trajectory already has files, files
+        are parsed."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        index = np.load(filename)
+        info = json.loads(index['info'].item().decode())
+        if info['version'] != INDEX_VERSION:
+            raise IOError('{0} is not a supported trajectory index'
+                          .format(filename))
+
+        paths = info['filenames']
+        headers = info['headers']
+        for path in paths:
+            if path in self._filenames:
+                raise IOError('{0} is already added to the trajectory'
+                              .format(path))
+        for path, header in zip(paths, headers):
+            if (not os.path.isfile(path) or
+                    os.path.getsize(path) != header['size']):
+                LOGGER.warning('{0} does not match the index {1}, files will '
+                               'be parsed.'.format(path, filename))
+                for each in paths:
+                    self.addFile(each)
+                return
+
+        n_atoms = headers[0]['file']['_n_atoms']
+        if any(header['file']['_n_atoms'] != n_atoms for header in headers):
+            raise IOError('files in {0} have different number of atoms'
+                          .format(filename))
+        if self._n_files == 0:
+            self._title = info['title']
+            self._n_atoms = n_atoms
+            self._coords = index['coords']
+        elif n_atoms != self._n_atoms:
+            raise IOError('files in {0} must have same number of atoms as '
+                          'previously loaded files'.format(filename))
+
+        # indexed files are numbered from zero, so they can be looked up
+        # only when the index is loaded into an empty trajectory
+        if self._n_files:
+            LOGGER.warning('Index {0} is not used, because the trajectory '
+                           'already has files, files will be parsed.'
+                           .format(filename))
+            for path in paths:
+                self.addFile(path)
+            return
+
+        self._index = index
+        self._paths = list(paths)
+        self._headers = headers
+        self._filenames.update(paths)
+        self._trajectories = [None] * len(paths)
+        self._bounds = np.asarray(index['bounds'], np.int64)
+        self._n_csets = int(self._bounds[-1])
+        self._n_files = len(paths)
+        self._cfi = 0
+        self._trajectory = self._getFile(0)
 
     def numFiles(self):
         """Returns number of open trajectory files."""
@@ -128,7 +311,49 @@ class Trajectory(TrajBase):
     def getFilenames(self, absolute=False):
         """Returns list of filenames opened for reading."""
 
-        return [traj.getFilename(absolute) for traj in self._trajectories]
+        if absolute:
+            return list(self._paths)
+        return [relpath(path) for path in self._paths]
+
+    @property
+    def _dtype(self):
+
+        return self._getFile(0)._dtype
+
+    def prefetch(self, n_frames=32, workers=1):
+
+        TrajBase.prefetch(self, n_frames, workers)
+        for i, traj in enumerate(self._trajectories):
+            if traj is not None:
+                if traj._prefetcher is not None:
+                    traj._prefetcher.close()
+                    traj._prefetcher = None
+                if self._prefetcher is not None:
+                    traj._prefetcher = _PrefetchView(self._prefetcher,
+                                                     int(self._bounds[i]))
+
+    prefetch.__doc__ = TrajBase.prefetch.__doc__
+
+    def _readCoordset(self, index, out):
+
+        i = int(self._bounds.searchsorted(index, 'right')) - 1
+        self._getFile(i)._readCoordset(int(index - self._bounds[i]), out)
+
+    _readCoordset.__doc__ = TrajBase._readCoordset.__doc__
+
+    def _readChunk(self, start, stop, out, indices=None):
+
+        bounds = self._bounds
+        first = int(bounds.searchsorted(start, 'right')) - 1
+        last = int(bounds.searchsorted(stop, 'left')) - 1
+        for i in range(first, last + 1):
+            lo = max(start, bounds[i])
+            hi = min(stop, bounds[i + 1])
+            self._getFile(i)._readChunk(int(lo - bounds[i]),
+                                        int(hi - bounds[i]),
+                                        out[lo - start:hi - start], indices)
+
+    _readChunk.__doc__ = TrajBase._readChunk.__doc__
 
     def getFrame(self, index):
 
@@ -143,7 +368,7 @@ class Trajectory(TrajBase):
             raise ValueError('I/O operation on closed file')
         if indices is None:
             indices = np.arange(self._n_csets)
-        elif isinstance(indices, int):
+        elif isinstance(indices, Integral):
             indices = np.array([indices])
         elif isinstance(indices, slice):
             indices = np.arange(*indices.indices(self._n_csets))
@@ -154,19 +379,13 @@ class Trajectory(TrajBase):
             raise TypeError('indices must be an integer or a list of '
                             'integers')
 
-        nfi = self._nfi
-        self.reset()
-        coords = np.zeros((len(indices), self.numSelected(), 3),
-                          self._trajectories[0]._dtype)
-        prev = -1
-        next = self.nextCoordset
-        for i, index in enumerate(indices):
-            diff = index - prev
-            if diff > 1:
-                self.skip(diff - 1)
-            coords[i] = next()
-            prev = index
-        self.goto(nfi)
+        coords = np.zeros((len(indices), self.numSelected(), 3), self._dtype)
+        which = self._bounds.searchsorted(indices, 'right') - 1
+        for i in np.unique(which):
+            selected = which == i
+            traj = self._getFile(i)
+            coords[selected] = traj.getCoordsets(indices[selected] -
+                                                 self._bounds[i])
         return coords
 
     getCoordsets.__doc__ = TrajBase.getCoordsets.__doc__
@@ -231,14 +450,10 @@ class Trajectory(TrajBase):
                 n = 0
             elif n > n_csets:
                 n = n_csets
-            nfi = n
-            for which, traj in enumerate(self._trajectories):
-                if traj._n_csets >= nfi:
-                    break
-                else:
-                    nfi -= traj._n_csets
+            which = min(int(self._bounds.searchsorted(n, 'right')) - 1,
+                        self._n_files - 1)
             self._gotoFile(which)
-            self._trajectory.goto(nfi)
+            self._trajectory.goto(int(n - self._bounds[which]))
             self._nfi = n
 
     goto.__doc__ = TrajBase.goto.__doc__
@@ -249,17 +464,8 @@ class Trajectory(TrajBase):
             raise ValueError('I/O operation on closed file')
         if not isinstance(n, Integral):
             raise ValueError('n must be an integer')
-        left = self._n_csets - self._nfi
-        if n > left:
-            n = left
-        while self._nfi < self._n_csets and n > 0:
-            traj = self._trajectory
-            skip = min(n, traj.numFrames() - traj.nextIndex())
-            traj.skip(skip)
-            if n > skip:
-                self._nextFile()
-            self._nfi += skip
-            n -= skip
+        if n > 0:
+            self.goto(min(self._nfi + n, self._n_csets))
 
     skip.__doc__ = TrajBase.skip.__doc__
 
@@ -269,8 +475,9 @@ class Trajectory(TrajBase):
             raise ValueError('I/O operation on closed file')
         if self._trajectories:
             for traj in self._trajectories:
-                traj.reset()
-            self._trajectory = self._trajectories[0]
+                if traj is not None:
+                    traj.reset()
+            self._trajectory = self._getFile(0)
             self._cfi = 0
             self._nfi = 0
 
@@ -278,35 +485,40 @@ class Trajectory(TrajBase):
 
     def close(self):
 
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
         for traj in self._trajectories:
-            traj.close()
+            if traj is not None:
+                traj.close()
+        self._index = None
         self._closed = True
 
     close.__doc__ = TrajBase.close.__doc__
 
     def hasUnitcell(self):
 
-        return np.all([traj.hasUnitcell() for traj in self._trajectories])
+        return np.all(self._getFileAttrs('_unitcell'))
 
     hasUnitcell.__doc__ = TrajBase.hasUnitcell.__doc__
 
     def getTimestep(self):
         """Returns list of timestep sizes, one number from each file."""
 
-        return [traj.getTimestep() for traj in self._trajectories]
+        return self._getFileAttrs('_timestep')
 
     def getFirstTimestep(self):
         """Returns list of first timestep values, one number from each file."""
 
-        return [traj.getFirstTimestep() for traj in self._trajectories]
+        return self._getFileAttrs('_first_ts')
 
     def getFrameFreq(self):
         """Returns list of timesteps between frames, one number from each file.
         """
 
-        return [traj.getFrameFreq() for traj in self._trajectories]
+        return self._getFileAttrs('_framefreq')
 
     def numFixed(self):
         """Returns a list of fixed atom numbers, one from each file."""
 
-        return [traj.numFixed() for traj in self._trajectories]
+        return self._getFileAttrs('_n_fixed')
@@ -18,7 +18,9 @@ class TrajFile(TrajBase):
 
     """A base class for trajectory file classes:
 
-      * :class:`.DCDFile`"""
+      * :class:`.DCDFile`
+      * :class:`.XTCFile`
+      * :class:`.TRRFile`"""
 
 
     def __init__(self, filename, mode='r'):
@@ -59,6 +61,26 @@ class TrajFile(TrajBase):
         self._framefreq = 1
         self._n_fixed = 0
 
+    def _getIndex(self):
+        """Returns a dictionary of header values and a dictionary of per-frame
+        arrays, using which the file can be opened without being parsed.
+        Header values must be serializable in JSON format."""
+
+        header = {'_n_atoms': int(self._n_atoms),
+                  '_n_csets': int(self._n_csets),
+                  '_timestep': float(self._timestep),
+                  '_first_ts': int(self._first_ts),
+                  '_framefreq': int(self._framefreq),
+                  '_n_fixed': int(self._n_fixed)}
+        return header, {}
+
+    def _setIndex(self, header, arrays):
+        """Set header values and per-frame arrays returned by
+        :meth:`_getIndex`."""
+
+        for attr, value in header.items():
+            setattr(self, attr, value)
+
     def __del__(self):
 
         if self._file is not None:
@@ -207,6 +229,9 @@ class TrajFile(TrajBase):
 
     def close(self):
 
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
         self._file.close()
         self._nfi = 0
         self._closed = True
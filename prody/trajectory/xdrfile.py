@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""This module defines classes for reading GROMACS trajectory files in
+`XTC format`_ and `TRR format`_.
+
+.. _XTC format: https://manual.gromacs.org/current/reference-manual/file-formats.html#xtc
+.. _TRR format: https://manual.gromacs.org/current/reference-manual/file-formats.html#trr"""
+
+from numbers import Integral
+from struct import unpack_from
+
+import numpy as np
+
+from prody import LOGGER
+
+from .frame import Frame
+from .trajbase import TrajBase
+from .trajfile import TrajFile
+
+__all__ = ['XTCFile', 'TRRFile']
+
+XTC_MAGIC = 1995
+TRR_MAGIC = 1993
+
+# coordinates are stored in nanometers
+NM2A = 10.
+
+
+def _boxToUnitcell(box):
+    """Returns unit cell lengths and angles for box vectors in rows of
+    *box*."""
+
+    lengths = np.sqrt((box ** 2).sum(1))
+    unitcell = np.zeros(6)
+    unitcell[:3] = lengths
+    for i, (j, k) in enumerate([(1, 2), (0, 2), (0, 1)]):
+        if lengths[j] and lengths[k]:
+            cosine = np.dot(box[j], box[k]) / (lengths[j] * lengths[k])
+            unitcell[3 + i] = np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+        else:
+            unitcell[3 + i] = 90.
+    return unitcell
+
+
+class XDRFile(TrajFile):
+
+    """A base class for reading trajectory files in XDR format.  Files are
+    memory mapped and byte offsets of frames are indexed at instantiation,
+    so that frames can be accessed in any order without reading preceding
+    frames.  Coordinates from the first frame is set as the reference
+    coordinate set and are converted to Å.  32-bit floating-point coordinate
+    array can be casted automatically to a specified type, such as 64-bit
+    float, using *astype* keyword argument, i.e. ``astype=float``."""
+
+    def __init__(self, filename, mode='r', **kwargs):
+
+        if mode not in ('r', 'rb'):
+            self._file = None
+            raise IOError('{0} files can only be opened for reading'
+                          .format(self.__class__.__name__[:3]))
+        TrajFile.__init__(self, filename, mode)
+        self._astype = kwargs.get('astype', None)
+        self._map = None
+        self._offsets = np.zeros(0, np.int64)
+        self._boxes = np.zeros((0, 3, 3))
+        self._steps = np.zeros(0, np.int64)
+        self._times = np.zeros(0)
+        self._unitcell = False
+        index = kwargs.get('index', None)
+        if index is None:
+            self._parseIndex()
+        else:
+            self._setIndex(*index)
+
+    __init__.__doc__ = TrajFile.__init__.__doc__
+
+    def _parseIndex(self):
+        """Map the file to memory and index frames."""
+
+        size = self._file.seek(0, 2)
+        self._file.seek(0)
+        if size == 0:
+            return
+        self._map = np.memmap(self._filename, np.uint8, 'r')
+
+        offsets = []
+        boxes = []
+        steps = []
+        times = []
+        pos = 0
+        while pos < size:
+            try:
+                n_atoms, offset, end, step, time, box = self._parseFrame(pos)
+            except Exception:
+                LOGGER.warning('{0} is corrupt, {1} frames were indexed.'
+                               .format(self._filename, len(offsets)))
+                break
+            if end > size:
+                LOGGER.warning('{0} is truncated, {1} frames were indexed.'
+                               .format(self._filename, len(offsets)))
+                break
+            if self._n_atoms == 0:
+                self._n_atoms = n_atoms
+            elif n_atoms != self._n_atoms:
+                raise IOError('number of atoms in frames of {0} do not match'
+                              .format(self._filename))
+            if offset is not None:
+                offsets.append(offset)
+                boxes.append(box)
+                steps.append(step)
+                times.append(time)
+            pos = end
+
+        self._n_csets = len(offsets)
+        if not self._n_csets:
+            return
+        self._offsets = np.array(offsets, np.int64)
+        self._boxes = np.array(boxes, float).reshape((-1, 3, 3)) * NM2A
+        self._steps = np.array(steps, np.int64)
+        self._times = np.array(times, float)
+        self._unitcell = bool(self._boxes.any())
+
+        self._first_ts = int(self._steps[0])
+        if self._n_csets > 1:
+            self._framefreq = int(self._steps[1] - self._steps[0])
+            self._timestep = float(self._times[1] - self._times[0])
+            if self._framefreq:
+                self._timestep /= self._framefreq
+
+        self._coords = self.nextCoordset()
+        self._nfi = 0
+
+    def _getIndex(self):
+
+        header, arrays = TrajFile._getIndex(self)
+        header['_unitcell'] = bool(self._unitcell)
+        arrays.update({'offsets': self._offsets, 'boxes': self._boxes,
+                       'steps': self._steps, 'times': self._times})
+        return header, arrays
+
+    def _setIndex(self, header, arrays):
+
+        TrajFile._setIndex(self, header, arrays)
+        self._offsets = np.asarray(arrays['offsets'], np.int64)
+        self._boxes = np.asarray(arrays['boxes'], float)
+        self._steps = np.asarray(arrays['steps'], np.int64)
+        self._times = np.asarray(arrays['times'], float)
+        if self._n_csets:
+            self._map = np.memmap(self._filename, np.uint8, 'r')
+            self._coords = self.nextCoordset()
+            self._nfi = 0
+
+    _getIndex.__doc__ = TrajFile._getIndex.__doc__
+    _setIndex.__doc__ = TrajFile._setIndex.__doc__
+
+    def _parseFrame(self, pos):
+        """Returns number of atoms, offset of coordinates (**None** if frame
+        has no coordinates), end position, step, time, and box vectors of the
+        frame starting at *pos*."""
+
+        pass
+
+    def _readCoordsets(self, indices, coords=None):
+        """Returns coordinate sets at *indices* in Å as a float32 array, which
+        is allocated unless *coords* is given."""
+
+        pass
+
+    def _readCoordset(self, index, out):
+
+        if out.dtype == np.float32:
+            self._readCoordsets(np.array([index]), out[np.newaxis])
+        else:
+            out[:] = self._readCoordsets(np.array([index]))[0]
+
+    _readCoordset.__doc__ = TrajBase._readCoordset.__doc__
+
+    def _readChunk(self, start, stop, out, indices=None):
+
+        if indices is None and out.dtype == np.float32:
+            self._readCoordsets(np.arange(start, stop), out)
+        else:
+            coords = self._readCoordsets(np.arange(start, stop))
+            out[:] = coords if indices is None else coords[:, indices]
+
+    _readChunk.__doc__ = TrajBase._readChunk.__doc__
+
+    def hasUnitcell(self):
+
+        return self._unitcell
+
+    hasUnitcell.__doc__ = TrajBase.hasUnitcell.__doc__
+
+    def getTimes(self):
+        """Returns simulation times of frames in ps."""
+
+        return self._times.copy()
+
+    def getSteps(self):
+        """Returns simulation steps of frames."""
+
+        return self._steps.copy()
+
+    def __next__(self):
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        nfi = self._nfi
+        if nfi < self._n_csets:
+            unitcell = self._nextUnitcell()
+            coords = self._nextCoordset()
+            if self._ag is None:
+                frame = Frame(self, nfi, coords, unitcell)
+            else:
+                frame = self._frame
+                Frame.__init__(frame, self, nfi, None, unitcell)
+            return frame
+
+    __next__.__doc__ = TrajBase.__next__.__doc__
+    next = __next__
+
+    def nextCoordset(self):
+        """Returns next coordinate set."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if self._nfi < self._n_csets:
+            if self._indices is None:
+                return self._nextCoordset()
+            else:
+                return self._nextCoordset()[self._indices]
+
+    def _nextCoordset(self):
+
+        if self._nfi >= self._n_csets:
+            return None
+        if self._prefetcher is None:
+            xyz = self._readCoordsets(np.array([self._nfi]))[0]
+        else:
+            xyz = self._prefetcher.get(self._nfi)
+        if self._ag is not None:
+            self._ag._setCoords(xyz, self._title + ' frame ' + str(self._nfi),
+                                overwrite=True)
+        self._nfi += 1
+        if self._astype is not None and self._astype != xyz.dtype:
+            xyz = xyz.astype(self._astype)
+        return xyz
+
+    def _nextUnitcell(self):
+
+        if self._unitcell:
+            return _boxToUnitcell(self._boxes[self._nfi])
+
+    def getCoordsets(self, indices=None):
+        """Returns coordinate sets at given *indices*. *indices* may be an
+        integer, a slice, a list of integers or **None**. **None** returns all
+        coordinate sets.  Only frames at *indices* are read from the file."""
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if indices is None:
+            indices = np.arange(self._n_csets)
+        elif isinstance(indices, Integral):
+            indices = np.array([indices])
+        elif isinstance(indices, slice):
+            indices = np.arange(*indices.indices(self._n_csets))
+            indices.sort()
+        elif isinstance(indices, (list, np.ndarray)):
+            indices = np.unique(indices)
+        else:
+            raise TypeError('indices must be an integer or a list of integers')
+
+        coords = self._readCoordsets(indices)
+        if self._indices is not None:
+            coords = coords[:, self._indices]
+        if self._astype is not None and self._astype != coords.dtype:
+            coords = coords.astype(self._astype)
+        return coords
+
+    def skip(self, n):
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if not isinstance(n, Integral):
+            raise ValueError('n must be an integer')
+        if n > 0:
+            self._nfi = min(self._nfi + n, self._n_csets)
+
+    skip.__doc__ = TrajBase.skip.__doc__
+
+    def goto(self, n):
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        if not isinstance(n, Integral):
+            raise ValueError('n must be an integer')
+        n_csets = self._n_csets
+        if n < 0:
+            n = n_csets + n
+        self._nfi = min(max(n, 0), n_csets)
+
+    goto.__doc__ = TrajBase.goto.__doc__
+
+    def reset(self):
+
+        if self._closed:
+            raise ValueError('I/O operation on closed file')
+        self._nfi = 0
+
+    reset.__doc__ = TrajBase.reset.__doc__
+
+    def close(self):
+
+        self._map = None
+        TrajFile.close(self)
+
+    close.__doc__ = TrajBase.close.__doc__
+
+
+class XTCFile(XDRFile):
+
+    """A class for reading compressed GROMACS trajectory files in XTC format.
+    Coordinates are decompressed using a C extension that processes batches
+    of frames, e.g. when :meth:`getCoordsets` is called, in a single call."""
+
+    def _parseFrame(self, pos):
+
+        magic, n_atoms, step, time = unpack_from('>iiif', self._map, pos)
+        if magic != XTC_MAGIC:
+            raise IOError('not an XTC frame')
+        box = unpack_from('>9f', self._map, pos + 16)
+        offset = pos + 52
+        if n_atoms <= 9:
+            end = offset + 4 + 12 * n_atoms
+        else:
+            n_bytes = unpack_from('>i', self._map, offset + 36)[0]
+            end = offset + 40 + (n_bytes + 3) // 4 * 4
+        return n_atoms, offset, end, step, time, box
+
+    def _readCoordsets(self, indices, coords=None):
+
+        from .xdrtools import decompressXTC
+
+        offsets = np.ascontiguousarray(self._offsets[indices])
+        if coords is None:
+            coords = np.zeros((len(offsets), self._n_atoms, 3), np.float32)
+        decompressXTC(self._map, offsets, coords)
+        coords *= NM2A
+        return coords
+
+
+class TRRFile(XDRFile):
+
+    """A class for reading GROMACS trajectory files in TRR format.  Only frames
+    that contain coordinates are indexed, frames with velocities or forces
+    only are skipped."""
+
+    def _getIndex(self):
+
+        header, arrays = XDRFile._getIndex(self)
+        header['_precision'] = getattr(self, '_precision', 4)
+        return header, arrays
+
+    _getIndex.__doc__ = TrajFile._getIndex.__doc__
+
+    def _parseFrame(self, pos):
+
+        data = self._map
+        magic, _, n_chars = unpack_from('>iii', data, pos)
+        if magic != TRR_MAGIC:
+            raise IOError('not a TRR frame')
+        pos += 12 + (n_chars + 3) // 4 * 4
+        sizes = unpack_from('>13i', data, pos)
+        (ir_size, e_size, box_size, vir_size, pres_size, top_size, sym_size,
+         x_size, v_size, f_size, n_atoms, step, _) = sizes
+        if box_size:
+            precision = box_size // 9
+        else:
+            precision = max(x_size, v_size, f_size) // (n_atoms * 3)
+        if precision not in (4, 8):
+            raise IOError('unrecognized TRR precision')
+        real = '>f' if precision == 4 else '>d'
+        pos += 52
+        time = unpack_from(real, data, pos)[0]
+        pos += 2 * precision + ir_size + e_size
+        if box_size:
+            box = unpack_from('>9' + real[1], data, pos)
+        else:
+            box = (0,) * 9
+        pos += box_size + vir_size + pres_size + top_size + sym_size
+        offset = pos if x_size else None
+        end = pos + x_size + v_size + f_size
+        if x_size:
+            self._precision = precision
+        return n_atoms, offset, end, step, time, box
+
+    def _readCoordsets(self, indices, coords=None):
+
+        dtype = '>f4' if self._precision == 4 else '>f8'
+        n_atoms = self._n_atoms
+        if coords is None:
+            coords = np.zeros((len(indices), n_atoms, 3), np.float32)
+        for i, offset in enumerate(self._offsets[indices]):
+            coords[i] = np.ndarray((n_atoms, 3), dtype, self._map, offset)
+        coords *= NM2A
+        return coords
@@ -0,0 +1,399 @@
+#include "Python.h"
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include "numpy/arrayobject.h"
+#include <string.h>
+
+/* Decompression of coordinates in GROMACS XTC files.  Coordinates are
+   stored as integers (coordinates times precision) and packed into bit
+   streams, small differences between consecutive atoms are packed using
+   fewer bits.  Sizes used for packing are listed in magicints. */
+
+static const int magicints[] = {
+    0, 0, 0, 0, 0, 0, 0, 0, 0,
+    8, 10, 12, 16, 20, 25, 32, 40, 50, 64,
+    80, 101, 128, 161, 203, 256, 322, 406, 512, 645,
+    812, 1024, 1290, 1625, 2048, 2580, 3250, 4096, 5060, 6501,
+    8192, 10321, 13003, 16384, 20642, 26007, 32768, 41285, 52015, 65536,
+    82570, 104031, 131072, 165140, 208063, 262144, 330280, 416127,
+    524287, 660561, 832255, 1048576, 1321122, 1664510, 2097152, 2642245,
+    3329021, 4194304, 5284491, 6658042, 8388607, 10568983, 13316085,
+    16777216};
+
+#define FIRSTIDX 9
+#define LASTIDX (int) (sizeof(magicints) / sizeof(*magicints))
+
+/* state of a bit stream */
+typedef struct {
+    const unsigned char *data;
+    long size;
+    long cnt;
+    unsigned int lastbits;
+    unsigned int lastbyte;
+    int error;
+} bitstream;
+
+
+static int readInt(const unsigned char *data) {
+
+    /* XDR integers are big-endian */
+    return (int) (((unsigned int) data[0] << 24) |
+                  ((unsigned int) data[1] << 16) |
+                  ((unsigned int) data[2] << 8) | (unsigned int) data[3]);
+}
+
+
+static float readFloat(const unsigned char *data) {
+
+    unsigned int bits = (unsigned int) readInt(data);
+    float value;
+    memcpy(&value, &bits, sizeof(value));
+    return value;
+}
+
+
+static int sizeofint(int size) {
+
+    unsigned int num = 1;
+    int num_of_bits = 0;
+
+    while (size >= (int) num && num_of_bits < 32) {
+        num_of_bits++;
+        num <<= 1;
+    }
+    return num_of_bits;
+}
+
+
+static int sizeofints(int num_of_ints, unsigned int sizes[]) {
+
+    int i;
+    unsigned int num, num_of_bytes, num_of_bits, bytes[32], bytecnt, tmp;
+
+    num_of_bytes = 1;
+    bytes[0] = 1;
+    num_of_bits = 0;
+    for (i = 0; i < num_of_ints; i++) {
+        tmp = 0;
+        for (bytecnt = 0; bytecnt < num_of_bytes; bytecnt++) {
+            tmp = bytes[bytecnt] * sizes[i] + tmp;
+            bytes[bytecnt] = tmp & 0xff;
+            tmp >>= 8;
+        }
+        while (tmp != 0) {
+            bytes[bytecnt++] = tmp & 0xff;
+            tmp >>= 8;
+        }
+        num_of_bytes = bytecnt;
+    }
+    num = 1;
+    num_of_bytes--;
+    while (bytes[num_of_bytes] >= num) {
+        num_of_bits++;
+        num *= 2;
+    }
+    return num_of_bits + num_of_bytes * 8;
+}
+
+
+static int receivebits(bitstream *buf, int num_of_bits) {
+
+    int num = 0, mask = (1 << num_of_bits) - 1;
+    unsigned int lastbits = buf->lastbits, lastbyte = buf->lastbyte;
+    long cnt = buf->cnt;
+
+    while (num_of_bits >= 8) {
+        if (cnt >= buf->size) {
+            buf->error = 1;
+            return 0;
+        }
+        lastbyte = (lastbyte << 8) | buf->data[cnt++];
+        num |= (lastbyte >> lastbits) << (num_of_bits - 8);
+        num_of_bits -= 8;
+    }
+    if (num_of_bits > 0) {
+        if ((int) lastbits < num_of_bits) {
+            if (cnt >= buf->size) {
+                buf->error = 1;
+                return 0;
+            }
+            lastbits += 8;
+            lastbyte = (lastbyte << 8) | buf->data[cnt++];
+        }
+        lastbits -= num_of_bits;
+        num |= (lastbyte >> lastbits) & ((1 << num_of_bits) - 1);
+    }
+    buf->cnt = cnt;
+    buf->lastbits = lastbits;
+    buf->lastbyte = lastbyte;
+    return num & mask;
+}
+
+
+static void receiveints(bitstream *buf, int num_of_bits, unsigned int sizes[],
+                        int nums[]) {
+
+    int bytes[32];
+    int i, j, num_of_bytes = 0, p, num;
+
+    bytes[1] = bytes[2] = bytes[3] = 0;
+    while (num_of_bits > 8) {
+        bytes[num_of_bytes++] = receivebits(buf, 8);
+        num_of_bits -= 8;
+    }
+    if (num_of_bits > 0)
+        bytes[num_of_bytes++] = receivebits(buf, num_of_bits);
+
+    for (i = 2; i > 0; i--) {
+        num = 0;
+        for (j = num_of_bytes - 1; j >= 0; j--) {
+            num = (num << 8) | bytes[j];
+            p = num / sizes[i];
+            bytes[j] = p;
+            num = num - p * sizes[i];
+        }
+        nums[i] = num;
+    }
+    nums[0] = bytes[0] | (bytes[1] << 8) | (bytes[2] << 16) | (bytes[3] << 24);
+}
+
+
+/* Decompress coordinates of *natoms* atoms starting at *data*, which points
+   to the atom count that precedes coordinates in a frame.  Returns 0 on
+   success. */
+
+static int decompress(const unsigned char *data, long size, int natoms,
+                      float *xyz) {
+
+    int minint[3], maxint[3], thiscoord[3], prevcoord[3];
+    unsigned int sizeint[3], sizesmall[3], bitsizeint[3];
+    int i, k, bitsize, smallidx, smaller, smallnum, flag, run, is_smaller;
+    int tmp;
+    long byte_cnt;
+    float precision, inv_precision;
+    bitstream buf;
+
+    if (size < 4 || readInt(data) != natoms)
+        return -1;
+
+    if (natoms <= 9) {
+        if (size < 4 + 12 * natoms)
+            return -1;
+        for (i = 0; i < natoms * 3; i++)
+            xyz[i] = readFloat(data + 4 + 4 * i);
+        return 0;
+    }
+
+    if (size < 44)
+        return -1;
+    precision = readFloat(data + 4);
+    for (i = 0; i < 3; i++) {
+        minint[i] = readInt(data + 8 + 4 * i);
+        maxint[i] = readInt(data + 20 + 4 * i);
+        sizeint[i] = maxint[i] - minint[i] + 1;
+    }
+    if ((sizeint[0] | sizeint[1] | sizeint[2]) > 0xffffff) {
+        for (i = 0; i < 3; i++)
+            bitsizeint[i] = sizeofint(sizeint[i]);
+        bitsize = 0;
+    } else {
+        bitsizeint[0] = bitsizeint[1] = bitsizeint[2] = 0;
+        bitsize = sizeofints(3, sizeint);
+    }
+
+    smallidx = readInt(data + 32);
+    if (smallidx < FIRSTIDX || smallidx >= LASTIDX)
+        return -1;
+    smaller = magicints[FIRSTIDX > smallidx - 1 ? FIRSTIDX : smallidx - 1] / 2;
+    smallnum = magicints[smallidx] / 2;
+    sizesmall[0] = sizesmall[1] = sizesmall[2] = magicints[smallidx];
+
+    byte_cnt = (unsigned int) readInt(data + 36);
+    if (byte_cnt > size - 40)
+        return -1;
+
+    buf.data = data + 40;
+    buf.size = byte_cnt;
+    buf.cnt = 0;
+    buf.lastbits = 0;
+    buf.lastbyte = 0;
+    buf.error = 0;
+
+    inv_precision = 1.0f / precision;
+    run = 0;
+    i = 0;
+    while (i < natoms) {
+        if (bitsize == 0) {
+            thiscoord[0] = receivebits(&buf, bitsizeint[0]);
+            thiscoord[1] = receivebits(&buf, bitsizeint[1]);
+            thiscoord[2] = receivebits(&buf, bitsizeint[2]);
+        } else {
+            receiveints(&buf, bitsize, sizeint, thiscoord);
+        }
+        i++;
+        for (k = 0; k < 3; k++) {
+            thiscoord[k] += minint[k];
+            prevcoord[k] = thiscoord[k];
+        }
+
+        flag = receivebits(&buf, 1);
+        is_smaller = 0;
+        if (flag == 1) {
+            run = receivebits(&buf, 5);
+            is_smaller = run % 3;
+            run -= is_smaller;
+            is_smaller--;
+        }
+        if (buf.error || i + run / 3 > natoms)
+            return -1;
+
+        if (run > 0) {
+            for (k = 0; k < run; k += 3) {
+                receiveints(&buf, smallidx, sizesmall, thiscoord);
+                i++;
+                thiscoord[0] += prevcoord[0] - smallnum;
+                thiscoord[1] += prevcoord[1] - smallnum;
+                thiscoord[2] += prevcoord[2] - smallnum;
+                if (k == 0) {
+                    /* first two atoms are interchanged for better
+                       compression of water molecules */
+                    tmp = thiscoord[0]; thiscoord[0] = prevcoord[0];
+                    prevcoord[0] = tmp;
+                    tmp = thiscoord[1]; thiscoord[1] = prevcoord[1];
+                    prevcoord[1] = tmp;
+                    tmp = thiscoord[2]; thiscoord[2] = prevcoord[2];
+                    prevcoord[2] = tmp;
+                    *xyz++ = prevcoord[0] * inv_precision;
+                    *xyz++ = prevcoord[1] * inv_precision;
+                    *xyz++ = prevcoord[2] * inv_precision;
+                } else {
+                    prevcoord[0] = thiscoord[0];
+                    prevcoord[1] = thiscoord[1];
+                    prevcoord[2] = thiscoord[2];
+                }
+                *xyz++ = thiscoord[0] * inv_precision;
+                *xyz++ = thiscoord[1] * inv_precision;
+                *xyz++ = thiscoord[2] * inv_precision;
+            }
+        } else {
+            *xyz++ = thiscoord[0] * inv_precision;
+            *xyz++ = thiscoord[1] * inv_precision;
+            *xyz++ = thiscoord[2] * inv_precision;
+        }
+        if (buf.error)
+            return -1;
+
+        smallidx += is_smaller;
+        if (smallidx < FIRSTIDX || smallidx >= LASTIDX)
+            return -1;
+        if (is_smaller < 0) {
+            smallnum = smaller;
+            if (smallidx > FIRSTIDX)
+                smaller = magicints[smallidx - 1] / 2;
+            else
+                smaller = 0;
+        } else if (is_smaller > 0) {
+            smaller = smallnum;
+            smallnum = magicints[smallidx] / 2;
+        }
+        sizesmall[0] = sizesmall[1] = sizesmall[2] = magicints[smallidx];
+    }
+    return 0;
+}
+
+
+static PyObject *decompressXTC(PyObject *self, PyObject *args,
+                               PyObject *kwargs) {
+
+    Py_buffer data;
+    PyArrayObject *offsets, *coords;
+    long i, n_frames, failed = -1;
+    int natoms;
+
+    static char *kwlist[] = {"data", "offsets", "coords", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "y*OO", kwlist,
+                                     &data, &offsets, &coords))
+        return NULL;
+
+    if (!PyArray_Check(offsets) || PyArray_TYPE(offsets) != NPY_INT64 ||
+        PyArray_NDIM(offsets) != 1 || !PyArray_ISCARRAY_RO(offsets)) {
+        PyBuffer_Release(&data);
+        PyErr_SetString(PyExc_TypeError,
+                        "offsets must be a contiguous int64 array");
+        return NULL;
+    }
+    if (!PyArray_Check(coords) || PyArray_TYPE(coords) != NPY_FLOAT32 ||
+        PyArray_NDIM(coords) != 3 || PyArray_DIMS(coords)[2] != 3 ||
+        !PyArray_ISCARRAY(coords) ||
+        PyArray_DIMS(coords)[0] != PyArray_DIMS(offsets)[0]) {
+        PyBuffer_Release(&data);
+        PyErr_SetString(PyExc_TypeError,
+                        "coords must be a contiguous float32 array with "
+                        "shape (len(offsets), n_atoms, 3)");
+        return NULL;
+    }
+
+    n_frames = PyArray_DIMS(offsets)[0];
+    natoms = (int) PyArray_DIMS(coords)[1];
+    const unsigned char *raw = (const unsigned char *) data.buf;
+    const npy_int64 *offset = (const npy_int64 *) PyArray_DATA(offsets);
+    float *xyz = (float *) PyArray_DATA(coords);
+
+    Py_BEGIN_ALLOW_THREADS
+    for (i = 0; i < n_frames; i++) {
+        if (offset[i] < 0 || offset[i] >= data.len ||
+            decompress(raw + offset[i], data.len - offset[i], natoms,
+                       xyz + i * natoms * 3)) {
+            failed = i;
+            break;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&data);
+    if (failed >= 0) {
+        PyErr_Format(PyExc_IOError,
+                     "failed to decompress coordinates at offset %lld",
+                     (long long) offset[failed]);
+        return NULL;
+    }
+    Py_INCREF(coords);
+    return (PyObject *) coords;
+}
+
+
+static PyMethodDef xdrtools_methods[] = {
+
+    {"decompressXTC",  (PyCFunction)decompressXTC,
+     METH_VARARGS | METH_KEYWORDS,
+     "Decompress XTC coordinates starting at given byte *offsets* of \n"
+     "*data* into *coords* array with shape (len(offsets), n_atoms, 3).\n"
+     "Coordinates are in nanometers."},
+
+    {NULL, NULL, 0, NULL}
+};
+
+
+
+#if PY_MAJOR_VERSION >= 3
+
+static struct PyModuleDef xdrtools = {
+        PyModuleDef_HEAD_INIT,
+        "xdrtools",
+        "XDR trajectory file tools.",
+        -1,
+        xdrtools_methods,
+};
+PyMODINIT_FUNC PyInit_xdrtools(void) {
+    import_array();
+    return PyModule_Create(&xdrtools);
+}
+#else
+PyMODINIT_FUNC initxdrtools(void) {
+
+    Py_InitModule3("xdrtools", xdrtools_methods,
+        "XDR trajectory file tools.");
+
+    import_array();
+}
+#endif
@@ -7,12 +7,75 @@ from .logger import LOGGER
 __all__ = ['solveEig', 'ZERO']
 
 ZERO = 1e-6
+SIGMA = -1e-3
+RANDOMIZED_TOL = 1e-8
+RANDOMIZED_MAXITER = 100
+ITERATIVE = ('shift-invert', 'lobpcg', 'randomized')
+
+SOLVERS = ('eigh', 'eigsh', 'shift-invert', 'lobpcg', 'randomized')
 
 def solveEig(M, n_modes=None, zeros=False, turbo=True, expct_n_zeros=None, reverse=False, **kwargs):
+    """Returns eigenvalues, eigenvectors, and inverse eigenvalues of symmetric
+    matrix *M*.  By default, dense matrices are diagonalized using
+    :func:`scipy.linalg.eigh` and sparse matrices using
+    :func:`scipy.sparse.linalg.eigsh`.  For large matrices, an iterative
+    *solver* can be selected when only a subset of modes is requested.
+
+    :arg solver: one of ``'eigh'``, ``'eigsh'``, ``'shift-invert'``
+        (Lanczos iterations on ``(M - sigma*I)^-1``), ``'lobpcg'`` (locally
+        optimal block preconditioned conjugate gradient), or ``'randomized'``
+        (randomized subspace iteration on ``(M - sigma*I)^-1``), default is
+        **None**, meaning ``'eigh'`` for dense and ``'eigsh'`` for sparse
+        matrices
+    :type solver: str
+
+    :arg sigma: shift for ``'shift-invert'`` and ``'randomized'`` solvers,
+        default is ``-1e-3``.  A small negative value keeps ``M - sigma*I``
+        positive definite when *M* has zero eigenvalues.
+    :type sigma: float
+
+    :arg constraints: vectors with shape ``(dof, n)`` spanning an invariant
+        subspace of *M* with the smallest eigenvalues, e.g. known zero modes.
+        ``'lobpcg'`` solver excludes this subspace from the search and returns
+        the orthonormalized constraint vectors as the lowest modes.
+    :type constraints: :class:`numpy.ndarray`
+
+    :arg tol: convergence tolerance for iterative solvers, for
+        ``'randomized'`` solver this is the largest Ritz residual relative to
+        the largest eigenvalue in the subspace, default is ``1e-8``
+    :type tol: float
+
+    :arg maxiter: maximum number of iterations for iterative solvers, for
+        ``'randomized'`` solver this is the maximum number of subspace
+        iterations, default is 100
+    :type maxiter: int
+
+    :arg n_oversamples: number of additional vectors in the subspace used by
+        ``'randomized'`` solver, default is the number of requested modes or
+        10, whichever is larger
+    :type n_oversamples: int
+
+    :arg null_space: vectors with shape ``(dof, n)`` spanning the null space
+        of *M*, e.g. rigid-body translations and rotations.  When given, the
+        null space is projected out up front and only non-zero modes are
+        calculated in a single pass.  Null space vectors are returned as zero
+        modes when *zeros* is **True**.
+    :type null_space: :class:`numpy.ndarray`
+
+    :arg nproc: number of processors for thread pool limit,
+        default is **0**, meaning don't impose limit
+    :type nproc: int"""
+
     linalg = importLA()
     dof = M.shape[0]
 
     nproc = kwargs.get('nproc', 0)
+    solver = kwargs.pop('solver', None)
+    if solver is not None:
+        solver = str(solver).lower()
+        if solver not in SOLVERS:
+            raise ValueError('solver must be one of {0}'
+                             .format(', '.join(repr(s) for s in SOLVERS)))
 
     if expct_n_zeros is None:
         expct_n_zeros = 0
@@ -20,6 +83,25 @@ def solveEig(M, n_modes=None, zeros=False, turbo=True, expct_n_zeros=None, rever
     else:
         warn_zeros = True
 
+    null_space = kwargs.pop('null_space', None)
+    if null_space is not None and not reverse:
+        null_space = _orthonormalize(null_space, dof)
+        n_null = null_space.shape[1]
+        n_solve = dof if n_modes is None else n_modes - n_null * zeros
+        if 0 < n_solve and n_solve + n_null < dof:
+            result = _limitThreads(nproc, _solveDeflated, M, null_space,
+                                   n_solve, solver, **kwargs)
+            if result is not None:
+                values, vectors = result
+                if zeros:
+                    rayleigh = (null_space * M.dot(null_space)).sum(0)
+                    values = np.concatenate([rayleigh, values])
+                    vectors = np.hstack([null_space, vectors])
+                invvals = div0(1, values)
+                if zeros:
+                    invvals[:n_null] = 0.
+                return values, vectors, invvals
+
     if n_modes is None:
         eigvals = None
         n_modes = dof
@@ -37,9 +119,14 @@ def solveEig(M, n_modes=None, zeros=False, turbo=True, expct_n_zeros=None, rever
         if linalg.__package__.startswith('scipy'):
             from scipy.sparse import issparse
 
+            if solver in ITERATIVE and eigvals:
+                return _solveIterative(M, eigvals, solver, **kwargs)
+
             if eigvals:
                 turbo = False
-            if not issparse(M):
+            if issparse(M) and solver == 'eigh':
+                M = M.toarray()
+            if not issparse(M) and solver != 'eigsh':
                 values, vectors = linalg.eigh(M, turbo=turbo, eigvals=eigvals)
             else:
                 try:
@@ -83,20 +170,23 @@ def solveEig(M, n_modes=None, zeros=False, turbo=True, expct_n_zeros=None, rever
                 raise ImportError('failed to import scipy.sparse.linalg, '
                                     'which is required for sparse matrix '
                                     'decomposition')
-            w, _ = scipy_sparse_la.eigsh(M, k=dof-1, which='SA')
+            # eigenvalues closest to zero are calculated using shift-invert
+            # mode, doubling their number until a non-zero one is found
+            sigma = kwargs.get('sigma', SIGMA)
+            OPinv = scipy_sparse_la.LinearOperator((dof, dof), dtype=float,
+                matvec=_factorizeShifted(M, sigma))
+            k = min(2 * (n_modes + expct_n_zeros), dof - 1)
+            while True:
+                w = scipy_sparse_la.eigsh(M, k=k, sigma=sigma, which='LM',
+                                          OPinv=OPinv,
+                                          return_eigenvectors=False)
+                if k == dof - 1 or (w >= ZERO).any():
+                    break
+                k = min(2 * k, dof - 1)
         n_zeros = sum(w < ZERO)
         return n_zeros
 
-    if nproc > 0:
-        try:
-            from threadpoolctl import threadpool_limits
-        except ImportError:
-            raise ImportError('Please install threadpoolctl to control threads')
-
-        with threadpool_limits(limits=nproc, user_api="blas"):
-            values, vectors = _eigh(M, eigvals, turbo)
-    else:
-        values, vectors = _eigh(M, eigvals, turbo)
+    values, vectors = _limitThreads(nproc, _eigh, M, eigvals, turbo)
     n_zeros = sum(values < ZERO)
 
     if warn_zeros:
@@ -141,3 +231,291 @@ def solveEig(M, n_modes=None, zeros=False, turbo=True, expct_n_zeros=None, rever
         eigvecs = eigvecs[:, ::-1]
 
     return eigvals, eigvecs, invvals
+
+
+def _limitThreads(nproc, func, *args, **kwargs):
+    """Calls *func* with BLAS threads limited to *nproc*, if it is positive."""
+
+    if nproc > 0:
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            raise ImportError('Please install threadpoolctl to control threads')
+
+        with threadpool_limits(limits=nproc, user_api="blas"):
+            return func(*args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def _solveIterative(M, eigvals, solver, **kwargs):
+    """Returns eigenvalues and eigenvectors of *M* with indices in the range
+    given by *eigvals* using an iterative *solver*.  When the range includes
+    the largest eigenvalue but not the smallest one, largest eigenvalues are
+    calculated, otherwise all eigenvalues up to the upper bound of the range
+    are calculated and the lower ones are discarded."""
+
+    dof = M.shape[0]
+    start, stop = eigvals[0], eigvals[-1] + 1
+    largest = start > 0 and stop == dof
+    k = stop - start if largest else stop
+
+    LOGGER.debug('Calculating {0} {1} eigenvalues using {2} solver.'
+                 .format(k, 'largest' if largest else 'smallest', solver))
+    if solver == 'shift-invert':
+        values, vectors = _solveShiftInvert(M, k, largest, **kwargs)
+    elif solver == 'lobpcg':
+        values, vectors = _solveLOBPCG(M, k, largest, **kwargs)
+    else:
+        values, vectors = _solveRandomized(M, k, largest, **kwargs)
+
+    order = values.argsort()
+    values = values[order]
+    vectors = vectors[:, order]
+    if not largest:
+        values = values[start:]
+        vectors = vectors[:, start:]
+    return values, vectors
+
+
+def _solveShiftInvert(M, k, largest=False, **kwargs):
+    """Lanczos iterations in shift-invert mode, which converge quickly for
+    eigenvalues closest to *sigma*."""
+
+    from scipy.sparse import linalg as scipy_sparse_la
+
+    tol = kwargs.get('tol', 0)
+    maxiter = kwargs.get('maxiter', None)
+    if largest:
+        return scipy_sparse_la.eigsh(M, k=k, which='LA', tol=tol,
+                                     maxiter=maxiter)
+    sigma = kwargs.get('sigma', SIGMA)
+    solve = _factorizeShifted(M, sigma)
+    dof = M.shape[0]
+    OPinv = scipy_sparse_la.LinearOperator((dof, dof), matvec=solve,
+                                           dtype=float)
+    return scipy_sparse_la.eigsh(M, k=k, sigma=sigma, which='LM', tol=tol,
+                                 maxiter=maxiter, OPinv=OPinv)
+
+
+def _factorizeShifted(M, sigma, null_space=None, shift=0.):
+    """Returns a function that solves ``(M - sigma*I) x = b`` using a single
+    factorization of the shifted matrix.  Sparse matrices are factorized with
+    a symmetric fill-reducing ordering, which is considerably faster than the
+    default column ordering for elastic network matrices.  When *null_space*
+    vectors ``Y`` are given, the solution for ``M + shift*Y*Y^T`` is obtained
+    with the Woodbury identity."""
+
+    from scipy.sparse import issparse, identity
+    from scipy import linalg as scipy_la
+    from scipy.sparse import linalg as scipy_sparse_la
+
+    dof = M.shape[0]
+    if issparse(M):
+        lu = scipy_sparse_la.splu((M - sigma * identity(dof)).tocsc(),
+                                  permc_spec='MMD_AT_PLUS_A',
+                                  options=dict(SymmetricMode=True))
+        solve = lu.solve
+    else:
+        shifted = M - sigma * np.eye(dof)
+        try:
+            cho = scipy_la.cho_factor(shifted)
+        except scipy_la.LinAlgError:
+            lu = scipy_la.lu_factor(shifted)
+            solve = lambda b: scipy_la.lu_solve(lu, b)
+        else:
+            solve = lambda b: scipy_la.cho_solve(cho, b)
+
+    if null_space is None:
+        return solve
+
+    Y = null_space
+    AY = solve(Y)
+    C = np.linalg.inv(np.eye(Y.shape[1]) / shift + Y.T.dot(AY))
+
+    def solveWoodbury(b):
+        x = solve(b)
+        return x - AY.dot(C.dot(Y.T.dot(x)))
+
+    return solveWoodbury
+
+
+def _solveLOBPCG(M, k, largest=False, **kwargs):
+    """LOBPCG iterations preconditioned with the inverse of the diagonal of
+    *M*.  Vectors in *constraints* are deflated from the search space."""
+
+    from scipy.sparse import issparse
+    from scipy.sparse import linalg as scipy_sparse_la
+
+    dof = M.shape[0]
+    constraints = kwargs.get('constraints', None)
+    tol = kwargs.get('tol', None)
+    maxiter = kwargs.get('maxiter', None)
+    if maxiter is None:
+        maxiter = max(200, 20 * k)
+
+    n_constraints = 0
+    if constraints is not None:
+        constraints = np.asarray(constraints, float)
+        if constraints.ndim == 1:
+            constraints = constraints.reshape((dof, 1))
+        if constraints.ndim != 2 or constraints.shape[0] != dof:
+            raise ValueError('constraints must have shape (dof, n)')
+        constraints, _ = np.linalg.qr(constraints)
+        n_constraints = constraints.shape[1]
+
+    n_search = k if largest else k - n_constraints
+    if n_search > 0:
+        diag = M.diagonal() if issparse(M) else np.diag(M)
+        diag = np.where(np.abs(diag) > ZERO, diag, 1.)
+        precond = scipy_sparse_la.LinearOperator((dof, dof), dtype=float,
+            matvec=lambda x: x / diag.reshape((dof,) + (1,) * (x.ndim - 1)),
+            matmat=lambda X: X / diag[:, np.newaxis])
+
+        random = np.random.RandomState(kwargs.get('seed', 0))
+        X = random.standard_normal((dof, n_search))
+        values, vectors = scipy_sparse_la.lobpcg(M, X, M=precond,
+                                                 Y=constraints, tol=tol,
+                                                 maxiter=maxiter,
+                                                 largest=largest)
+    else:
+        values = np.zeros(0)
+        vectors = np.zeros((dof, 0))
+
+    if largest or not n_constraints:
+        return values, vectors
+
+    constraints = constraints[:, :k]
+    rayleigh = (constraints * M.dot(constraints)).sum(0)
+    return (np.concatenate([rayleigh, values]),
+            np.hstack([constraints, vectors]))
+
+
+def _solveRandomized(M, k, largest=False, solve=None, **kwargs):
+    """Randomized subspace iteration followed by Rayleigh-Ritz projection.
+    Smallest eigenvalues are obtained by iterating with ``(M - sigma*I)^-1``,
+    which is factorized once, unless a *solve* function is given.  Iterations
+    stop when Ritz residuals ``||M q - lambda q||`` of all *k* modes fall
+    below *tol* times the largest Ritz value in the subspace, or after
+    *maxiter* iterations."""
+
+    dof = M.shape[0]
+    n_oversamples = kwargs.get('n_oversamples', None)
+    if n_oversamples is None:
+        n_oversamples = max(10, k)
+    tol = kwargs.get('tol', None)
+    if not tol:
+        tol = RANDOMIZED_TOL
+    maxiter = kwargs.get('maxiter', None)
+    if maxiter is None:
+        maxiter = RANDOMIZED_MAXITER
+    size = min(k + n_oversamples, dof)
+
+    if largest:
+        apply = lambda X: M.dot(X)
+        select = slice(size - k, size)
+    else:
+        if solve is None:
+            solve = _factorizeShifted(M, kwargs.get('sigma', SIGMA))
+        apply = solve
+        select = slice(0, k)
+
+    random = np.random.RandomState(kwargs.get('seed', 0))
+    Q = random.standard_normal((dof, size))
+    for i in range(max(maxiter, 1)):
+        Q, _ = np.linalg.qr(apply(Q))
+        MQ = M.dot(Q)
+        T = Q.T.dot(MQ)
+        values, vectors = np.linalg.eigh((T + T.T) / 2)
+        scale = max(abs(values).max(), ZERO)
+        values = values[select]
+        vectors = vectors[:, select]
+        residuals = MQ.dot(vectors) - Q.dot(vectors) * values
+        residual = np.sqrt((residuals ** 2).sum(0)).max() / scale
+        if residual < tol:
+            break
+    else:
+        LOGGER.warn('Randomized solver did not converge in {0} iterations, '
+                    'largest relative Ritz residual is {1:.2e}.'
+                    .format(maxiter, residual))
+    return values, Q.dot(vectors)
+
+
+def _orthonormalize(vectors, dof):
+    """Returns an orthonormal basis for the space spanned by *vectors*."""
+
+    vectors = np.asarray(vectors, float)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape((dof, 1))
+    if vectors.ndim != 2 or vectors.shape[0] != dof:
+        raise ValueError('null_space must have shape ({0}, n)'.format(dof))
+    u, s, _ = np.linalg.svd(vectors, full_matrices=False)
+    return u[:, s > s.max() * 1e-8]
+
+
+def _solveDeflated(M, null_space, k, solver=None, **kwargs):
+    """Returns *k* smallest eigenvalues and eigenvectors of *M* in the
+    orthogonal complement of orthonormal *null_space* vectors.  Except for
+    LOBPCG, which deflates constraints itself, the null space is lifted to
+    the top of the spectrum by adding ``shift*Y*Y^T`` to *M*.  **None** is
+    returned if *M* turns out to have additional zero eigenvalues."""
+
+    from scipy import linalg as scipy_la
+    from scipy.sparse import issparse
+    from scipy.sparse import linalg as scipy_sparse_la
+
+    dof = M.shape[0]
+    Y = null_space
+    n_null = Y.shape[1]
+    kwargs.pop('constraints', None)
+
+    if issparse(M) and solver == 'eigh':
+        M = M.toarray()
+
+    if solver == 'lobpcg':
+        values, vectors = _solveLOBPCG(M, k + n_null, constraints=Y, **kwargs)
+        values = values[n_null:]
+        vectors = vectors[:, n_null:]
+    else:
+        # Gershgorin bound on the largest eigenvalue
+        shift = 2 * abs(M).sum(1).max() + 1
+        if not issparse(M):
+            shifted = M + shift * Y.dot(Y.T)
+            if solver in ITERATIVE:
+                values, vectors = _solveIterative(shifted, (0, k - 1),
+                                                  solver, **kwargs)
+            elif solver == 'eigsh':
+                values, vectors = scipy_sparse_la.eigsh(shifted, k=k,
+                                                        which='SA')
+            else:
+                values, vectors = scipy_la.eigh(shifted, eigvals=(0, k - 1))
+        else:
+            matvec = lambda x: M.dot(x) + shift * Y.dot(Y.T.dot(x))
+            shifted = scipy_sparse_la.LinearOperator((dof, dof), dtype=float,
+                                                     matvec=matvec,
+                                                     matmat=matvec)
+            if solver in (None, 'eigsh'):
+                values, vectors = scipy_sparse_la.eigsh(shifted, k=k,
+                                                        which='SA')
+            else:
+                sigma = kwargs.pop('sigma', SIGMA)
+                solve = _factorizeShifted(M, sigma, Y, shift)
+                if solver == 'shift-invert':
+                    OPinv = scipy_sparse_la.LinearOperator((dof, dof),
+                        dtype=float, matvec=solve, matmat=solve)
+                    values, vectors = scipy_sparse_la.eigsh(shifted, k=k,
+                        sigma=sigma, which='LM', OPinv=OPinv,
+                        tol=kwargs.get('tol', 0),
+                        maxiter=kwargs.get('maxiter', None))
+                else:
+                    values, vectors = _solveRandomized(shifted, k,
+                                                       solve=solve, **kwargs)
+
+    order = values.argsort()
+    values = values[order]
+    vectors = vectors[:, order]
+    n_zeros = (values < ZERO).sum()
+    if n_zeros:
+        LOGGER.warning('More than %d zero eigenvalues were detected, '
+                       'null space deflation is skipped.'%n_null)
+        return None
+    return values, vectors
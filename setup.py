@@ -115,6 +115,12 @@ EXTENSIONS = [
     Extension('prody.sequence.seqtools',
               [join('prody', 'sequence', 'seqtools.c'),],
               include_dirs=[numpy.get_include()]),
+    Extension('prody.trajectory.xdrtools',
+              [join('prody', 'trajectory', 'xdrtools.c'),],
+              include_dirs=[numpy.get_include()]),
+    Extension('prody.measure.rmsdtools',
+              [join('prody', 'measure', 'rmsdtools.c'),],
+              include_dirs=[numpy.get_include()]),
 ]
 
 # extra arguments for compiling C++ extensions on MacOSX